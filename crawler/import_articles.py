@@ -1,12 +1,24 @@
 import argparse
 import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import closing
+from functools import partial
 
-from tutor_crawler.fetcher import HttpFetcher
+from tutor_crawler.fetcher import create_fetcher
 from tutor_crawler.html_archive import read_html
+from tutor_crawler.llm_cache import LlmResponseCache
 from tutor_crawler.llm_client import RelayLlmClient
+from tutor_crawler.llm_governor import LlmRequestGovernor
 from tutor_crawler.llm_parser import LlmTutoringInfoParser
-from tutor_crawler.parser import TutoringInfoParser
+from tutor_crawler.llm_retry import CircuitBreaker, RetryPolicy
+from tutor_crawler.parser import (
+    TutoringInfoParser,
+    parse_with_fingerprint,
+    parser_fingerprint,
+)
+from tutor_crawler.reparse import bulk_reparse
 from tutor_crawler.service import CrawlService
 from tutor_crawler.storage import create_storage
 
@@ -38,27 +50,14 @@ def _load_urls(url_args: list[str], url_file: str) -> list[str]:
     return deduped
 
 
-def _get_db_row_count(storage, source_url: str) -> int:
-    sql_mysql = (
-        "SELECT COUNT(*) AS c FROM tutoring_info "
-        "WHERE source_url=%s OR source_url LIKE %s"
-    )
-    sql_sqlite = (
-        "SELECT COUNT(*) AS c FROM tutoring_info "
-        "WHERE source_url=? OR source_url LIKE ?"
-    )
-    params = (source_url, f"{source_url}#item-%")
-    sql = sql_mysql if hasattr(storage, "database") else sql_sqlite
-
-    with closing(storage._conn()) as conn:
-        cursor = conn.cursor()
-        cursor.execute(sql, params)
-        row = cursor.fetchone()
-        cursor.close()
-        return int(row["c"])
-
-
 def _load_article_from_raw(storage, source_url: str) -> dict | None:
+    if hasattr(storage, "get_article"):
+        # 走存储自身的会话（MySQL 为连接池），不再为每篇文章新建连接。
+        article = storage.get_article(source_url)
+        if article:
+            article["content_html"] = read_html(article.get("content_html", ""))
+        return article
+
     sql_mysql = (
         "SELECT source_url, platform_code, title, content_html, content_text, published_at "
         "FROM article_raw WHERE source_url=%s"
@@ -83,89 +82,375 @@ def _load_article_from_raw(storage, source_url: str) -> dict | None:
 
 
 def _process_from_article_raw(service: CrawlService, task_id: int) -> bool:
-    task = service.storage.get_task(task_id)
-    if not task:
-        return False
+    with service._unit_of_work():
+        task = service.storage.get_task(task_id)
+        if not task:
+            return False
 
-    source_url = task["source_url"]
-    platform_code = "MIAOMIAO_WECHAT"
-    if hasattr(task, "keys") and "platform_code" in task.keys():
-        platform_code = task["platform_code"] or "MIAOMIAO_WECHAT"
-    service.storage.update_task_status(task_id, "RUNNING")
-    service.storage.add_task_log(task_id, "FETCH", "RUNNING")
+        source_url = task["source_url"]
+        platform_code = "MIAOMIAO_WECHAT"
+        if hasattr(task, "keys") and "platform_code" in task.keys():
+            platform_code = task["platform_code"] or "MIAOMIAO_WECHAT"
+        service.storage.update_task_status(task_id, "RUNNING")
+        service.storage.add_task_log(task_id, "FETCH", "RUNNING")
 
     try:
         parser = service.resolve_parser(platform_code)
         if not parser:
-            service.storage.add_task_log(
-                task_id,
-                "PARSE",
-                "FAILED",
-                error_type="UNSUPPORTED_PLATFORM",
-                error_message=f"unsupported platform_code: {platform_code}",
-            )
-            service.storage.update_task_status(task_id, "FAILED")
+            with service._unit_of_work():
+                service.storage.add_task_log(
+                    task_id,
+                    "PARSE",
+                    "FAILED",
+                    error_type="UNSUPPORTED_PLATFORM",
+                    error_message=f"unsupported platform_code: {platform_code}",
+                )
+                service.storage.update_task_status(task_id, "FAILED")
             return False
 
         article = _load_article_from_raw(service.storage, source_url)
         if not article:
-            service.storage.add_task_log(
-                task_id,
-                "FETCH",
-                "FAILED",
-                error_type="ARTICLE_NOT_FOUND",
-                error_message="article_raw not found",
-            )
-            service.storage.update_task_status(task_id, "FAILED")
+            with service._unit_of_work():
+                service.storage.add_task_log(
+                    task_id,
+                    "FETCH",
+                    "FAILED",
+                    error_type="ARTICLE_NOT_FOUND",
+                    error_message="article_raw not found",
+                )
+                service.storage.update_task_status(task_id, "FAILED")
             return False
 
-        service.storage.add_task_log(
-            task_id,
-            "FETCH",
-            "SUCCESS",
-            error_message="from article_raw",
-        )
-
         article_platform_code = platform_code
         if hasattr(article, "keys") and "platform_code" in article.keys():
             article_platform_code = article["platform_code"] or platform_code
         article["platform_code"] = article_platform_code
 
-        service.storage.add_task_log(task_id, "PARSE", "RUNNING")
-        infos = (
-            parser.parse_many(article)
-            if hasattr(parser, "parse_many")
-            else [parser.parse(article)]
+        service._add_task_logs(
+            [
+                {
+                    "task_id": task_id,
+                    "stage": "FETCH",
+                    "status": "SUCCESS",
+                    "error_message": "from article_raw",
+                },
+                {"task_id": task_id, "stage": "PARSE", "status": "RUNNING"},
+            ]
         )
+
+        infos, fingerprint = parse_with_fingerprint(parser, article)
         infos = [info for info in infos if service._is_meaningful_info(info)]
         if not infos:
+            with service._unit_of_work():
+                service.storage.add_task_log(
+                    task_id,
+                    "PARSE",
+                    "FAILED",
+                    error_type="EMPTY_PARSED_RESULT",
+                    error_message="no meaningful parsed fields",
+                )
+                service.storage.update_task_status(task_id, "FAILED")
+            return False
+
+        def save() -> bool:
+            service._save_tutoring_infos(source_url, infos, fingerprint)
+            service.storage.add_task_log(task_id, "PARSE", "SUCCESS")
+            service.storage.update_task_status(task_id, "SUCCESS")
+            return True
+
+        return service._in_transaction(save)
+    except Exception as ex:  # noqa: BLE001
+        with service._unit_of_work():
             service.storage.add_task_log(
                 task_id,
-                "PARSE",
+                "EXECUTE",
                 "FAILED",
-                error_type="EMPTY_PARSED_RESULT",
-                error_message="no meaningful parsed fields",
+                error_type="RUNTIME_ERROR",
+                error_message=str(ex),
             )
             service.storage.update_task_status(task_id, "FAILED")
-            return False
+        return False
 
-        service.storage.delete_tutoring_info_by_article(source_url)
-        for info in infos:
-            service.storage.save_tutoring_info(info)
 
-        service.storage.add_task_log(task_id, "PARSE", "SUCCESS")
-        service.storage.update_task_status(task_id, "SUCCESS")
-        return True
-    except Exception as ex:  # noqa: BLE001
-        service.storage.add_task_log(
-            task_id,
-            "EXECUTE",
-            "FAILED",
-            error_type="RUNTIME_ERROR",
-            error_message=str(ex),
+def _import_one(
+    service: CrawlService,
+    source_url: str,
+    platform_code: str,
+    source_type: str,
+    from_article_raw: bool,
+) -> dict:
+    storage = service.storage
+    task = storage.get_task_by_url(source_url, platform_code)
+    task_id = (
+        int(task["id"])
+        if task
+        else storage.create_task(
+            source_url,
+            source_type,
+            platform_code=platform_code,
         )
-        service.storage.update_task_status(task_id, "FAILED")
-        return False
+    )
+
+    ok = (
+        _process_from_article_raw(service, task_id)
+        if from_article_raw
+        else service.process_task(task_id)
+    )
+    return {
+        "source_url": source_url,
+        "task_id": task_id,
+        "success": ok,
+        "tutoring_rows": storage.count_tutoring_info_by_article(source_url),
+    }
+
+
+def _load_checkpoint(path: str) -> dict[str, dict]:
+    """读取断点文件（每行一个已完成条目），同一 URL 以最后一行为准。"""
+    if not path:
+        return {}
+    items: dict[str, dict] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                raw = line.strip()
+                if not raw:
+                    continue
+                try:
+                    item = json.loads(raw)
+                except ValueError:
+                    # 中断时可能留下半行，忽略即可，该 URL 会被重新处理。
+                    continue
+                items[item["source_url"]] = item
+    except FileNotFoundError:
+        return {}
+    return items
+
+
+def _append_checkpoint(path: str, items: list[dict]) -> None:
+    with open(path, "a", encoding="utf-8") as file:
+        for item in items:
+            file.write(json.dumps(item, ensure_ascii=False) + "\n")
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _import_urls(
+    service: CrawlService,
+    urls: list[str],
+    platform_code: str,
+    source_type: str,
+    from_article_raw: bool,
+    workers: int = 1,
+    batch_size: int = 0,
+    checkpoint_path: str = "",
+) -> dict:
+    """按 URL 顺序导入并汇总结果。
+
+    workers>1 时以线程池并发处理（抓取与 LLM 调用以 IO 为主），输出仍保持输入顺序。
+    指定 checkpoint_path 时每完成 batch_size 个 URL 追加写入断点文件，重跑时跳过
+    已成功的 URL，失败的 URL 会重新处理；未指定时不分批，全部 URL 一次提交给线程池。
+    """
+    done = {
+        url: item
+        for url, item in _load_checkpoint(checkpoint_path).items()
+        if item.get("success")
+    }
+    pending = [url for url in urls if url not in done]
+    # 只有写断点时才分批；否则整批一次提交，避免慢 URL 拖住其余 worker。
+    if not checkpoint_path or batch_size <= 0:
+        batch_size = max(1, len(pending))
+
+    def run_one(source_url: str) -> dict:
+        try:
+            return _import_one(
+                service, source_url, platform_code, source_type, from_article_raw
+            )
+        except Exception as ex:  # noqa: BLE001
+            # 建任务等存储异常只记为该 URL 失败，不中断整批，汇总与断点照常写出。
+            return {
+                "source_url": source_url,
+                "task_id": None,
+                "success": False,
+                "tutoring_rows": 0,
+                "error": str(ex),
+            }
+
+    workers = max(1, int(workers))
+    executor = (
+        ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import-worker")
+        if workers > 1 and len(pending) > 1
+        else None
+    )
+    try:
+        for offset in range(0, len(pending), batch_size):
+            batch = pending[offset : offset + batch_size]
+            items = (
+                list(executor.map(run_one, batch))
+                if executor
+                else [run_one(url) for url in batch]
+            )
+            if checkpoint_path:
+                _append_checkpoint(checkpoint_path, items)
+            done.update((item["source_url"], item) for item in items)
+    finally:
+        if executor:
+            executor.shutdown(wait=True)
+            if hasattr(service.storage, "prune_connections"):
+                service.storage.prune_connections()
+
+    results = [done[url] for url in urls]
+    success_count = sum(1 for item in results if item["success"])
+    return {
+        "total": len(urls),
+        "success": success_count,
+        "failed": len(urls) - success_count,
+        "items": results,
+    }
+
+
+def _serve(service: CrawlService, args, input_stream, output_stream) -> None:
+    """常驻 worker：每行一个 JSON 任务，结果与单次命令输出同结构，额外回传任务 id。
+
+    任务字段：url 或 urls（必填），platform_code / source_type / from_article_raw
+    缺省时使用启动参数。存储连接、解析器与 LLM 客户端在任务间复用。
+    """
+    for line in input_stream:
+        raw = line.strip()
+        if not raw:
+            continue
+        job_id = None
+        try:
+            job = json.loads(raw)
+            if not isinstance(job, dict):
+                raise ValueError("job must be a JSON object")
+            job_id = job.get("id")
+            urls = _load_urls(
+                list(job.get("urls") or []) + ([job["url"]] if job.get("url") else []),
+                "",
+            )
+            if not urls:
+                raise ValueError("job requires url or urls")
+            output = _import_urls(
+                service,
+                urls,
+                platform_code=job.get("platform_code") or args.platform_code,
+                source_type=job.get("source_type") or args.source_type,
+                from_article_raw=bool(job.get("from_article_raw", args.from_article_raw)),
+            )
+        except Exception as ex:  # noqa: BLE001
+            output = {
+                "total": 0,
+                "success": 0,
+                "failed": 0,
+                "items": [],
+                "error": str(ex),
+            }
+        if job_id is not None:
+            output["id"] = job_id
+        output_stream.write(json.dumps(output, ensure_ascii=False) + "\n")
+        output_stream.flush()
+
+
+def _build_parser(
+    parser_mode: str,
+    llm_config: str,
+    llm_base_url: str,
+    llm_api_key: str,
+    llm_model: str,
+    llm_timeout_seconds: int,
+    llm_cache_path: str = "",
+    llm_cache_ttl_seconds: int = 30 * 86400,
+    llm_cache_max_entries: int = 100000,
+    llm_cache_bypass: bool = False,
+    llm_chunk_workers: int = 4,
+    llm_max_input_tokens: int = 6000,
+    llm_max_output_tokens: int = 4000,
+    llm_status_attempts: dict[int, int] | None = None,
+    llm_circuit_failure_threshold: int = 5,
+    llm_circuit_reset_seconds: float = 60.0,
+    llm_governor_path: str = "",
+    llm_requests_per_minute: float = 60,
+    llm_max_in_flight: int = 4,
+    llm_http_backend: str = "urllib",
+):
+    rule_parser = TutoringInfoParser()
+    if parser_mode != "llm":
+        return rule_parser
+    llm_cache = None
+    if llm_cache_path:
+        llm_cache = LlmResponseCache(
+            llm_cache_path,
+            ttl_seconds=llm_cache_ttl_seconds,
+            max_entries=llm_cache_max_entries,
+        )
+    llm_governor = None
+    if llm_governor_path:
+        llm_governor = LlmRequestGovernor(
+            llm_governor_path,
+            requests_per_minute=llm_requests_per_minute,
+            max_in_flight=llm_max_in_flight,
+        )
+    llm_client = RelayLlmClient(
+        config_path=llm_config,
+        base_url=llm_base_url or None,
+        api_key=llm_api_key or None,
+        model=llm_model or None,
+        timeout_seconds=llm_timeout_seconds if llm_timeout_seconds > 0 else None,
+        response_cache=llm_cache,
+        bypass_cache=llm_cache_bypass,
+        retry_policy=RetryPolicy(status_attempts=llm_status_attempts),
+        circuit_breaker=CircuitBreaker(
+            failure_threshold=llm_circuit_failure_threshold,
+            reset_timeout_seconds=llm_circuit_reset_seconds,
+        ),
+        governor=llm_governor,
+        http_backend=llm_http_backend,
+    )
+    return LlmTutoringInfoParser(
+        llm_client=llm_client,
+        fallback_parser=rule_parser,
+        enable_fallback=True,
+        chunk_workers=llm_chunk_workers,
+        max_input_tokens=llm_max_input_tokens,
+        max_output_tokens=llm_max_output_tokens,
+        block_cache=llm_cache,
+        bypass_block_cache=llm_cache_bypass,
+    )
+
+
+def _build_parser_fingerprint(
+    parser_mode: str,
+    llm_config: str,
+    llm_base_url: str,
+    llm_api_key: str,
+    llm_model: str,
+) -> str:
+    """只按配置计算解析器指纹，不创建 LLM 缓存、限流器与分块线程池。"""
+    rule_parser = TutoringInfoParser()
+    if parser_mode != "llm":
+        return parser_fingerprint(rule_parser)
+    llm_client = RelayLlmClient(
+        config_path=llm_config,
+        base_url=llm_base_url or None,
+        api_key=llm_api_key or None,
+        model=llm_model or None,
+    )
+    try:
+        return LlmTutoringInfoParser(
+            llm_client=llm_client, fallback_parser=rule_parser
+        ).fingerprint()
+    finally:
+        llm_client.close()
+
+
+def _llm_cache_of(parser) -> LlmResponseCache | None:
+    llm_client = getattr(parser, "llm_client", None)
+    return getattr(llm_client, "response_cache", None)
+
+
+def _llm_governor_of(parser) -> LlmRequestGovernor | None:
+    llm_client = getattr(parser, "llm_client", None)
+    return getattr(llm_client, "governor", None)
 
 
 def main() -> None:
@@ -201,6 +486,45 @@ def main() -> None:
     parser.add_argument(
         "--mysql-database", default="tutoring_crawler", help="MySQL 数据库"
     )
+    parser.add_argument(
+        "--mysql-pool-size", type=int, default=8, help="MySQL 连接池最大连接数"
+    )
+    parser.add_argument(
+        "--mysql-pool-max-lifetime",
+        type=float,
+        default=1800,
+        help="MySQL 连接最长存活秒数，超过后归还时关闭",
+    )
+    parser.add_argument(
+        "--mysql-pool-idle-timeout",
+        type=float,
+        default=300,
+        help="MySQL 空闲连接超时秒数，超过后取用时淘汰",
+    )
+    parser.add_argument(
+        "--sqlite-synchronous",
+        default="NORMAL",
+        choices=["OFF", "NORMAL", "FULL", "EXTRA"],
+        help="SQLite synchronous 级别（WAL 模式下默认 NORMAL）",
+    )
+    parser.add_argument(
+        "--sqlite-cache-size",
+        type=int,
+        default=-16000,
+        help="SQLite cache_size，负数表示 KiB",
+    )
+    parser.add_argument(
+        "--sqlite-mmap-size",
+        type=int,
+        default=0,
+        help="SQLite mmap_size 字节数，0 表示关闭",
+    )
+    parser.add_argument(
+        "--sqlite-busy-timeout-ms",
+        type=int,
+        default=5000,
+        help="SQLite 遇到写锁时的等待毫秒数",
+    )
     parser.add_argument(
         "--parser-mode",
         default="llm",
@@ -221,11 +545,162 @@ def main() -> None:
         default=0,
         help="LLM 请求超时秒数（<=0 时使用 llm_config.json 配置）",
     )
+    parser.add_argument(
+        "--llm-chunk-workers",
+        type=int,
+        default=4,
+        help="分块较多的文章并发请求 LLM 的分块数（默认 4，<=1 时串行）",
+    )
+    parser.add_argument(
+        "--llm-max-input-tokens",
+        type=int,
+        default=6000,
+        help="单次 LLM 请求的估算输入 token 上限，信息块按此装箱分批（默认 6000）",
+    )
+    parser.add_argument(
+        "--llm-max-output-tokens",
+        type=int,
+        default=4000,
+        help="单次 LLM 请求的估算输出 token 上限（默认 4000）",
+    )
+    parser.add_argument(
+        "--llm-cache",
+        default="",
+        help="LLM 响应缓存 SQLite 文件路径，相同提示词直接复用历史响应（默认不启用）",
+    )
+    parser.add_argument(
+        "--llm-cache-ttl-seconds",
+        type=int,
+        default=30 * 86400,
+        help="LLM 响应缓存有效期秒数（<=0 表示不过期，默认 30 天）",
+    )
+    parser.add_argument(
+        "--llm-cache-max-entries",
+        type=int,
+        default=100000,
+        help="LLM 响应缓存最大条目数，超出时淘汰最久未使用的条目",
+    )
+    parser.add_argument(
+        "--llm-cache-bypass",
+        action="store_true",
+        help="跳过缓存读取、强制请求 LLM（新响应仍写回缓存）",
+    )
+    parser.add_argument(
+        "--llm-retry-status",
+        action="append",
+        default=[],
+        help="按状态码覆盖 LLM 最大尝试次数，格式 状态码=次数，可重复"
+        "（默认 408/500/502/504=3，429/503=5，其余不重试）",
+    )
+    parser.add_argument(
+        "--llm-circuit-failure-threshold",
+        type=int,
+        default=5,
+        help="LLM 连续失败多少次后熔断，熔断期间直接走规则解析（默认 5）",
+    )
+    parser.add_argument(
+        "--llm-circuit-reset-seconds",
+        type=float,
+        default=60.0,
+        help="LLM 熔断冷却秒数，之后放行一次探测请求（默认 60）",
+    )
+    parser.add_argument(
+        "--llm-governor",
+        default="",
+        help="LLM 限流状态 SQLite 文件路径，本机多个进程共用同一文件时共享限额（默认不启用）",
+    )
+    parser.add_argument(
+        "--llm-requests-per-minute",
+        type=float,
+        default=60,
+        help="启用 --llm-governor 时所有进程合计的每分钟请求数上限（默认 60）",
+    )
+    parser.add_argument(
+        "--llm-max-in-flight",
+        type=int,
+        default=4,
+        help="启用 --llm-governor 时所有进程合计的在途请求数上限（默认 4）",
+    )
+    parser.add_argument(
+        "--llm-http-backend",
+        default="urllib",
+        choices=["urllib", "pooled"],
+        help="LLM 中转 HTTP 实现：urllib(默认，支持 HTTP(S)_PROXY)/pooled(复用长连接，配置代理时仍用 urllib)",
+    )
+    parser.add_argument(
+        "--http-backend",
+        default="urllib",
+        choices=["urllib", "pooled"],
+        help="页面抓取 HTTP 实现：urllib(默认)/pooled(按 host 复用长连接)",
+    )
+    parser.add_argument(
+        "--http-pool-size",
+        type=int,
+        default=4,
+        help="每个 host 保留的空闲长连接数",
+    )
+    parser.add_argument(
+        "--streaming-fetch",
+        action="store_true",
+        help="流式抓取文章：正文节点闭合后提前停止下载（article_raw 不保留尾部脚本）",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="并发导入的 URL 数（默认 1，即串行），输出顺序与输入一致",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="每完成多少个 URL 写一次断点文件（配合 --checkpoint-file）；批量重解析时为每批回写的文章数",
+    )
+    parser.add_argument(
+        "--checkpoint-file",
+        default="",
+        help="断点文件路径，中断后重跑时跳过其中已成功的 URL",
+    )
+    parser.add_argument(
+        "--bulk-reparse",
+        action="store_true",
+        help="批量重解析 article_raw 中指定平台（--platform-code）的全部文章，无需提供 URL",
+    )
+    parser.add_argument(
+        "--stale-only",
+        action="store_true",
+        help="批量重解析时只处理解析器指纹与当前解析器不一致的文章",
+    )
+    parser.add_argument(
+        "--published-from",
+        default="",
+        help="批量重解析的发布时间下限（含），如 2026-01-01",
+    )
+    parser.add_argument(
+        "--published-to",
+        default="",
+        help="批量重解析的发布时间上限（不含），如 2026-02-01",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=1,
+        help="批量重解析的解析进程数（默认 1，在当前进程解析）",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="常驻模式：从 stdin 逐行读取 JSON 任务，每个任务输出一行 JSON 结果",
+    )
     args = parser.parse_args()
 
     urls = _load_urls(args.url, args.url_file)
-    if not urls:
+    if not urls and not args.serve and not args.bulk_reparse:
         raise SystemExit("至少提供一个 --url 或 --url-file")
+    try:
+        llm_status_attempts = RetryPolicy.parse_status_attempts(args.llm_retry_status)
+    except ValueError as ex:
+        parser.error(str(ex))
 
     storage = create_storage(
         db_type=args.db_type,
@@ -235,70 +710,94 @@ def main() -> None:
         mysql_user=args.mysql_user,
         mysql_password=args.mysql_password,
         mysql_database=args.mysql_database,
+        sqlite_synchronous=args.sqlite_synchronous,
+        sqlite_cache_size=args.sqlite_cache_size,
+        sqlite_mmap_size=args.sqlite_mmap_size,
+        sqlite_busy_timeout_ms=args.sqlite_busy_timeout_ms,
+        mysql_pool_size=args.mysql_pool_size,
+        mysql_pool_max_lifetime_seconds=args.mysql_pool_max_lifetime,
+        mysql_pool_idle_timeout_seconds=args.mysql_pool_idle_timeout,
     )
     storage.init_db()
 
-    rule_parser = TutoringInfoParser()
-    selected_parser = rule_parser
-    if args.parser_mode == "llm":
-        llm_client = RelayLlmClient(
-            config_path=args.llm_config,
-            base_url=args.llm_base_url or None,
-            api_key=args.llm_api_key or None,
-            model=args.llm_model or None,
-            timeout_seconds=args.llm_timeout_seconds
-            if args.llm_timeout_seconds > 0
-            else None,
-        )
-        selected_parser = LlmTutoringInfoParser(
-            llm_client=llm_client,
-            fallback_parser=rule_parser,
-            enable_fallback=True,
+    parser_factory = partial(
+        _build_parser,
+        args.parser_mode,
+        args.llm_config,
+        args.llm_base_url,
+        args.llm_api_key,
+        args.llm_model,
+        args.llm_timeout_seconds,
+        args.llm_cache,
+        args.llm_cache_ttl_seconds,
+        args.llm_cache_max_entries,
+        args.llm_cache_bypass,
+        args.llm_chunk_workers,
+        args.llm_max_input_tokens,
+        args.llm_max_output_tokens,
+        llm_status_attempts,
+        args.llm_circuit_failure_threshold,
+        args.llm_circuit_reset_seconds,
+        args.llm_governor,
+        args.llm_requests_per_minute,
+        args.llm_max_in_flight,
+        args.llm_http_backend,
+    )
+    if args.bulk_reparse:
+        output = bulk_reparse(
+            storage,
+            parser_factory,
+            fingerprint=_build_parser_fingerprint(
+                args.parser_mode,
+                args.llm_config,
+                args.llm_base_url,
+                args.llm_api_key,
+                args.llm_model,
+            ),
+            platform_code=args.platform_code,
+            published_from=args.published_from,
+            published_to=args.published_to,
+            processes=args.processes,
+            batch_size=args.batch_size,
+            stale_only=args.stale_only,
         )
+        print(json.dumps(output, ensure_ascii=False))
+        return
+
+    selected_parser = parser_factory()
 
+    fetcher = create_fetcher(
+        backend=args.http_backend,
+        pool_size=args.http_pool_size,
+    )
     service = CrawlService(
         storage=storage,
-        list_fetcher=HttpFetcher(),
-        article_fetcher=HttpFetcher(),
+        list_fetcher=fetcher,
+        article_fetcher=fetcher,
         parser=selected_parser,
+        streaming_fetch=args.streaming_fetch,
     )
 
-    results: list[dict] = []
-    success_count = 0
-    for source_url in urls:
-        task = storage.get_task_by_url(source_url, args.platform_code)
-        task_id = (
-            int(task["id"])
-            if task
-            else storage.create_task(
-                source_url,
-                args.source_type,
-                platform_code=args.platform_code,
-            )
-        )
-
-        ok = (
-            _process_from_article_raw(service, task_id)
-            if args.from_article_raw
-            else service.process_task(task_id)
-        )
-        rows = _get_db_row_count(storage, source_url)
-        success_count += 1 if ok else 0
-        results.append(
-            {
-                "source_url": source_url,
-                "task_id": task_id,
-                "success": ok,
-                "tutoring_rows": rows,
-            }
-        )
-
-    output = {
-        "total": len(urls),
-        "success": success_count,
-        "failed": len(urls) - success_count,
-        "items": results,
-    }
+    if args.serve:
+        _serve(service, args, sys.stdin, sys.stdout)
+        return
+
+    output = _import_urls(
+        service,
+        urls,
+        platform_code=args.platform_code,
+        source_type=args.source_type,
+        from_article_raw=args.from_article_raw,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        checkpoint_path=args.checkpoint_file,
+    )
+    llm_cache = _llm_cache_of(selected_parser)
+    if llm_cache is not None:
+        output["llm_cache"] = llm_cache.stats()
+    llm_governor = _llm_governor_of(selected_parser)
+    if llm_governor is not None:
+        output["llm_governor"] = llm_governor.stats()
     print(json.dumps(output, ensure_ascii=False))
 
 
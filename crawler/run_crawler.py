@@ -1,8 +1,12 @@
 import argparse
 
-from tutor_crawler.fetcher import HttpFetcher
+from tutor_crawler.fetcher import create_fetcher
+from tutor_crawler.known_urls import KnownUrlIndex
+from tutor_crawler.llm_cache import LlmResponseCache
 from tutor_crawler.llm_client import RelayLlmClient
+from tutor_crawler.llm_governor import LlmRequestGovernor
 from tutor_crawler.llm_parser import LlmTutoringInfoParser
+from tutor_crawler.llm_retry import CircuitBreaker, RetryPolicy
 from tutor_crawler.parser import TutoringInfoParser
 from tutor_crawler.scheduler import DailyScanScheduler
 from tutor_crawler.service import CrawlService
@@ -22,6 +26,45 @@ def main() -> None:
     parser.add_argument(
         "--mysql-database", default="tutoring_crawler", help="MySQL 数据库"
     )
+    parser.add_argument(
+        "--mysql-pool-size", type=int, default=8, help="MySQL 连接池最大连接数"
+    )
+    parser.add_argument(
+        "--mysql-pool-max-lifetime",
+        type=float,
+        default=1800,
+        help="MySQL 连接最长存活秒数，超过后归还时关闭",
+    )
+    parser.add_argument(
+        "--mysql-pool-idle-timeout",
+        type=float,
+        default=300,
+        help="MySQL 空闲连接超时秒数，超过后取用时淘汰",
+    )
+    parser.add_argument(
+        "--sqlite-synchronous",
+        default="NORMAL",
+        choices=["OFF", "NORMAL", "FULL", "EXTRA"],
+        help="SQLite synchronous 级别（WAL 模式下默认 NORMAL）",
+    )
+    parser.add_argument(
+        "--sqlite-cache-size",
+        type=int,
+        default=-16000,
+        help="SQLite cache_size，负数表示 KiB",
+    )
+    parser.add_argument(
+        "--sqlite-mmap-size",
+        type=int,
+        default=0,
+        help="SQLite mmap_size 字节数，0 表示关闭",
+    )
+    parser.add_argument(
+        "--sqlite-busy-timeout-ms",
+        type=int,
+        default=5000,
+        help="SQLite 遇到写锁时的等待毫秒数",
+    )
     parser.add_argument("--list-url", required=True, help="公众号列表页 URL")
     parser.add_argument(
         "--platform-code",
@@ -50,6 +93,82 @@ def main() -> None:
         default=0,
         help="LLM 请求超时秒数（<=0 时使用 llm_config.json 配置）",
     )
+    parser.add_argument(
+        "--llm-chunk-workers",
+        type=int,
+        default=4,
+        help="分块较多的文章并发请求 LLM 的分块数（默认 4，<=1 时串行）",
+    )
+    parser.add_argument(
+        "--llm-max-input-tokens",
+        type=int,
+        default=6000,
+        help="单次 LLM 请求的估算输入 token 上限，信息块按此装箱分批（默认 6000）",
+    )
+    parser.add_argument(
+        "--llm-max-output-tokens",
+        type=int,
+        default=4000,
+        help="单次 LLM 请求的估算输出 token 上限（默认 4000）",
+    )
+    parser.add_argument(
+        "--llm-cache",
+        default="",
+        help="LLM 响应缓存 SQLite 文件路径，相同提示词直接复用历史响应（默认不启用）",
+    )
+    parser.add_argument(
+        "--llm-cache-ttl-seconds",
+        type=int,
+        default=30 * 86400,
+        help="LLM 响应缓存有效期秒数（<=0 表示不过期，默认 30 天）",
+    )
+    parser.add_argument(
+        "--llm-cache-max-entries",
+        type=int,
+        default=100000,
+        help="LLM 响应缓存最大条目数，超出时淘汰最久未使用的条目",
+    )
+    parser.add_argument(
+        "--llm-cache-bypass",
+        action="store_true",
+        help="跳过缓存读取、强制请求 LLM（新响应仍写回缓存）",
+    )
+    parser.add_argument(
+        "--llm-retry-status",
+        action="append",
+        default=[],
+        help="按状态码覆盖 LLM 最大尝试次数，格式 状态码=次数，可重复"
+        "（默认 408/500/502/504=3，429/503=5，其余不重试）",
+    )
+    parser.add_argument(
+        "--llm-circuit-failure-threshold",
+        type=int,
+        default=5,
+        help="LLM 连续失败多少次后熔断，熔断期间直接走规则解析（默认 5）",
+    )
+    parser.add_argument(
+        "--llm-circuit-reset-seconds",
+        type=float,
+        default=60.0,
+        help="LLM 熔断冷却秒数，之后放行一次探测请求（默认 60）",
+    )
+    parser.add_argument(
+        "--llm-governor",
+        default="",
+        help="LLM 限流状态 SQLite 文件路径，本机多个进程共用同一文件时共享限额（默认不启用）",
+    )
+    parser.add_argument(
+        "--llm-requests-per-minute",
+        type=float,
+        default=60,
+        help="启用 --llm-governor 时所有进程合计的每分钟请求数上限（默认 60）",
+    )
+    parser.add_argument(
+        "--llm-max-in-flight",
+        type=int,
+        default=4,
+        help="启用 --llm-governor 时所有进程合计的在途请求数上限（默认 4）",
+    )
     parser.add_argument(
         "--schedule-daily",
         action="store_true",
@@ -66,7 +185,57 @@ def main() -> None:
         default=30,
         help="调度轮询间隔秒数",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="文章抓取解析并发数（默认 1，即串行）",
+    )
+    parser.add_argument(
+        "--per-host-workers",
+        type=int,
+        default=0,
+        help="同一 host 的最大并发数（<=0 时不单独限制）",
+    )
+    parser.add_argument(
+        "--llm-http-backend",
+        default="urllib",
+        choices=["urllib", "pooled"],
+        help="LLM 中转 HTTP 实现：urllib(默认，支持 HTTP(S)_PROXY)/pooled(复用长连接，配置代理时仍用 urllib)",
+    )
+    parser.add_argument(
+        "--http-backend",
+        default="urllib",
+        choices=["urllib", "pooled"],
+        help="页面抓取 HTTP 实现：urllib(默认)/pooled(按 host 复用长连接)",
+    )
+    parser.add_argument(
+        "--http-pool-size",
+        type=int,
+        default=4,
+        help="每个 host 保留的空闲长连接数",
+    )
+    parser.add_argument(
+        "--streaming-fetch",
+        action="store_true",
+        help="流式抓取文章：正文节点闭合后提前停止下载（article_raw 不保留尾部脚本）",
+    )
+    parser.add_argument(
+        "--list-cache",
+        default="",
+        help="列表页 ETag/Last-Modified 缓存文件路径，配置后列表未变化时跳过本次扫描",
+    )
+    parser.add_argument(
+        "--known-url-index",
+        default="none",
+        choices=["none", "set", "bloom"],
+        help="发现阶段已知 URL 索引：none(默认，批量查库)/set(进程内集合)/bloom(布隆过滤器)",
+    )
     args = parser.parse_args()
+    try:
+        llm_status_attempts = RetryPolicy.parse_status_attempts(args.llm_retry_status)
+    except ValueError as ex:
+        parser.error(str(ex))
 
     storage = create_storage(
         db_type=args.db_type,
@@ -76,12 +245,33 @@ def main() -> None:
         mysql_user=args.mysql_user,
         mysql_password=args.mysql_password,
         mysql_database=args.mysql_database,
+        sqlite_synchronous=args.sqlite_synchronous,
+        sqlite_cache_size=args.sqlite_cache_size,
+        sqlite_mmap_size=args.sqlite_mmap_size,
+        sqlite_busy_timeout_ms=args.sqlite_busy_timeout_ms,
+        mysql_pool_size=args.mysql_pool_size,
+        mysql_pool_max_lifetime_seconds=args.mysql_pool_max_lifetime,
+        mysql_pool_idle_timeout_seconds=args.mysql_pool_idle_timeout,
     )
     storage.init_db()
 
     rule_parser = TutoringInfoParser()
     selected_parser = rule_parser
+    llm_cache = None
+    llm_governor = None
     if args.parser_mode == "llm":
+        if args.llm_cache:
+            llm_cache = LlmResponseCache(
+                args.llm_cache,
+                ttl_seconds=args.llm_cache_ttl_seconds,
+                max_entries=args.llm_cache_max_entries,
+            )
+        if args.llm_governor:
+            llm_governor = LlmRequestGovernor(
+                args.llm_governor,
+                requests_per_minute=args.llm_requests_per_minute,
+                max_in_flight=args.llm_max_in_flight,
+            )
         llm_client = RelayLlmClient(
             config_path=args.llm_config,
             base_url=args.llm_base_url or None,
@@ -90,18 +280,48 @@ def main() -> None:
             timeout_seconds=args.llm_timeout_seconds
             if args.llm_timeout_seconds > 0
             else None,
+            response_cache=llm_cache,
+            bypass_cache=args.llm_cache_bypass,
+            retry_policy=RetryPolicy(status_attempts=llm_status_attempts),
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=args.llm_circuit_failure_threshold,
+                reset_timeout_seconds=args.llm_circuit_reset_seconds,
+            ),
+            governor=llm_governor,
+            http_backend=args.llm_http_backend,
         )
         selected_parser = LlmTutoringInfoParser(
             llm_client=llm_client,
             fallback_parser=rule_parser,
             enable_fallback=True,
+            chunk_workers=args.llm_chunk_workers,
+            max_input_tokens=args.llm_max_input_tokens,
+            max_output_tokens=args.llm_max_output_tokens,
+            block_cache=llm_cache,
+            bypass_block_cache=args.llm_cache_bypass,
+        )
+
+    fetcher = create_fetcher(
+        backend=args.http_backend,
+        pool_size=args.http_pool_size,
+        validator_cache_path=args.list_cache,
+    )
+
+    known_url_index = None
+    if args.known_url_index != "none":
+        known_url_index = KnownUrlIndex(
+            storage, use_bloom=args.known_url_index == "bloom"
         )
 
     service = CrawlService(
         storage=storage,
-        list_fetcher=HttpFetcher(),
-        article_fetcher=HttpFetcher(),
+        list_fetcher=fetcher,
+        article_fetcher=fetcher,
         parser=selected_parser,
+        max_workers=args.workers,
+        per_host_workers=args.per_host_workers,
+        streaming_fetch=args.streaming_fetch,
+        known_url_index=known_url_index,
     )
 
     if args.retry_task_id > 0:
@@ -124,6 +344,10 @@ def main() -> None:
         include_pattern=args.include_pattern or None,
         platform_code=args.platform_code,
     )
+    if llm_cache is not None:
+        result["llm_cache"] = llm_cache.stats()
+    if llm_governor is not None:
+        result["llm_governor"] = llm_governor.stats()
     print(result)
 
 
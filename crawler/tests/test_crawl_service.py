@@ -1,19 +1,27 @@
+import io
+import json
 import sys
 import tempfile
+import threading
 import unittest
 import os
+import sqlite3
+from contextlib import closing
 from pathlib import Path
+from types import SimpleNamespace
 from unittest.mock import patch
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from tutor_crawler.article import parse_article_html
 from tutor_crawler.fetcher import HttpFetcher
+from tutor_crawler.known_urls import KnownUrlIndex
 from tutor_crawler.parser import TutoringInfoParser
 from tutor_crawler.platform_router import PlatformParserRouter
-from tutor_crawler.service import CrawlService
-from tutor_crawler.storage import CrawlStorage
-from import_articles import _load_article_from_raw
+from tutor_crawler.service import CrawlService, StageTimings
+from tutor_crawler.storage import SCHEMA_VERSION, CrawlStorage
+from tutor_crawler.storage_rows import TUTORING_INFO_FIELDS
+from import_articles import _import_urls, _load_article_from_raw, _serve
 
 
 class FakeFetcher:
@@ -53,6 +61,7 @@ class CrawlServiceTest(unittest.TestCase):
         self.storage.init_db()
 
     def tearDown(self) -> None:
+        self.storage.close()
         if self._old_html_archive_env is None:
             os.environ.pop("TUTOR_CRAWLER_HTML_DIR", None)
         else:
@@ -116,6 +125,258 @@ class CrawlServiceTest(unittest.TestCase):
         self.assertEqual(self.storage.count_articles(), 2)
         self.assertEqual(self.storage.count_tutoring_info(), 2)
 
+    def test_daily_scan_should_process_new_urls_concurrently_when_workers_enabled(
+        self,
+    ):
+        list_url = "https://example.com/list-concurrent"
+        article_urls = [f"https://example.com/c{index}" for index in range(6)]
+        list_html = "".join(f'<a href="{url}">a</a>' for url in article_urls)
+        article_html = """
+            <html><head><title>并发</title></head>
+            <body>城市：杭州 科目：数学 薪资：100元/2小时</body></html>
+        """
+
+        service = CrawlService(
+            storage=self.storage,
+            list_fetcher=FakeFetcher({list_url: list_html}),
+            article_fetcher=FakeFetcher({url: article_html for url in article_urls}),
+            parser=TutoringInfoParser(),
+            max_workers=3,
+            per_host_workers=2,
+        )
+
+        result = service.run_daily_scan(list_url)
+
+        self.assertEqual(result["created_tasks"], 6)
+        self.assertEqual(result["succeeded"], 6)
+        self.assertEqual(result["failed"], 0)
+        self.assertIn("wall_seconds", result)
+        # 工作线程的连接在扫描结束后关闭，只剩主线程自己的连接。
+        self.assertEqual(
+            list(self.storage._connections), [threading.current_thread()]  # noqa: SLF001
+        )
+        for stage in ["list_fetch", "discover", "fetch", "parse", "save"]:
+            self.assertIn(stage, result["stage_seconds"])
+        for url in article_urls:
+            task = self.storage.get_task_by_url(url)
+            self.assertEqual(task["status"], "SUCCESS")
+            stages = [
+                (log["stage"], log["status"])
+                for log in self.storage.list_task_logs(int(task["id"]))
+            ]
+            self.assertEqual(
+                stages,
+                [
+                    ("FETCH", "RUNNING"),
+                    ("FETCH", "SUCCESS"),
+                    ("PARSE", "RUNNING"),
+                    ("PARSE", "SUCCESS"),
+                ],
+            )
+
+        # 单独执行的任务不计入下一次扫描的阶段耗时。
+        service.process_task(int(self.storage.get_task_by_url(article_urls[0])["id"]))
+        second = service.run_daily_scan(list_url)
+        self.assertEqual(second["created_tasks"], 0)
+        self.assertNotIn("fetch", second["stage_seconds"])
+        self.assertNotIn("save", second["stage_seconds"])
+
+    def test_process_tasks_should_not_let_one_host_starve_others(self):
+        article_html = """
+            <html><head><title>并发</title></head>
+            <body>城市：杭州 科目：数学 薪资：100元/2小时</body></html>
+        """
+        busy_urls = [f"https://busy.example.com/a{index}" for index in range(3)]
+        other_url = "https://other.example.com/b0"
+        fetcher = FakeFetcher({url: article_html for url in [*busy_urls, other_url]})
+        other_started = threading.Event()
+        original_fetch = fetcher.fetch
+
+        def fetch(url: str) -> str:
+            if url == other_url:
+                other_started.set()
+            elif url == busy_urls[0]:
+                # 同 host 任务若占满线程池，other host 的任务要等到超时才能开始。
+                self.assertTrue(other_started.wait(timeout=5))
+            return original_fetch(url)
+
+        fetcher.fetch = fetch
+        service = CrawlService(
+            storage=self.storage,
+            list_fetcher=FakeFetcher({}),
+            article_fetcher=fetcher,
+            parser=TutoringInfoParser(),
+            max_workers=2,
+            per_host_workers=1,
+        )
+        task_items = [
+            (self.storage.create_task(url, "AUTO"), url)
+            for url in [*busy_urls, other_url]
+        ]
+
+        results = service._process_tasks(task_items, StageTimings())  # noqa: SLF001
+
+        self.assertEqual(results, [True, True, True, True])
+
+    def test_process_task_should_fall_back_for_storage_without_batch_methods(self):
+        storage = self.storage
+
+        class _LegacyStorage:
+            # 只提供基线接口，没有 add_task_logs / reconcile_tutoring_infos。
+            get_task = storage.get_task
+            update_task_status = storage.update_task_status
+            add_task_log = storage.add_task_log
+            save_article = storage.save_article
+            save_tutoring_info = storage.save_tutoring_info
+            delete_tutoring_info_by_article = storage.delete_tutoring_info_by_article
+
+        article_url = "https://example.com/legacy"
+        article_html = """
+            <html><head><title>家教</title></head><body>
+            城市：上海 区域：浦东 年级：高二 科目：数学 地址：张江
+            </body></html>
+        """
+        task_id = self.storage.create_task(article_url, "MANUAL")
+        service = CrawlService(
+            storage=_LegacyStorage(),
+            list_fetcher=FakeFetcher({}),
+            article_fetcher=FakeFetcher({article_url: article_html}),
+            parser=TutoringInfoParser(),
+        )
+
+        self.assertTrue(service.process_task(task_id))
+        self.assertTrue(service.process_task(task_id))
+        self.assertEqual(self.storage.count_tutoring_info_by_article(article_url), 1)
+        stages = [row["stage"] for row in self.storage.list_task_logs(task_id)]
+        self.assertEqual(stages[:4], ["FETCH", "FETCH", "PARSE", "PARSE"])
+
+    def test_daily_scan_should_skip_discovery_when_list_not_modified(self):
+        class _NotModifiedFetcher(FakeFetcher):
+            def fetch_if_modified(self, url: str):
+                return None
+
+        article_fetcher = FlakyFetcher(fail_times=0, success_html="")
+        service = CrawlService(
+            storage=self.storage,
+            list_fetcher=_NotModifiedFetcher({}),
+            article_fetcher=article_fetcher,
+            parser=TutoringInfoParser(),
+        )
+
+        result = service.run_daily_scan("https://example.com/list-304")
+
+        self.assertTrue(result["not_modified"])
+        self.assertEqual(result["discovered"], 0)
+        self.assertEqual(result["created_tasks"], 0)
+        self.assertEqual(article_fetcher.calls, 0)
+
+    def test_daily_scan_should_commit_list_validators_only_after_tasks_created(self):
+        list_url = "https://example.com/list-validators"
+        article_url = "https://mp.weixin.qq.com/s/validators-a"
+
+        class _ConditionalFetcher(FakeFetcher):
+            committed: list[str] = []
+
+            def fetch_if_modified(self, url: str):
+                return self.fetch(url)
+
+            def commit_validators(self, url: str) -> None:
+                self.committed.append(url)
+
+        list_fetcher = _ConditionalFetcher({list_url: f'<a href="{article_url}">a</a>'})
+        service = CrawlService(
+            storage=self.storage,
+            list_fetcher=list_fetcher,
+            article_fetcher=FakeFetcher({article_url: "<html></html>"}),
+            parser=TutoringInfoParser(),
+        )
+        with patch.object(
+            self.storage, "create_task", side_effect=RuntimeError("db down")
+        ):
+            with self.assertRaises(RuntimeError):
+                service.run_daily_scan(list_url)
+        self.assertEqual(list_fetcher.committed, [])
+
+        service.run_daily_scan(list_url)
+        self.assertEqual(list_fetcher.committed, [list_url])
+
+    def test_storage_should_use_wal_and_one_connection_per_thread(self):
+        first = self.storage._connection()  # noqa: SLF001 - test helper
+        self.assertIs(first, self.storage._connection())  # noqa: SLF001
+        mode = first.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+
+        other = []
+        worker = threading.Thread(
+            target=lambda: other.append(self.storage._connection())  # noqa: SLF001
+        )
+        worker.start()
+        worker.join()
+        self.assertIsNot(first, other[0])
+        # 已退出线程的连接被回收，当前线程的连接保留。
+        self.assertEqual(self.storage.prune_connections(), 1)
+        self.assertIs(first, self.storage._connection())  # noqa: SLF001
+        with self.assertRaises(sqlite3.ProgrammingError):
+            other[0].execute("SELECT 1")
+
+        with self.assertRaises(ValueError):
+            CrawlStorage(str(self.db_path), synchronous="sometimes")
+
+    def test_init_db_should_skip_migrations_when_schema_is_current(self):
+        self.assertEqual(self.storage.schema_version(), SCHEMA_VERSION)
+        with patch.object(
+            CrawlStorage, "_migrate_v1_baseline", side_effect=AssertionError("rerun")
+        ):
+            self.storage.init_db()
+
+        # 升级前的旧库没有版本表：迁移可重复执行，补齐后记录全部版本。
+        with closing(self.storage._conn()) as conn:  # noqa: SLF001 - test helper
+            conn.execute("DROP TABLE schema_version")
+            conn.commit()
+        self.storage.init_db()
+        with closing(self.storage._conn()) as conn:  # noqa: SLF001 - test helper
+            rows = conn.execute(
+                "SELECT version FROM schema_version ORDER BY version"
+            ).fetchall()
+        versions = [row["version"] for row in rows]
+        self.assertEqual(versions, list(range(1, SCHEMA_VERSION + 1)))
+
+    def test_get_existing_task_urls_should_query_in_batches(self):
+        urls = [f"https://example.com/bulk-{index}" for index in range(7)]
+        for url in urls[:5]:
+            self.storage.create_task(url, "AUTO")
+        self.storage.create_task(urls[5], "AUTO", platform_code="ALT_PLATFORM")
+
+        existing = self.storage.get_existing_task_urls(urls, batch_size=2)
+
+        self.assertEqual(existing, set(urls[:5]))
+
+    def test_daily_scan_should_dedup_with_known_url_index(self):
+        list_url = "https://example.com/list-known"
+        old_url = "https://example.com/known-old"
+        new_url = "https://example.com/known-new"
+        self.storage.create_task(old_url, "AUTO")
+        list_html = f'<a href="{old_url}">old</a><a href="{new_url}">new</a>'
+        article_html = """
+            <html><head><title>索引</title></head>
+            <body>城市：杭州 科目：数学 薪资：100元/2小时</body></html>
+        """
+
+        for use_bloom in [False, True]:
+            index = KnownUrlIndex(self.storage, use_bloom=use_bloom)
+            service = CrawlService(
+                storage=self.storage,
+                list_fetcher=FakeFetcher({list_url: list_html}),
+                article_fetcher=FakeFetcher({new_url: article_html}),
+                parser=TutoringInfoParser(),
+                known_url_index=index,
+            )
+            result = service.run_daily_scan(list_url)
+            self.assertEqual(result["created_tasks"], 0 if use_bloom else 1)
+            self.assertEqual(index.filter_new([old_url, new_url], "MIAOMIAO_WECHAT"), [])
+
+        self.assertEqual(self._task_count_by_url(new_url), 1)
+
     def test_daily_scan_should_discover_links_from_wechat_appmsg_list_json(self):
         list_url = "https://mp.weixin.qq.com/mp/homepage?action=appmsg_list&f=json"
         article1 = "https://mp.weixin.qq.com/s?__biz=abc&mid=1&idx=1&sn=111"
@@ -223,6 +484,84 @@ class CrawlServiceTest(unittest.TestCase):
         self.assertEqual(task["status"], "SUCCESS")
         self.assertGreaterEqual(len(logs), 2)
 
+    def test_process_task_should_share_connections_and_keep_failure_logs(self):
+        ok_url = "https://example.com/uow-ok"
+        broken_url = "https://example.com/uow-broken"
+        article_html = """
+            <html><head><title>事务</title></head>
+            <body>城市：杭州 科目：数学 薪资：100元/2小时</body></html>
+        """
+        service = CrawlService(
+            storage=self.storage,
+            list_fetcher=FakeFetcher({}),
+            article_fetcher=FakeFetcher({ok_url: article_html, broken_url: article_html}),
+            parser=TutoringInfoParser(),
+        )
+        ok_task_id = self.storage.create_task(ok_url, "AUTO")
+        broken_task_id = self.storage.create_task(broken_url, "AUTO")
+
+        statements = []
+        conn = self.storage._connection()  # noqa: SLF001 - test helper
+        conn.set_trace_callback(statements.append)
+        self.assertTrue(service.process_task(ok_task_id))
+        conn.set_trace_callback(None)
+        self.assertEqual(statements.count("COMMIT"), 3)
+
+        with patch.object(
+            self.storage, "save_tutoring_infos", side_effect=RuntimeError("disk full")
+        ):
+            self.assertFalse(service.process_task(broken_task_id))
+
+        self.assertEqual(self.storage.get_task(broken_task_id)["status"], "FAILED")
+        logs = self.storage.list_task_logs(broken_task_id)
+        self.assertEqual(logs[-1]["stage"], "EXECUTE")
+        self.assertEqual(logs[-1]["error_message"], "disk full")
+        self.assertEqual(self._article_platform_code(broken_url), "")
+
+    def test_batch_writes_should_insert_all_rows_in_one_commit(self):
+        task_id = self.storage.create_task("https://example.com/batch", "AUTO")
+        base = {field: "" for field in TUTORING_INFO_FIELDS}
+        infos = [
+            {**base, "source_url": f"https://example.com/batch#item-{index}"}
+            for index in range(1, 26)
+        ]
+
+        statements = []
+        conn = self.storage._connection()  # noqa: SLF001 - test helper
+        conn.set_trace_callback(statements.append)
+        self.storage.save_tutoring_infos(infos)
+        self.storage.add_task_logs(
+            [
+                {"task_id": task_id, "stage": "FETCH", "status": "SUCCESS"},
+                {"task_id": task_id, "stage": "PARSE", "status": "RUNNING"},
+            ]
+        )
+        conn.set_trace_callback(None)
+
+        self.assertEqual(statements.count("COMMIT"), 2)
+        self.assertEqual(self.storage.count_tutoring_info(), 25)
+        logs = self.storage.list_task_logs(task_id)
+        self.assertEqual([log["stage"] for log in logs], ["FETCH", "PARSE"])
+        self.assertEqual(logs[0]["runtime"], "python")
+
+    def test_save_article_should_keep_published_at_when_new_value_empty(self):
+        article = {
+            "source_url": "https://example.com/published",
+            "title": "家教",
+            "content_html": "<div id='js_content'></div>",
+            "content_text": "",
+            "published_at": "2025-02-10 10:00:00",
+        }
+        self.storage.save_article(article)
+        self.storage.save_article({**article, "published_at": ""})
+
+        with self.storage._conn() as conn:  # noqa: SLF001 - test helper
+            row = conn.execute(
+                "SELECT published_at FROM article_raw WHERE source_url=?",
+                (article["source_url"],),
+            ).fetchone()
+        self.assertEqual(row["published_at"], "2025-02-10 10:00:00")
+
     def test_daily_success_rate_should_include_auto_and_manual(self):
         day = "2026-02-16"
         auto_task = self.storage.create_task("https://example.com/auto", "AUTO")
@@ -332,8 +671,10 @@ class CrawlServiceTest(unittest.TestCase):
             def __init__(self, body: str):
                 self.body = body.encode("utf-8")
 
-            def read(self):
-                return self.body
+            def read(self, amt=None):
+                size = len(self.body) if amt is None else amt
+                chunk, self.body = self.body[:size], self.body[size:]
+                return chunk
 
             def __enter__(self):
                 return self
@@ -727,6 +1068,115 @@ class CrawlServiceTest(unittest.TestCase):
             self.storage.get_tutoring_info_by_url(article_url + "#item-2")
         )
 
+    def test_reconcile_should_keep_ids_of_unchanged_items(self):
+        article_url = "https://example.com/reconcile"
+        base = {field: "" for field in TUTORING_INFO_FIELDS}
+        first = {**base, "source_url": article_url, "subject": "数学"}
+        second = {**base, "source_url": article_url + "#item-2", "subject": "英语"}
+        third = {**base, "source_url": article_url + "#item-3", "subject": "物理"}
+        self.storage.reconcile_tutoring_infos(article_url, [first, second, third])
+        ids = {
+            url: self.storage.get_tutoring_info_by_url(url)["id"]
+            for url in [article_url, article_url + "#item-2"]
+        }
+
+        result = self.storage.reconcile_tutoring_infos(
+            article_url,
+            [
+                first,
+                {**second, "subject": "化学"},
+                {**base, "source_url": article_url + "#item-4", "subject": "生物"},
+            ],
+        )
+
+        self.assertEqual(
+            result, {"inserted": 1, "updated": 1, "deleted": 1, "unchanged": 1}
+        )
+        self.assertEqual(
+            self.storage.get_tutoring_info_by_url(article_url)["id"], ids[article_url]
+        )
+        updated = self.storage.get_tutoring_info_by_url(article_url + "#item-2")
+        self.assertEqual(updated["id"], ids[article_url + "#item-2"])
+        self.assertEqual(updated["subject"], "化学")
+        self.assertIsNone(
+            self.storage.get_tutoring_info_by_url(article_url + "#item-3")
+        )
+        self.assertEqual(self.storage.count_tutoring_info(), 3)
+
+    def test_reconcile_should_keep_ids_when_item_inserted_at_top(self):
+        article_url = "https://example.com/reconcile-shift"
+        base = {field: "" for field in TUTORING_INFO_FIELDS}
+
+        def item(index: int, subject: str) -> dict:
+            suffix = "" if index == 1 else f"#item-{index}"
+            return {**base, "source_url": article_url + suffix, "subject": subject}
+
+        self.storage.reconcile_tutoring_infos(
+            article_url, [item(1, "数学"), item(2, "英语"), item(3, "物理")]
+        )
+        rows = [
+            self.storage.get_tutoring_info_by_url(item(index, "")["source_url"])
+            for index in (1, 2, 3)
+        ]
+        ids = {row["subject"]: row["id"] for row in rows}
+
+        result = self.storage.reconcile_tutoring_infos(
+            article_url,
+            [item(1, "化学"), item(2, "数学"), item(3, "英语"), item(4, "物理")],
+        )
+
+        self.assertEqual(
+            result, {"inserted": 1, "updated": 3, "deleted": 0, "unchanged": 0}
+        )
+        for index, subject in [(2, "数学"), (3, "英语"), (4, "物理")]:
+            row = self.storage.get_tutoring_info_by_url(item(index, "")["source_url"])
+            self.assertEqual((row["id"], row["subject"]), (ids[subject], subject))
+            self.assertEqual(row["item_index"], index)
+        self.assertEqual(self.storage.count_tutoring_info(), 4)
+
+    def test_backfill_should_fill_article_url_and_item_index(self):
+        article_url = "https://example.com/backfill"
+        base = {field: "" for field in TUTORING_INFO_FIELDS}
+        self.storage.save_tutoring_infos(
+            [
+                {**base, "source_url": article_url},
+                {**base, "source_url": article_url + "#item-2"},
+                {**base, "source_url": article_url + "#item-12"},
+                {**base, "source_url": "https://example.com/other"},
+            ]
+        )
+        with closing(self.storage._conn()) as conn:  # noqa: SLF001 - test helper
+            conn.execute("UPDATE tutoring_info SET article_url='', item_index=1")
+            conn.commit()
+
+        self.assertEqual(self.storage.count_tutoring_info_by_article(article_url), 0)
+        self.assertEqual(self.storage.backfill_article_urls(batch_size=3), 4)
+
+        self.assertEqual(self.storage.count_tutoring_info_by_article(article_url), 3)
+        row = self.storage.get_tutoring_info_by_url(article_url + "#item-12")
+        self.assertEqual(row["article_url"], article_url)
+        self.assertEqual(row["item_index"], 12)
+        self.storage.delete_tutoring_info_by_article(article_url)
+        self.assertEqual(self.storage.count_tutoring_info(), 1)
+
+    def test_backfill_should_finish_when_computed_article_url_stays_empty(self):
+        base = {field: "" for field in TUTORING_INFO_FIELDS}
+        self.storage.save_tutoring_infos(
+            [
+                {**base, "source_url": "#item-3"},
+                {**base, "source_url": "https://example.com/after#item-1"},
+            ]
+        )
+        with closing(self.storage._conn()) as conn:  # noqa: SLF001 - test helper
+            conn.execute("UPDATE tutoring_info SET article_url='', item_index=1")
+            conn.commit()
+
+        self.storage.backfill_article_urls(batch_size=1)
+
+        self.assertEqual(
+            self.storage.count_tutoring_info_by_article("https://example.com/after"), 1
+        )
+
     def test_reprocess_empty_parse_should_keep_existing_structured_rows(self):
         article_url = "https://example.com/keep-old-on-empty"
         task_id = self.storage.create_task(article_url, "MANUAL")
@@ -860,6 +1310,14 @@ class CrawlServiceTest(unittest.TestCase):
         self.assertTrue(html_file.exists())
         self.assertEqual(html_file.read_text(encoding="utf-8"), html)
 
+        self.storage.save_article(dict(article, content_truncated=True))
+        with self.storage._conn() as conn:  # noqa: SLF001 - test helper
+            row = conn.execute(
+                "SELECT content_truncated FROM article_raw WHERE source_url=?",
+                (article_url,),
+            ).fetchone()
+        self.assertEqual(row["content_truncated"], 1)
+
     def test_load_article_from_raw_should_restore_html_from_stored_relative_path(self):
         article_url = "https://example.com/article-restore-html"
         html = "<html><body><div id='js_content'>地址：西湖区</div></body></html>"
@@ -878,6 +1336,164 @@ class CrawlServiceTest(unittest.TestCase):
         self.assertIsNotNone(loaded)
         self.assertEqual(loaded["content_html"], html)
 
+    def test_serve_should_answer_each_job_line_and_survive_bad_input(self):
+        article_url = "https://example.com/serve-a1"
+        article_html = """
+            <html><head><title>家教信息</title></head>
+            <body>城市：上海 年级：高二 科目：数学 地址：张江 薪资：300元/2小时</body></html>
+        """
+        service = CrawlService(
+            storage=self.storage,
+            list_fetcher=FakeFetcher({}),
+            article_fetcher=FakeFetcher({article_url: article_html}),
+            parser=TutoringInfoParser(),
+        )
+        args = SimpleNamespace(
+            platform_code="MIAOMIAO_WECHAT",
+            source_type="MANUAL",
+            from_article_raw=False,
+        )
+        jobs = io.StringIO(
+            json.dumps({"id": "job-1", "url": article_url})
+            + "\n\nnot-json\n"
+            + json.dumps({"id": "job-3", "url": article_url, "from_article_raw": True})
+            + "\n"
+        )
+        out = io.StringIO()
+
+        _serve(service, args, jobs, out)
+
+        results = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]["id"], "job-1")
+        self.assertEqual(results[0]["success"], 1)
+        self.assertEqual(results[0]["items"][0]["tutoring_rows"], 1)
+        self.assertIn("error", results[1])
+        self.assertEqual(results[2]["id"], "job-3")
+        self.assertEqual(results[2]["items"][0]["task_id"], results[0]["items"][0]["task_id"])
+        self.assertTrue(results[2]["items"][0]["success"])
+
+    def test_import_urls_should_keep_order_with_workers_and_resume_from_checkpoint(
+        self,
+    ):
+        article_html = """
+            <html><head><title>家教信息</title></head>
+            <body>城市：上海 年级：高二 科目：数学 地址：张江 薪资：300元/2小时</body></html>
+        """
+        urls = [f"https://example.com/batch-{index}" for index in range(5)]
+        pages = {url: article_html for url in urls}
+        pages[urls[2]] = RuntimeError("temporary network error")
+        fetcher = FakeFetcher(pages)
+        service = CrawlService(
+            storage=self.storage,
+            list_fetcher=FakeFetcher({}),
+            article_fetcher=fetcher,
+            parser=TutoringInfoParser(),
+        )
+        checkpoint = str(Path(self.tempdir.name) / "import.checkpoint")
+
+        first = _import_urls(
+            service,
+            urls,
+            platform_code="MIAOMIAO_WECHAT",
+            source_type="MANUAL",
+            from_article_raw=False,
+            workers=3,
+            batch_size=2,
+            checkpoint_path=checkpoint,
+        )
+
+        self.assertEqual([item["source_url"] for item in first["items"]], urls)
+        self.assertEqual((first["success"], first["failed"]), (4, 1))
+        with open(checkpoint, encoding="utf-8") as file:
+            self.assertEqual(len(file.read().splitlines()), 5)
+
+        pages[urls[2]] = article_html
+        fetched: list[str] = []
+        original_fetch = fetcher.fetch
+
+        def tracking_fetch(url: str) -> str:
+            fetched.append(url)
+            return original_fetch(url)
+
+        fetcher.fetch = tracking_fetch
+        second = _import_urls(
+            service,
+            urls,
+            platform_code="MIAOMIAO_WECHAT",
+            source_type="MANUAL",
+            from_article_raw=False,
+            workers=3,
+            batch_size=2,
+            checkpoint_path=checkpoint,
+        )
+
+        self.assertEqual(fetched, [urls[2]])
+        self.assertEqual(second["success"], 5)
+        self.assertEqual([item["source_url"] for item in second["items"]], urls)
+
+        # 存储异常只影响对应 URL，其余照常导入并写入断点。
+        extra = [f"https://example.com/batch-extra-{index}" for index in range(3)]
+        pages.update({url: article_html for url in extra})
+        original_create_task = self.storage.create_task
+
+        def flaky_create_task(source_url, *args, **kwargs):
+            if source_url == extra[1]:
+                raise RuntimeError("db down")
+            return original_create_task(source_url, *args, **kwargs)
+
+        with patch.object(self.storage, "create_task", side_effect=flaky_create_task):
+            third = _import_urls(
+                service,
+                extra,
+                platform_code="MIAOMIAO_WECHAT",
+                source_type="MANUAL",
+                from_article_raw=False,
+                workers=3,
+                checkpoint_path=checkpoint,
+            )
+        self.assertEqual((third["success"], third["failed"]), (2, 1))
+        self.assertEqual(third["items"][1]["error"], "db down")
+        with open(checkpoint, encoding="utf-8") as file:
+            self.assertEqual(len(file.read().splitlines()), 9)
+
+    def test_import_urls_should_not_batch_without_checkpoint(self):
+        article_html = """
+            <html><head><title>家教信息</title></head>
+            <body>城市：上海 年级：高二 科目：数学 地址：张江 薪资：300元/2小时</body></html>
+        """
+        urls = [f"https://example.com/unbatched-{index}" for index in range(3)]
+        fetcher = FakeFetcher({url: article_html for url in urls})
+        service = CrawlService(
+            storage=self.storage,
+            list_fetcher=FakeFetcher({}),
+            article_fetcher=fetcher,
+            parser=TutoringInfoParser(),
+        )
+        last_started = threading.Event()
+        original_fetch = fetcher.fetch
+
+        def slow_first_fetch(url: str) -> str:
+            if url == urls[0]:
+                # 分批时第 3 个 URL 要等第 1 批结束才会开始，这里会等到超时。
+                self.assertTrue(last_started.wait(timeout=5))
+            if url == urls[2]:
+                last_started.set()
+            return original_fetch(url)
+
+        fetcher.fetch = slow_first_fetch
+        result = _import_urls(
+            service,
+            urls,
+            platform_code="MIAOMIAO_WECHAT",
+            source_type="MANUAL",
+            from_article_raw=False,
+            workers=2,
+            batch_size=2,
+        )
+
+        self.assertEqual(result["success"], 3)
+
     def test_daily_scan_should_support_same_url_across_different_platforms(self):
         list_url = "https://example.com/list-platform-idempotent"
         article_url = "https://example.com/platform-same-url"
@@ -0,0 +1,311 @@
+import gzip
+import sys
+import tempfile
+import threading
+import unittest
+import zlib
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tutor_crawler.article import StreamingArticleExtractor
+from tutor_crawler.fetcher import HttpFetcher, PooledHttpFetcher, create_fetcher
+from tutor_crawler.http_cache import ValidatorCache
+from tutor_crawler.http_pool import HttpConnectionPool
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    routes: dict[str, tuple[int, dict[str, str], bytes]] = {}
+    requests: list[tuple[str, dict[str, str]]] = []
+    client_ports: list[int] = []
+
+    def do_GET(self):  # noqa: N802
+        type(self).requests.append((self.path, dict(self.headers.items())))
+        type(self).client_ports.append(self.client_address[1])
+        status, headers, body = type(self).routes.get(
+            self.path, (404, {}, b"not found")
+        )
+        etag = headers.get("ETag")
+        if etag and self.headers.get("If-None-Match") == etag:
+            status, body = 304, b""
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        return
+
+
+class _DroppingHandler(BaseHTTPRequestHandler):
+    """应答后静默关闭连接（不发 Connection: close），模拟服务端回收空闲长连接。"""
+
+    protocol_version = "HTTP/1.1"
+    requests: list[str] = []
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        type(self).requests.append(self.command)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"ok")
+        self.close_connection = True
+
+    do_GET = _reply  # noqa: N815
+    do_POST = _reply  # noqa: N815
+
+    def log_message(self, format, *args):  # noqa: A002
+        return
+
+
+class _QuietServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # 流式抓取会提前断开连接，服务端写入失败属于预期行为。
+        return
+
+
+class _DesktopBlockedFetcher(HttpFetcher):
+    def __init__(self, clock: list[float]) -> None:
+        super().__init__(profile_ttl_seconds=60, time_func=lambda: clock[0])
+        self.calls: list[str] = []
+
+    def _fetch_once(self, url: str, headers: dict[str, str]) -> str:
+        is_mobile = "iPhone" in headers["User-Agent"]
+        self.calls.append("mobile" if is_mobile else "desktop")
+        if is_mobile:
+            return '<div id="js_content">城市：杭州</div>'
+        return '<div class="weui-msg__title">环境异常</div>'
+
+
+class HeaderProfileTest(unittest.TestCase):
+    def test_should_try_learned_profile_first_until_ttl_expires(self):
+        clock = [0.0]
+        fetcher = _DesktopBlockedFetcher(clock)
+
+        fetcher.fetch("https://mp.weixin.qq.com/s/a1")
+        fetcher.fetch("https://mp.weixin.qq.com/s/a2")
+        clock[0] = 61.0
+        fetcher.fetch("https://mp.weixin.qq.com/s/a3")
+
+        self.assertEqual(
+            fetcher.calls,
+            ["desktop", "mobile", "mobile", "desktop", "mobile"],
+        )
+        stats = fetcher.profile_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 2)
+        self.assertEqual(stats["hosts"], {"mp.weixin.qq.com": "mobile"})
+
+
+class StreamingArticleExtractorTest(unittest.TestCase):
+    def _feed_until_done(self, extractor, chunks):
+        fed = 0
+        for chunk in chunks:
+            extractor.feed_chunk(chunk)
+            fed += 1
+            if extractor.done:
+                break
+        return fed
+
+    def test_should_read_tail_after_root_close_until_published_at_found(self):
+        extractor = StreamingArticleExtractor()
+        chunks = [
+            '<html><head><title>杭州家教</title></head><body>'
+            '<div id="js_content"><p>科目：数学</p>',
+            "</div><script>var a = 1;</script><script>var c",
+            "t = '1739152800';</script>",
+            "<script>var noise = 1;</script>",
+        ]
+
+        fed = self._feed_until_done(extractor, chunks)
+
+        self.assertEqual(fed, 3)
+        self.assertNotIn("var a", extractor.html())
+        article = extractor.article("https://mp.weixin.qq.com/s/x")
+        self.assertEqual(article["title"], "杭州家教")
+        self.assertEqual(
+            article["published_at"],
+            datetime.fromtimestamp(1739152800).strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        self.assertIn("科目：数学", article["content_text"])
+
+    def test_should_stop_after_tail_limit_without_published_at(self):
+        extractor = StreamingArticleExtractor(tail_limit=64)
+        chunks = [
+            '<div id="js_content"><p>科目：数学</p></div>',
+            "<script>" + "x" * 80 + "</script>",
+            "<script>var ct = '1739152800';</script>",
+        ]
+
+        fed = self._feed_until_done(extractor, chunks)
+
+        self.assertEqual(fed, 2)
+        self.assertEqual(extractor.article("https://mp.weixin.qq.com/s/x")["published_at"], "")
+
+
+class _LocalServerTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        _Handler.routes = {}
+        _Handler.requests = []
+        _Handler.client_ports = []
+        self.server = _QuietServer(("127.0.0.1", 0), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class PooledHttpFetcherTest(_LocalServerTestCase):
+    def test_should_reuse_keep_alive_connection_across_requests(self):
+        _Handler.routes["/a1"] = (200, {}, "城市：杭州".encode("utf-8"))
+        _Handler.routes["/a2"] = (200, {}, "城市：上海".encode("utf-8"))
+        fetcher = PooledHttpFetcher(timeout=5)
+
+        first = fetcher.fetch(self.base_url + "/a1")
+        second = fetcher.fetch(self.base_url + "/a2")
+        fetcher.close()
+
+        self.assertEqual(first, "城市：杭州")
+        self.assertEqual(second, "城市：上海")
+        self.assertEqual(fetcher.pool.created_connections, 1)
+        self.assertEqual(fetcher.pool.reused_connections, 1)
+        self.assertEqual(len(set(_Handler.client_ports)), 1)
+
+    def test_should_follow_redirect_and_evict_idle_connections(self):
+        _Handler.routes["/old"] = (302, {"Location": "/new"}, b"")
+        _Handler.routes["/new"] = (200, {}, b"<div id=\"js_content\">ok</div>")
+        fetcher = PooledHttpFetcher(timeout=5, idle_timeout_seconds=0)
+
+        html = fetcher.fetch(self.base_url + "/old")
+
+        self.assertIn("js_content", html)
+        self.assertEqual(
+            [path for path, _ in _Handler.requests], ["/old", "/new"]
+        )
+        self.assertEqual(fetcher.pool.reused_connections, 0)
+        fetcher.close()
+
+    def test_should_decode_gzip_and_deflate_responses_and_count_bytes(self):
+        html = ("<div id=\"js_content\">城市：杭州</div>" * 200).encode("utf-8")
+        _Handler.routes["/gzip"] = (
+            200,
+            {"Content-Encoding": "gzip"},
+            gzip.compress(html),
+        )
+        _Handler.routes["/deflate"] = (
+            200,
+            {"Content-Encoding": "deflate"},
+            zlib.compress(html),
+        )
+        fetcher = PooledHttpFetcher(timeout=5)
+
+        gzip_html = fetcher.fetch(self.base_url + "/gzip")
+        deflate_html = fetcher.fetch(self.base_url + "/deflate")
+        fetcher.close()
+
+        self.assertEqual(gzip_html, html.decode("utf-8"))
+        self.assertEqual(deflate_html, html.decode("utf-8"))
+        self.assertIn("gzip", _Handler.requests[0][1]["Accept-Encoding"])
+        stats = fetcher.transfer_stats.snapshot()
+        self.assertEqual(stats["responses"], 2)
+        self.assertEqual(stats["decoded_bytes"], len(html) * 2)
+        self.assertLess(stats["wire_bytes"], stats["decoded_bytes"])
+
+    def test_fetch_article_should_stop_reading_after_content_root_closed(self):
+        head = (
+            "<html><head><title>家教信息</title>"
+            '<meta property="article:published_time" content="2026-02-16 10:00:00"/>'
+            "</head><body>"
+            '<div id="js_content"><div><p>城市：杭州</p></div>'
+            "<div><p>科目：数学</p></div></div>"
+        )
+        trailing = "<script>var noise = '" + "x" * (1024 * 1024) + "';</script>"
+        body = (head + trailing + "</body></html>").encode("utf-8")
+        _Handler.routes["/stream"] = (200, {}, body)
+        fetcher = PooledHttpFetcher(timeout=5)
+
+        article = fetcher.fetch_article(self.base_url + "/stream")
+        fetcher.close()
+
+        self.assertEqual(article["title"], "家教信息")
+        self.assertEqual(article["published_at"], "2026-02-16 10:00:00")
+        self.assertIn("城市：杭州", article["content_text"])
+        self.assertNotIn("var noise", article["content_html"])
+        self.assertTrue(article["content_truncated"])
+        self.assertLess(fetcher.transfer_stats.wire_bytes, len(body) // 4)
+
+    def test_fetch_if_modified_should_return_none_on_304_for_both_backends(self):
+        _Handler.routes["/list"] = (
+            200,
+            {"ETag": '"v1"'},
+            b'<a href="https://example.com/a1">a1</a>',
+        )
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache_path = str(Path(temp_dir) / "validators.json")
+            for backend in ["pooled", "urllib"]:
+                fetcher = create_fetcher(
+                    backend=backend, timeout=5, validator_cache_path=cache_path
+                )
+                url = f"{self.base_url}/list?backend={backend}"
+                _Handler.routes[f"/list?backend={backend}"] = _Handler.routes["/list"]
+
+                first = fetcher.fetch_if_modified(url)
+                # 未 commit 前不落盘，再次请求仍拿到完整列表页。
+                self.assertEqual(fetcher.fetch_if_modified(url), first)
+                fetcher.commit_validators(url)
+                second = fetcher.fetch_if_modified(url)
+                fetcher.close()
+
+                self.assertIn("example.com/a1", first)
+                self.assertIsNone(second)
+
+            reloaded = ValidatorCache(cache_path)
+            self.assertEqual(
+                reloaded.get(f"{self.base_url}/list?backend=pooled")["etag"], '"v1"'
+            )
+        self.assertEqual(
+            _Handler.requests[-1][1].get("If-None-Match"), '"v1"'
+        )
+
+    def test_pool_should_resend_only_idempotent_requests_on_stale_connection(self):
+        _DroppingHandler.requests = []
+        server = _QuietServer(("127.0.0.1", 0), _DroppingHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        url = f"http://127.0.0.1:{server.server_address[1]}/x"
+        pool = HttpConnectionPool(timeout=5)
+        try:
+            for _ in range(2):
+                with pool.request("GET", url) as response:
+                    self.assertEqual(response.read(), b"ok")
+            with self.assertRaises(Exception):
+                with pool.request("POST", url, body=b"{}") as response:
+                    response.read()
+        finally:
+            pool.close()
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(_DroppingHandler.requests, ["GET", "GET"])
+
+    def test_create_fetcher_should_default_to_urllib(self):
+        self.assertIs(type(create_fetcher()), HttpFetcher)
+
+    def test_create_fetcher_should_reject_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            create_fetcher(backend="unknown")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tutor_crawler.llm_cache import LlmResponseCache
+from tutor_crawler.llm_client import RelayLlmClient
+
+
+class _CountingClient(RelayLlmClient):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(
+            config_path="/nonexistent.json",
+            base_url="https://relay.example.com/v1",
+            api_key="key",
+            model="model-a",
+            **kwargs,
+        )
+        self.requests = 0
+
+    def _request_completion(self, system_prompt: str, user_prompt: str) -> str:
+        self.requests += 1
+        if user_prompt == "broken":
+            return "not json"
+        return f'{{"items": [], "n": {self.requests}}}'
+
+
+class LlmResponseCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tempdir.name) / "llm_cache.db")
+        self.clock = [1000.0]
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _cache(self, **kwargs) -> LlmResponseCache:
+        return LlmResponseCache(self.path, time_func=lambda: self.clock[0], **kwargs)
+
+    def test_client_should_reuse_cached_response_and_honor_bypass(self):
+        cache = self._cache()
+        client = _CountingClient(response_cache=cache)
+
+        first = client.chat_completion("system", "user")
+        second = client.chat_completion("system", "user")
+        client.chat_completion("system", "broken")
+        client.chat_completion("system", "broken")
+        bypass = _CountingClient(response_cache=cache, bypass_cache=True)
+        refreshed = bypass.chat_completion("system", "user")
+
+        self.assertEqual(first, second)
+        self.assertEqual(client.requests, 3)
+        self.assertEqual(bypass.requests, 1)
+        self.assertEqual(client.chat_completion("system", "user"), refreshed)
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["writes"], stats["entries"]), (2, 2, 1))
+        cache.close()
+
+    def test_should_expire_by_ttl_and_evict_least_recently_used(self):
+        cache = self._cache(ttl_seconds=60, max_entries=2)
+        cache.put("a", "{}")
+        self.clock[0] += 1
+        cache.put("b", "{}")
+        self.clock[0] += 1
+        cache.get("a")
+        cache.put("c", "{}")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "{}")
+        self.clock[0] += 120
+        self.assertIsNone(cache.get("c"))
+        self.assertEqual(cache.stats()["evictions"], 2)
+        cache.close()
+
+        reopened = self._cache(ttl_seconds=0)
+        self.assertEqual(reopened.get("a"), "{}")
+        reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
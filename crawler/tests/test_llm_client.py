@@ -1,12 +1,19 @@
 import json
+import os
 import sys
 import tempfile
+import threading
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
+from unittest.mock import patch
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from tutor_crawler.llm_client import RelayLlmClient
+from tutor_crawler.llm_parser import LlmTutoringInfoParser
+from tutor_crawler.llm_retry import CircuitBreaker, CircuitOpenError, RetryPolicy
 
 
 class RelayLlmClientConfigTest(unittest.TestCase):
@@ -58,5 +65,268 @@ class RelayLlmClientConfigTest(unittest.TestCase):
             self.assertEqual(client.model, "m-arg")
 
 
+
+class _RelayHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports: list[int] = []
+    # 应答后静默关闭连接（不发 Connection: close），模拟中转服务回收空闲长连接。
+    drop_after_reply = False
+
+    def do_POST(self):  # noqa: N802
+        type(self).client_ports.append(self.client_address[1])
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        user_prompt = payload["messages"][1]["content"]
+        body = json.dumps(
+            {"choices": [{"message": {"content": json.dumps({"echo": user_prompt})}}]}
+        ).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        if type(self).drop_after_reply:
+            self.close_connection = True
+
+    def log_message(self, format, *args):  # noqa: A002
+        return
+
+
+class RelayLlmClientPoolTest(unittest.TestCase):
+    def setUp(self) -> None:
+        _RelayHandler.client_ports = []
+        _RelayHandler.drop_after_reply = False
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _RelayHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.client = RelayLlmClient(
+            config_path="/nonexistent.json",
+            base_url=f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+            api_key="key",
+            model="model-a",
+            timeout_seconds=5,
+            http_backend="pooled",
+        )
+
+    def tearDown(self) -> None:
+        self.client.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_should_reuse_keep_alive_connection_across_calls(self):
+        first = self.client.chat_completion("system", "a")
+        second = self.client.chat_completion("system", "b")
+
+        self.assertEqual(json.loads(first)["echo"], "a")
+        self.assertEqual(json.loads(second)["echo"], "b")
+        self.assertEqual(self.client.pool.created_connections, 1)
+        self.assertEqual(self.client.pool.reused_connections, 1)
+        self.assertEqual(len(set(_RelayHandler.client_ports)), 1)
+
+    def test_should_be_safe_to_share_across_threads(self):
+        prompts = [f"p{index}" for index in range(12)]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(
+                executor.map(
+                    lambda prompt: self.client.chat_completion("system", prompt),
+                    prompts,
+                )
+            )
+
+        self.assertEqual([json.loads(result)["echo"] for result in results], prompts)
+        self.assertLessEqual(self.client.pool.created_connections, 4)
+
+    def test_should_resend_stale_post_once_without_tripping_breaker(self):
+        _RelayHandler.drop_after_reply = True
+        sleeps: list[float] = []
+        breaker = CircuitBreaker(failure_threshold=1)
+        client = RelayLlmClient(
+            config_path="/nonexistent.json",
+            base_url=f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+            api_key="key",
+            model="model-a",
+            timeout_seconds=5,
+            http_backend="pooled",
+            retry_policy=RetryPolicy(sleep_func=sleeps.append),
+            circuit_breaker=breaker,
+        )
+
+        self.assertEqual(json.loads(client.chat_completion("system", "a"))["echo"], "a")
+        self.assertEqual(json.loads(client.chat_completion("system", "b"))["echo"], "b")
+        client.close()
+
+        self.assertEqual(client.pool.created_connections, 2)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        self.assertEqual(sleeps, [])
+
+    def test_should_default_to_urllib_and_skip_pool_behind_proxy(self):
+        base_url = f"http://127.0.0.1:{self.server.server_address[1]}/v1"
+        client = RelayLlmClient(
+            config_path="/nonexistent.json", base_url=base_url, api_key="k", model="m"
+        )
+        self.assertIsNone(client.pool)
+        self.assertEqual(json.loads(client.chat_completion("system", "u"))["echo"], "u")
+        client.close()
+
+        with patch.dict(os.environ, {"http_proxy": "http://proxy.invalid:3128"}, clear=True):
+            proxied = RelayLlmClient(
+                config_path="/nonexistent.json",
+                base_url=base_url,
+                api_key="k",
+                model="m",
+                http_backend="pooled",
+            )
+        self.assertIsNone(proxied.pool)
+        with self.assertRaises(ValueError):
+            RelayLlmClient(config_path="/nonexistent.json", http_backend="curl")
+
+
+class _FlakyRelayHandler(BaseHTTPRequestHandler):
+    """按预设状态码序列应答，序列用完后返回 200。"""
+
+    protocol_version = "HTTP/1.1"
+    statuses: list[tuple[int, str]] = []
+    requests = 0
+
+    def do_POST(self):  # noqa: N802
+        type(self).requests += 1
+        self.rfile.read(int(self.headers["Content-Length"]))
+        if type(self).statuses:
+            status, retry_after = type(self).statuses.pop(0)
+            body = b'{"error": "busy"}'
+            self.send_response(status)
+            if retry_after:
+                self.send_header("Retry-After", retry_after)
+        else:
+            body = json.dumps(
+                {"choices": [{"message": {"content": '{"items": []}'}}]}
+            ).encode("utf-8")
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        return
+
+
+class RelayLlmClientRetryTest(unittest.TestCase):
+    def setUp(self) -> None:
+        _FlakyRelayHandler.statuses = []
+        _FlakyRelayHandler.requests = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _FlakyRelayHandler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.sleeps: list[float] = []
+        self.clock = [0.0]
+
+    def tearDown(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _client(self, **kwargs) -> RelayLlmClient:
+        return RelayLlmClient(
+            config_path="/nonexistent.json",
+            base_url=f"http://127.0.0.1:{self.server.server_address[1]}/v1",
+            api_key="key",
+            model="model-a",
+            timeout_seconds=5,
+            **kwargs,
+        )
+
+    def _policy(self, **kwargs) -> RetryPolicy:
+        return RetryPolicy(
+            random_func=lambda: 0.5, sleep_func=self.sleeps.append, **kwargs
+        )
+
+    def test_should_honor_retry_after_and_jittered_backoff_per_status(self):
+        _FlakyRelayHandler.statuses = [(429, "7"), (503, ""), (503, "")]
+        client = self._client(retry_policy=self._policy(base_delay_seconds=2))
+
+        content = client.chat_completion("system", "user")
+        client.close()
+
+        self.assertEqual(content, '{"items": []}')
+        self.assertEqual(_FlakyRelayHandler.requests, 4)
+        self.assertEqual(self.sleeps, [7.0, 2.0, 4.0])
+
+        _FlakyRelayHandler.statuses = [(400, ""), (429, "600")]
+        client = self._client(retry_policy=self._policy())
+        with self.assertRaisesRegex(RuntimeError, "400"):
+            client.chat_completion("system", "bad")
+        with self.assertRaisesRegex(RuntimeError, "429"):
+            client.chat_completion("system", "slow down")
+        client.close()
+        self.assertEqual(_FlakyRelayHandler.requests, 6)
+        self.assertEqual(
+            RetryPolicy.parse_status_attempts(["400=2", "429=1"])[400], 2
+        )
+
+    def test_open_circuit_should_send_parser_straight_to_fallback(self):
+        _FlakyRelayHandler.statuses = [(502, "")] * 4
+        breaker = CircuitBreaker(
+            failure_threshold=2,
+            reset_timeout_seconds=30,
+            time_func=lambda: self.clock[0],
+        )
+        client = self._client(
+            retry_policy=self._policy(status_attempts={502: 2}),
+            circuit_breaker=breaker,
+        )
+        parser = LlmTutoringInfoParser(llm_client=client)
+        article = {
+            "source_url": "https://example.com/a",
+            "published_at": "",
+            "content_text": "城市：上海 年级：高二 科目：数学 地址：张江 薪资：300元/2小时",
+        }
+
+        first = parser.parse_many(article)
+        second = parser.parse_many(article)
+
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+        self.assertEqual(_FlakyRelayHandler.requests, 2)
+        self.assertEqual(first[0]["city"], "上海")
+        self.assertEqual(second, first)
+        with self.assertRaises(CircuitOpenError):
+            client.chat_completion("system", "user")
+
+        _FlakyRelayHandler.statuses = []
+        self.clock[0] += 31
+        self.assertEqual(client.chat_completion("system", "user"), '{"items": []}')
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        client.close()
+
+    def test_breaker_should_ignore_429_and_release_probe_on_unexpected_error(self):
+        _FlakyRelayHandler.statuses = [(429, "0")] * 3
+        breaker = CircuitBreaker(
+            failure_threshold=2,
+            reset_timeout_seconds=30,
+            time_func=lambda: self.clock[0],
+        )
+        client = self._client(retry_policy=self._policy(), circuit_breaker=breaker)
+
+        self.assertEqual(client.chat_completion("system", "user"), '{"items": []}')
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        breaker.record_failure()
+        breaker.record_failure()
+        self.clock[0] += 31
+
+        class _BrokenGovernor:
+            def slot(self):
+                raise RuntimeError("governor db locked")
+
+        client.governor = _BrokenGovernor()
+        with self.assertRaisesRegex(RuntimeError, "governor"):
+            client.chat_completion("system", "probe")
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+
+        # 上一个探测异常结束后名额已交还，下一次请求仍可探测并恢复。
+        client.governor = None
+        self.assertEqual(client.chat_completion("system", "again"), '{"items": []}')
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+        client.close()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,71 @@
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tutor_crawler.llm_governor import LlmRequestGovernor
+
+
+class LlmRequestGovernorTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = str(Path(self.tempdir.name) / "llm_governor.db")
+        self.clock = [1000.0]
+        self.sleeps: list[float] = []
+
+    def tearDown(self) -> None:
+        self.tempdir.cleanup()
+
+    def _sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.clock[0] += seconds
+
+    def _governor(self, **kwargs) -> LlmRequestGovernor:
+        return LlmRequestGovernor(
+            self.path,
+            time_func=lambda: self.clock[0],
+            sleep_func=self._sleep,
+            **kwargs,
+        )
+
+    def test_should_enforce_requests_per_minute_with_token_bucket(self):
+        governor = self._governor(requests_per_minute=60, max_in_flight=10, burst=2)
+
+        for _ in range(2):
+            governor.release(governor.acquire())
+        self.assertAlmostEqual(governor.current_wait_seconds(), 1.0)
+        governor.release(governor.acquire())
+
+        self.assertEqual(self.sleeps, [1.0])
+        stats = governor.stats()
+        self.assertEqual((stats["acquired"], stats["in_flight"]), (3, 0))
+        self.assertAlmostEqual(stats["max_wait_seconds"], 1.0)
+        self.assertAlmostEqual(stats["current_wait_seconds"], 1.0)
+        governor.close()
+
+    def test_should_share_in_flight_limit_across_instances_and_reclaim_leases(self):
+        first = self._governor(max_in_flight=2, burst=10, lease_seconds=30)
+        second = self._governor(max_in_flight=2, burst=10, lease_seconds=30)
+        held = first.acquire()
+        first.acquire()  # 模拟异常退出、未释放的占位
+
+        self.assertGreater(second.current_wait_seconds(), 0)
+        self.assertEqual(second.stats()["in_flight"], 2)
+        first.release(held)
+        with second.slot():
+            self.assertEqual(first.stats()["in_flight"], 2)
+        self.assertEqual(self.sleeps, [])
+
+        self.clock[0] += 10
+        second.acquire()
+        second.acquire()
+        self.assertGreater(sum(self.sleeps), 19)
+        self.assertEqual(first.stats()["in_flight"], 2)
+        first.close()
+        second.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
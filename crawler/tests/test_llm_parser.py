@@ -1,9 +1,14 @@
+import json
 import sys
+import tempfile
+import threading
+import time
 import unittest
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from tutor_crawler.llm_cache import LlmResponseCache
 from tutor_crawler.llm_parser import LlmTutoringInfoParser
 
 
@@ -21,6 +26,46 @@ class _FakeLlmClient:
         return self.content
 
 
+class _ChunkEchoLlmClient:
+    """按分块回显 subject，并记录同时在途的请求数。"""
+
+    model = "echo-model"
+
+    def __init__(self, fail_marker: str = "") -> None:
+        self.fail_marker = fail_marker
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.contents: list[str] = []
+        self._lock = threading.Lock()
+
+    def is_configured(self) -> bool:
+        return True
+
+    def chat_completion(self, system_prompt: str, user_prompt: str) -> str:
+        with self._lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(0.05)
+            content_text = user_prompt.split("content_text:\n", 1)[1]
+            with self._lock:
+                self.contents.append(content_text)
+            if self.fail_marker and self.fail_marker in content_text:
+                raise RuntimeError("relay timeout")
+            blocks = [
+                block.strip()
+                for block in content_text.split("<<<ITEM_BREAK>>>")
+                if block.strip()
+            ]
+            items = [{"subject": block, "subject_snippet": block} for block in blocks]
+            return json.dumps({"items": items}, ensure_ascii=False)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
 class _FakeFallbackParser:
     def parse_many(self, article: dict):
         return [
@@ -327,6 +372,134 @@ class LlmParserTest(unittest.TestCase):
         self.assertEqual(len(items), 3)
         self.assertEqual(items[2]["source_url"], "https://example.com/h#item-3")
 
+    def test_should_dispatch_chunks_concurrently_and_keep_block_order(self):
+        blocks = [f"科目：数学{index}" for index in range(20)]
+        article = {
+            "source_url": "https://example.com/many",
+            "published_at": "",
+            "content_text": "\n<<<ITEM_BREAK>>>\n".join(blocks),
+        }
+        client = _ChunkEchoLlmClient()
+        parser = LlmTutoringInfoParser(
+            llm_client=client,
+            fallback_parser=_FakeFallbackParser(),
+            chunk_workers=4,
+            max_output_tokens=1000,
+        )
+
+        items, fingerprint = parser.parse_many_with_fingerprint(article)
+        parser.close()
+
+        self.assertEqual(fingerprint, parser.fingerprint())
+        self.assertEqual(client.calls, 3)
+        self.assertEqual(client.max_active, 3)
+        self.assertEqual([item["subject"] for item in items], blocks)
+        self.assertEqual(items[8]["source_url"], "https://example.com/many#item-9")
+
+    def test_should_fallback_when_any_chunk_fails(self):
+        blocks = [f"科目：数学{index}" for index in range(20)]
+        article = {
+            "source_url": "https://example.com/many",
+            "published_at": "",
+            "content_text": "\n<<<ITEM_BREAK>>>\n".join(blocks),
+        }
+        parser = LlmTutoringInfoParser(
+            llm_client=_ChunkEchoLlmClient(fail_marker="数学9"),
+            fallback_parser=_FakeFallbackParser(),
+            max_output_tokens=1000,
+        )
+
+        items, fingerprint = parser.parse_many_with_fingerprint(article)
+        parser.close()
+
+        self.assertEqual(len(items), 20)
+        self.assertEqual({item["grade"] for item in items}, {"初一"})
+        # 回退规则解析的结果不能打上 LLM 指纹；假规则解析器没有指纹。
+        self.assertEqual(fingerprint, "")
+        self.assertTrue(parser.fingerprint().startswith("llm-"))
+
+    def test_should_plan_chunks_by_token_budget_and_log_plan(self):
+        blocks = [f"科目：数学{index}" for index in range(20)]
+        long_block = "科目：物理" + "。" * 3000
+        article = {
+            "source_url": "https://example.com/budget",
+            "published_at": "",
+            "content_text": "\n<<<ITEM_BREAK>>>\n".join(
+                blocks[:10] + [long_block] + blocks[10:]
+            ),
+        }
+        client = _ChunkEchoLlmClient()
+        parser = LlmTutoringInfoParser(
+            llm_client=client,
+            fallback_parser=_FakeFallbackParser(),
+            max_input_tokens=2500,
+        )
+
+        with self.assertLogs("tutor_crawler.llm_parser", level="INFO") as logs:
+            items = parser.parse_many(article)
+        parser.close()
+
+        self.assertEqual(client.calls, 3)
+        self.assertEqual(
+            [item["subject"] for item in items], blocks[:10] + [long_block] + blocks[10:]
+        )
+        self.assertIn("21 个信息块 -> 3 次请求", logs.output[0])
+        self.assertIn("超预算 1 次", logs.output[0])
+
+        short_article = dict(article, content_text="\n<<<ITEM_BREAK>>>\n".join(blocks))
+        client.calls = 0
+        parser.parse_many(short_article)
+        self.assertEqual(client.calls, 1)
+
+    def test_should_only_send_uncached_blocks_and_merge_in_order(self):
+        shared = ["科目：数学\n地址：A小区", "科目：英语\n地址：B小区"]
+        fresh = "科目：物理\n地址：C小区"
+        with tempfile.TemporaryDirectory() as temp_dir:
+            cache = LlmResponseCache(str(Path(temp_dir) / "llm_cache.db"))
+            client = _ChunkEchoLlmClient()
+            parser = LlmTutoringInfoParser(
+                llm_client=client,
+                fallback_parser=_FakeFallbackParser(),
+                block_cache=cache,
+            )
+
+            parser.parse_many(
+                {
+                    "source_url": "https://example.com/a",
+                    "published_at": "",
+                    "content_text": "\n<<<ITEM_BREAK>>>\n".join(shared),
+                }
+            )
+            items = parser.parse_many(
+                {
+                    "source_url": "https://example.com/b",
+                    "published_at": "",
+                    "content_text": "\n<<<ITEM_BREAK>>>\n".join(
+                        [shared[0], fresh, shared[1]]
+                    ),
+                }
+            )
+            repost = parser.parse_many(
+                {
+                    "source_url": "https://example.com/c",
+                    "published_at": "",
+                    "content_text": "\n<<<ITEM_BREAK>>>\n".join([fresh, shared[0]]),
+                }
+            )
+            cache.close()
+
+        self.assertEqual(client.calls, 2)
+        self.assertEqual(client.contents[1], fresh)
+        self.assertEqual(
+            [item["subject"] for item in items], [shared[0], fresh, shared[1]]
+        )
+        self.assertEqual(items[1]["source_url"], "https://example.com/b#item-2")
+        self.assertEqual([item["content_block"] for item in repost], [fresh, shared[0]])
+        self.assertEqual(
+            LlmResponseCache.make_block_key("v1", "科目：数学\n 地址：A小区 "),
+            LlmResponseCache.make_block_key("v1", "科目：数学 地址：A小区"),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,102 @@
+import sys
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tutor_crawler.mysql_pool import MySQLConnectionPool
+
+
+class _FakeConnection:
+    def __init__(self, name: int) -> None:
+        self.name = name
+        self.alive = True
+        self.closed = False
+        self.rollbacks = 0
+
+    def ping(self, reconnect: bool = False) -> None:
+        if not self.alive:
+            raise ConnectionError("gone away")
+
+    def rollback(self) -> None:
+        self.rollbacks += 1
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class MySQLConnectionPoolTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.clock = [0.0]
+        self.connections: list[_FakeConnection] = []
+
+    def _connect(self) -> _FakeConnection:
+        conn = _FakeConnection(len(self.connections))
+        self.connections.append(conn)
+        return conn
+
+    def _pool(self, **kwargs) -> MySQLConnectionPool:
+        return MySQLConnectionPool(
+            self._connect, time_func=lambda: self.clock[0], **kwargs
+        )
+
+    def test_should_reuse_idle_connection_and_replace_dead_one(self):
+        pool = self._pool(max_size=2)
+
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            self.assertIs(first, second)
+
+        first.alive = False
+        with pool.connection() as third:
+            self.assertIsNot(first, third)
+
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()["created"], 2)
+        self.assertEqual(pool.stats()["reused"], 1)
+
+    def test_should_evict_idle_and_expired_connections(self):
+        pool = self._pool(max_lifetime_seconds=100, idle_timeout_seconds=10)
+
+        with pool.connection() as first:
+            pass
+        self.clock[0] = 11.0
+        second = pool.acquire()
+        self.clock[0] = 120.0
+        pool.release(second)
+
+        self.assertIsNot(first, second)
+        self.assertTrue(first.closed)
+        self.assertTrue(second.closed)
+        self.assertEqual(pool.stats()["size"], 0)
+
+    def test_should_rollback_on_error_and_bound_concurrent_checkouts(self):
+        pool = self._pool(max_size=1, checkout_timeout_seconds=0)
+
+        with self.assertRaises(RuntimeError):
+            with pool.connection():
+                raise RuntimeError("boom")
+        self.assertEqual(self.connections[0].rollbacks, 1)
+
+        held = pool.acquire()
+        with self.assertRaises(TimeoutError):
+            pool.acquire()
+
+        waiter = MySQLConnectionPool(self._connect, max_size=1)
+        borrowed = waiter.acquire()
+        acquired = []
+        thread = threading.Thread(target=lambda: acquired.append(waiter.acquire()))
+        thread.start()
+        waiter.release(borrowed)
+        thread.join(timeout=5)
+        self.assertEqual(acquired, [borrowed])
+
+        pool.release(held)
+        pool.close()
+        self.assertTrue(held.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from tutor_crawler.parser import TutoringInfoParser
+from tutor_crawler.reparse import bulk_reparse
+from tutor_crawler.storage import CrawlStorage
+
+
+class BulkReparseTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tempdir = tempfile.TemporaryDirectory()
+        self._old_html_archive_env = os.environ.get("TUTOR_CRAWLER_HTML_DIR")
+        os.environ["TUTOR_CRAWLER_HTML_DIR"] = str(Path(self.tempdir.name) / "html")
+        self.storage = CrawlStorage(str(Path(self.tempdir.name) / "crawler.db"))
+        self.storage.init_db()
+
+    def tearDown(self) -> None:
+        self.storage.close()
+        if self._old_html_archive_env is None:
+            os.environ.pop("TUTOR_CRAWLER_HTML_DIR", None)
+        else:
+            os.environ["TUTOR_CRAWLER_HTML_DIR"] = self._old_html_archive_env
+        self.tempdir.cleanup()
+
+    def _save_article(self, source_url: str, text: str, published_at: str,
+                      platform_code: str = "MIAOMIAO_WECHAT") -> None:
+        self.storage.save_article(
+            {
+                "source_url": source_url,
+                "platform_code": platform_code,
+                "title": "家教信息",
+                "content_html": f"<div id='js_content'>{text}</div>",
+                "content_text": text,
+                "published_at": published_at,
+            }
+        )
+
+    def test_should_reparse_filtered_articles_in_batches(self):
+        text = "城市：上海 年级：高二 科目：数学 地址：张江 薪资：300元/2小时"
+        for index in range(5):
+            self._save_article(
+                f"https://example.com/r{index}", text, f"2026-01-0{index + 1} 10:00:00"
+            )
+        self._save_article("https://example.com/empty", "广告", "2026-01-02 10:00:00")
+        self._save_article(
+            "https://example.com/other", text, "2026-01-02 10:00:00", "OTHER"
+        )
+        self._save_article("https://example.com/late", text, "2026-03-01 10:00:00")
+
+        for processes in (1, 2):
+            summary = bulk_reparse(
+                self.storage,
+                TutoringInfoParser,
+                platform_code="MIAOMIAO_WECHAT",
+                published_from="2026-01-01",
+                published_to="2026-02-01",
+                processes=processes,
+                batch_size=2,
+            )
+            self.assertEqual(summary["articles"], 6)
+            self.assertEqual(summary["reparsed"], 5)
+            self.assertEqual(summary["empty"], 1)
+            self.assertEqual(summary["failed"], 0)
+
+        self.assertEqual(summary["inserted"], 0)
+        self.assertEqual(summary["unchanged"], 5)
+        self.assertEqual(self.storage.count_tutoring_info(), 5)
+        self.assertEqual(
+            self.storage.count_tutoring_info_by_article("https://example.com/other"), 0
+        )
+
+    def test_stale_only_should_skip_articles_stamped_by_current_parser(self):
+        text = "城市：上海 年级：高二 科目：数学 地址：张江 薪资：300元/2小时"
+        self._save_article("https://example.com/s1", text, "2026-01-01 10:00:00")
+        self._save_article("https://example.com/s2", "广告", "2026-01-01 10:00:00")
+
+        first = bulk_reparse(self.storage, TutoringInfoParser, stale_only=True)
+        second = bulk_reparse(self.storage, TutoringInfoParser, stale_only=True)
+        upgraded = bulk_reparse(self.storage, _UpgradedParser, stale_only=True)
+
+        self.assertEqual((first["articles"], first["reparsed"], first["empty"]), (2, 1, 1))
+        self.assertEqual(second["articles"], 0)
+        self.assertEqual(upgraded["articles"], 2)
+        self.assertNotEqual(upgraded["parser_fingerprint"], first["parser_fingerprint"])
+        row = self.storage.get_tutoring_info_by_url("https://example.com/s1")
+        self.assertEqual(row["parser_fingerprint"], upgraded["parser_fingerprint"])
+
+
+    def test_iter_articles_should_page_by_id_while_rows_change(self):
+        urls = [f"https://example.com/p{index}" for index in range(5)]
+        for url in urls:
+            self._save_article(url, "广告", "2026-01-01 10:00:00")
+
+        seen = []
+        for article in self.storage.iter_articles(stale_fingerprint="v2", page_size=2):
+            seen.append(article["source_url"])
+            # 消费过程中回写指纹，分页仍按 id 前进，不重复也不遗漏。
+            self.storage.stamp_parser_fingerprint(article["source_url"], "v2")
+
+        self.assertEqual(seen, urls)
+        self.assertNotIn("id", self.storage.get_article(urls[0]))
+        self.assertIsNone(self.storage.get_article("https://example.com/missing"))
+
+    def test_stale_only_should_retry_articles_that_fell_back_to_rules(self):
+        text = "城市：上海 年级：高二 科目：数学 地址：张江 薪资：300元/2小时"
+        self._save_article("https://example.com/f1", text, "2026-01-01 10:00:00")
+        target = _FallingBackParser().fingerprint()
+
+        first = bulk_reparse(
+            self.storage, _FallingBackParser, stale_only=True, processes=2,
+            fingerprint=target,
+        )
+        second = bulk_reparse(self.storage, _FallingBackParser, stale_only=True)
+
+        self.assertEqual(first["parser_fingerprint"], target)
+        self.assertEqual((first["reparsed"], first["fallback"]), (1, 1))
+        self.assertEqual((second["articles"], second["fallback"]), (1, 1))
+        row = self.storage.get_tutoring_info_by_url("https://example.com/f1")
+        self.assertEqual(row["parser_fingerprint"], TutoringInfoParser().fingerprint())
+
+
+class _FallingBackParser(TutoringInfoParser):
+    """模拟 LLM 解析器始终回退规则解析。"""
+
+    def fingerprint(self) -> str:
+        return "llm-test"
+
+    def parse_many_with_fingerprint(self, article: dict):
+        return self.parse_many(article), super().fingerprint()
+
+
+class _UpgradedParser(TutoringInfoParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.patterns["city"].append(r"([\u4e00-\u9fa5]{2,4})市")
+
+
+if __name__ == "__main__":
+    unittest.main()
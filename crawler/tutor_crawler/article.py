@@ -24,6 +24,106 @@ def parse_article_html(source_url: str, html: str) -> dict:
     }
 
 
+class StreamingArticleExtractor(HTMLParser):
+    """增量接收响应分块：正文根节点闭合后只再读有限的尾部查找发布时间，调用方可提前停止读取。
+
+    只保留根节点闭合前的 HTML；公众号的 ``var ct`` 通常在正文之后，闭合后继续扫描
+    至多 ``tail_limit`` 个字符的尾部，找到发布时间或超出上限即标记完成。
+    提前停止时 ``truncated`` 为 True，归档的 HTML 不含尾部内容。
+    """
+
+    _TAIL_OVERLAP = 256
+
+    def __init__(self, target_id: str = "js_content", tail_limit: int = 256 * 1024) -> None:
+        super().__init__()
+        self.target_id = target_id
+        self.tail_limit = tail_limit
+        self.root_tag = ""
+        self.root_nesting = 0
+        self.root_closed = False
+        self._root_close_pos = (1, 0)
+        self._tail = ""
+        self._tail_read = 0
+        self.parts: list[str] = []
+        self.title = ""
+        self.published_at = ""
+        self.truncated = False
+
+    @property
+    def done(self) -> bool:
+        if not self.root_closed:
+            return False
+        return bool(self.published_at) or self._tail_read >= self.tail_limit
+
+    def feed_chunk(self, text: str) -> None:
+        if not text or self.done:
+            return
+        if self.root_closed:
+            self._scan_tail(text)
+            return
+
+        self.parts.append(text)
+        self.feed(text)
+        if not self.root_closed:
+            return
+
+        # 按根节点结束标签位置截断，块内剩余部分作为尾部的开头。
+        html = "".join(self.parts)
+        line, offset = self._root_close_pos
+        line_start = 0
+        for _ in range(line - 1):
+            line_start = html.index("\n", line_start) + 1
+        end = html.find(">", line_start + offset) + 1 or len(html)
+        self.parts = [html[:end]]
+        self._update_metadata(html[:end])
+        self._scan_tail(html[end:])
+
+    def html(self) -> str:
+        return "".join(self.parts)
+
+    def article(self, source_url: str) -> dict:
+        article = parse_article_html(source_url=source_url, html=self.html())
+        if not article["title"] and self.title:
+            article["title"] = self.title
+        if not article["published_at"] and self.published_at:
+            article["published_at"] = self.published_at
+        article["content_truncated"] = self.truncated
+        return article
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if self.root_closed:
+            return
+        if not self.root_tag:
+            attrs_dict = {key: value or "" for key, value in attrs}
+            if attrs_dict.get("id") == self.target_id:
+                self.root_tag = tag
+                self.root_nesting = 1
+            return
+        if tag == self.root_tag:
+            self.root_nesting += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if self.root_closed or not self.root_tag or tag != self.root_tag:
+            return
+        self.root_nesting -= 1
+        if self.root_nesting <= 0:
+            self.root_closed = True
+            self._root_close_pos = self.getpos()
+
+    def _scan_tail(self, text: str) -> None:
+        # 与上一块保留少量重叠，避免 ``var ct = ...`` 恰好跨块时漏掉。
+        self._tail_read += len(text)
+        window = self._tail + text
+        self._update_metadata(window)
+        self._tail = window[-self._TAIL_OVERLAP :]
+
+    def _update_metadata(self, html: str) -> None:
+        if not self.title:
+            self.title = _extract_title(html)
+        if not self.published_at:
+            self.published_at = _extract_published_at(html)
+
+
 def _clean_text(text: str) -> str:
     text = unescape(text)
     text = text.replace("\r", "\n")
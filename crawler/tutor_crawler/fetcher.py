@@ -1,20 +1,188 @@
+import codecs
+import threading
+import time
+from contextlib import closing
+from typing import Callable
+from urllib.error import HTTPError
+from urllib.parse import urlparse
 from urllib.request import Request, urlopen
 
+from tutor_crawler.article import StreamingArticleExtractor
+from tutor_crawler.http_codec import (
+    ACCEPT_ENCODING,
+    TransferStats,
+    iter_decoded_chunks,
+    read_decoded_text,
+)
+from tutor_crawler.http_cache import ValidatorCache
+from tutor_crawler.http_pool import HttpConnectionPool
+
 
 class HttpFetcher:
-    def __init__(self, timeout: int = 10) -> None:
+    HEADER_PROFILES = ("desktop", "mobile")
+
+    def __init__(
+        self,
+        timeout: int = 10,
+        profile_ttl_seconds: float = 1800.0,
+        time_func: Callable[[], float] | None = None,
+        validator_cache: ValidatorCache | None = None,
+    ) -> None:
         self.timeout = timeout
+        self.validator_cache = validator_cache
+        self.profile_ttl_seconds = float(profile_ttl_seconds)
+        self.time_func = time_func or time.monotonic
+        self._profile_lock = threading.Lock()
+        self._host_profiles: dict[str, tuple[str, float]] = {}
+        self._pending_validators: dict[str, dict[str, str]] = {}
+        self.profile_hits = 0
+        self.profile_misses = 0
+        self.transfer_stats = TransferStats()
 
     def fetch(self, url: str) -> str:
-        html = self._fetch_once(url, self._desktop_headers())
-        if self._looks_like_wechat_block(html):
-            html = self._fetch_once(url, self._mobile_headers())
+        return self._fetch_with_profiles(url, self._fetch_once, lambda html: html)
+
+    def fetch_article(self, url: str) -> dict:
+        # 流式模式：边下载边增量解析，正文根节点闭合后即停止读取剩余脚本。
+        extractor = self._fetch_with_profiles(
+            url, self._stream_once, lambda result: result.html()
+        )
+        return extractor.article(url)
+
+    def fetch_if_modified(self, url: str) -> str | None:
+        """条件请求：服务端返回 304 时返回 None，未配置 validator_cache 时等同 fetch。
+
+        新的 validator 只暂存，调用方处理完列表页后再 ``commit_validators`` 落盘，
+        否则中途失败会让下次请求直接 304 而漏掉新文章。
+        """
+        if self.validator_cache is None:
+            return self.fetch(url)
+
+        html, validators = self._fetch_with_profiles(
+            url, self._fetch_conditional_once, lambda result: result[0] or ""
+        )
+        if html is None:
+            return None
+        if not self._looks_like_wechat_block(html):
+            with self._profile_lock:
+                self._pending_validators[url] = validators
         return html
 
+    def commit_validators(self, url: str) -> None:
+        with self._profile_lock:
+            validators = self._pending_validators.pop(url, None)
+        if validators is not None and self.validator_cache is not None:
+            self.validator_cache.store(url, **validators)
+
+    def _fetch_with_profiles(self, url: str, fetch_once, to_html):
+        host = urlparse(url).netloc.lower()
+        preferred = self._preferred_profile(host)
+        profiles = [preferred] + [
+            profile for profile in self.HEADER_PROFILES if profile != preferred
+        ]
+
+        result = None
+        for attempt, profile in enumerate(profiles):
+            result = fetch_once(url, self._headers_for(profile))
+            if not self._looks_like_wechat_block(to_html(result)):
+                self._remember_profile(host, profile, first_try=attempt == 0)
+                return result
+
+        # 所有 header 组合都被拦截时，清除学习结果，下次仍从默认组合开始探测。
+        self._forget_profile(host)
+        return result
+
+    def profile_stats(self) -> dict:
+        with self._profile_lock:
+            return {
+                "hits": self.profile_hits,
+                "misses": self.profile_misses,
+                "hosts": {
+                    host: profile
+                    for host, (profile, _) in self._host_profiles.items()
+                },
+            }
+
+    def _preferred_profile(self, host: str) -> str:
+        now = self.time_func()
+        with self._profile_lock:
+            learned = self._host_profiles.get(host)
+            if learned and learned[1] > now:
+                return learned[0]
+            self._host_profiles.pop(host, None)
+        return self.HEADER_PROFILES[0]
+
+    def _remember_profile(self, host: str, profile: str, first_try: bool) -> None:
+        expires_at = self.time_func() + self.profile_ttl_seconds
+        with self._profile_lock:
+            learned = self._host_profiles.get(host)
+            if first_try and learned and learned[0] == profile:
+                self.profile_hits += 1
+            else:
+                self.profile_misses += 1
+            self._host_profiles[host] = (profile, expires_at)
+
+    def _forget_profile(self, host: str) -> None:
+        with self._profile_lock:
+            self.profile_misses += 1
+            self._host_profiles.pop(host, None)
+
+    def _headers_for(self, profile: str) -> dict[str, str]:
+        headers = (
+            self._mobile_headers() if profile == "mobile" else self._desktop_headers()
+        )
+        headers["Accept-Encoding"] = ACCEPT_ENCODING
+        return headers
+
     def _fetch_once(self, url: str, headers: dict[str, str]) -> str:
+        with self._open(url, headers) as response:
+            return read_decoded_text(response, stats=self.transfer_stats)
+
+    def _fetch_conditional_once(
+        self, url: str, headers: dict[str, str]
+    ) -> tuple[str | None, dict[str, str]]:
+        request_headers = {**headers, **self.validator_cache.conditional_headers(url)}
+        try:
+            with self._open(url, request_headers) as response:
+                if getattr(response, "status", 200) == 304:
+                    return None, {}
+                response_headers = response.headers
+                html = read_decoded_text(response, stats=self.transfer_stats)
+        except HTTPError as ex:
+            # urllib 把 304 当作 HTTPError 抛出，连接池实现则直接返回 304 响应。
+            if ex.code == 304:
+                return None, {}
+            raise
+        return html, {
+            "etag": response_headers.get("ETag", "") or "",
+            "last_modified": response_headers.get("Last-Modified", "") or "",
+        }
+
+    def _stream_once(
+        self, url: str, headers: dict[str, str]
+    ) -> StreamingArticleExtractor:
+        extractor = StreamingArticleExtractor()
+        text_decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+        with self._open(url, headers) as response:
+            with closing(
+                iter_decoded_chunks(response, stats=self.transfer_stats)
+            ) as chunks:
+                for chunk in chunks:
+                    extractor.feed_chunk(text_decoder.decode(chunk))
+                    if extractor.done:
+                        # 发布时间已找到或尾部超出上限，剩余响应不再读取；归档 HTML 只到正文根节点为止。
+                        extractor.truncated = True
+                        break
+                else:
+                    extractor.feed_chunk(text_decoder.decode(b"", final=True))
+        return extractor
+
+    def _open(self, url: str, headers: dict[str, str]):
         request = Request(url, headers=headers)
-        with urlopen(request, timeout=self.timeout) as response:  # noqa: S310
-            return response.read().decode("utf-8", errors="ignore")
+        return urlopen(request, timeout=self.timeout)  # noqa: S310
+
+    def close(self) -> None:
+        return None
 
     @staticmethod
     def _desktop_headers() -> dict[str, str]:
@@ -48,3 +216,61 @@ class HttpFetcher:
         has_block_signal = any(signal in html for signal in block_signals)
         has_real_article = 'id="js_content"' in html
         return has_block_signal and not has_real_article
+
+
+class PooledHttpFetcher(HttpFetcher):
+    """复用 keep-alive 连接的抓取器，避免每篇文章重复 TCP/TLS 握手。"""
+
+    def __init__(
+        self,
+        timeout: int = 10,
+        pool: HttpConnectionPool | None = None,
+        max_idle_per_host: int = 4,
+        idle_timeout_seconds: float = 60.0,
+        profile_ttl_seconds: float = 1800.0,
+        validator_cache: ValidatorCache | None = None,
+    ) -> None:
+        super().__init__(
+            timeout=timeout,
+            profile_ttl_seconds=profile_ttl_seconds,
+            validator_cache=validator_cache,
+        )
+        self.pool = pool or HttpConnectionPool(
+            max_idle_per_host=max_idle_per_host,
+            idle_timeout_seconds=idle_timeout_seconds,
+            timeout=timeout,
+        )
+
+    def _open(self, url: str, headers: dict[str, str]):
+        return self.pool.request("GET", url, headers=headers)
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+def create_fetcher(
+    backend: str = "urllib",
+    timeout: int = 10,
+    pool_size: int = 4,
+    idle_timeout_seconds: float = 60.0,
+    profile_ttl_seconds: float = 1800.0,
+    validator_cache_path: str = "",
+) -> HttpFetcher:
+    validator_cache = (
+        ValidatorCache(validator_cache_path) if validator_cache_path else None
+    )
+    if backend == "urllib":
+        return HttpFetcher(
+            timeout=timeout,
+            profile_ttl_seconds=profile_ttl_seconds,
+            validator_cache=validator_cache,
+        )
+    if backend == "pooled":
+        return PooledHttpFetcher(
+            timeout=timeout,
+            max_idle_per_host=pool_size,
+            idle_timeout_seconds=idle_timeout_seconds,
+            profile_ttl_seconds=profile_ttl_seconds,
+            validator_cache=validator_cache,
+        )
+    raise ValueError(f"unsupported http backend: {backend}")
@@ -0,0 +1,55 @@
+import json
+import os
+import threading
+from pathlib import Path
+
+
+class ValidatorCache:
+    """按 URL 落盘保存 ETag / Last-Modified，用于列表页条件请求。"""
+
+    def __init__(self, path: str) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict[str, str]] = self._load()
+
+    def _load(self) -> dict[str, dict[str, str]]:
+        if not self.path.exists():
+            return {}
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8") or "{}")
+        except (OSError, ValueError):
+            return {}
+        return payload if isinstance(payload, dict) else {}
+
+    def get(self, url: str) -> dict[str, str]:
+        with self._lock:
+            return dict(self._entries.get(url) or {})
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        entry = self.get(url)
+        headers: dict[str, str] = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, url: str, etag: str = "", last_modified: str = "") -> None:
+        etag = (etag or "").strip()
+        last_modified = (last_modified or "").strip()
+        with self._lock:
+            if not etag and not last_modified:
+                if self._entries.pop(url, None) is None:
+                    return
+            else:
+                self._entries[url] = {"etag": etag, "last_modified": last_modified}
+            self._flush()
+
+    def _flush(self) -> None:
+        # 先写临时文件再原子替换，避免进程中断留下半截 JSON。
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        temp_path.write_text(
+            json.dumps(self._entries, ensure_ascii=False, indent=2), encoding="utf-8"
+        )
+        os.replace(temp_path, self.path)
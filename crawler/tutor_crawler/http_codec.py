@@ -0,0 +1,138 @@
+import codecs
+import threading
+import zlib
+from typing import Iterator
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖，未安装时不声明 br
+    brotli = None
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli is not None else "gzip, deflate"
+
+
+class TransferStats:
+    """累计传输字节数：wire 为线上（压缩）字节，decoded 为解压后字节。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.wire_bytes = 0
+        self.decoded_bytes = 0
+
+    def record(self, wire_bytes: int, decoded_bytes: int) -> None:
+        with self._lock:
+            self.responses += 1
+            self.wire_bytes += wire_bytes
+            self.decoded_bytes += decoded_bytes
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            ratio = (
+                self.wire_bytes / self.decoded_bytes if self.decoded_bytes else 1.0
+            )
+            return {
+                "responses": self.responses,
+                "wire_bytes": self.wire_bytes,
+                "decoded_bytes": self.decoded_bytes,
+                "compression_ratio": round(ratio, 4),
+            }
+
+
+class _IdentityDecoder:
+    def decompress(self, chunk: bytes) -> bytes:
+        return chunk
+
+    def flush(self) -> bytes:
+        return b""
+
+
+class _DeflateDecoder:
+    """HTTP deflate 实际存在 zlib 包装与裸 deflate 两种实现，首块失败时切换裸流。"""
+
+    def __init__(self) -> None:
+        self._decoder = zlib.decompressobj()
+        self._first_chunk = True
+
+    def decompress(self, chunk: bytes) -> bytes:
+        if self._first_chunk:
+            self._first_chunk = False
+            try:
+                return self._decoder.decompress(chunk)
+            except zlib.error:
+                self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._decoder.decompress(chunk)
+
+    def flush(self) -> bytes:
+        return self._decoder.flush()
+
+
+class _BrotliDecoder:
+    def __init__(self) -> None:
+        self._decoder = brotli.Decompressor()
+
+    def decompress(self, chunk: bytes) -> bytes:
+        return self._decoder.process(chunk)
+
+    def flush(self) -> bytes:
+        return b""
+
+
+def _make_decoder(content_encoding: str):
+    encoding = (content_encoding or "").strip().lower()
+    if encoding in {"gzip", "x-gzip"}:
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return _DeflateDecoder()
+    if encoding == "br":
+        if brotli is None:
+            raise RuntimeError("响应使用 br 压缩，但未安装 brotli")
+        return _BrotliDecoder()
+    return _IdentityDecoder()
+
+
+def iter_decoded_chunks(
+    response,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stats: TransferStats | None = None,
+) -> Iterator[bytes]:
+    """按块读取响应并增量解压，压缩块解码后即丢弃，不与解压结果同时整体驻留内存。"""
+    headers = getattr(response, "headers", None)
+    content_encoding = headers.get("Content-Encoding", "") if headers else ""
+    decoder = _make_decoder(content_encoding)
+    wire_bytes = 0
+    decoded_bytes = 0
+    try:
+        while True:
+            chunk = response.read(chunk_size)
+            if not chunk:
+                break
+            wire_bytes += len(chunk)
+            decoded = decoder.decompress(chunk)
+            if decoded:
+                decoded_bytes += len(decoded)
+                yield decoded
+        tail = decoder.flush()
+        if tail:
+            decoded_bytes += len(tail)
+            yield tail
+    finally:
+        if stats is not None:
+            stats.record(wire_bytes, decoded_bytes)
+
+
+def read_decoded_text(
+    response,
+    encoding: str = "utf-8",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    stats: TransferStats | None = None,
+) -> str:
+    text_decoder = codecs.getincrementaldecoder(encoding)(errors="ignore")
+    parts = [
+        text_decoder.decode(chunk)
+        for chunk in iter_decoded_chunks(response, chunk_size=chunk_size, stats=stats)
+    ]
+    parts.append(text_decoder.decode(b"", final=True))
+    return "".join(parts)
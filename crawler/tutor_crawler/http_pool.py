@@ -0,0 +1,235 @@
+import io
+import threading
+import time
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from urllib.error import HTTPError, URLError
+from urllib.parse import urljoin, urlsplit
+
+
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# 复用连接时，对端可能已关闭空闲连接，这类错误允许换新连接重发一次；
+# 默认仅限幂等方法，POST 等请求可能已被服务端处理，调用方确认可重发时传 resend_on_stale。
+_IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"}
+_STALE_CONNECTION_ERRORS = (
+    HTTPException,
+    ConnectionResetError,
+    ConnectionAbortedError,
+    BrokenPipeError,
+)
+
+
+class PooledResponse:
+    """连接池响应：读完后把连接归还连接池，未读完则直接关闭连接。"""
+
+    def __init__(self, pool, key, conn, response, url: str) -> None:
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self.url = url
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+
+    def read(self, amt: int | None = None) -> bytes:
+        if amt is None or amt < 0:
+            return self._response.read()
+        return self._response.read(amt)
+
+    def getcode(self) -> int:
+        return self.status
+
+    def close(self) -> None:
+        conn = self._conn
+        if conn is None:
+            return
+        self._conn = None
+        reusable = self._response.isclosed() and not self._response.will_close
+        if not reusable:
+            self._response.close()
+        self._pool._release(self._key, conn, reusable=reusable)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class HttpConnectionPool:
+    """按 (scheme, host, port) 复用 keep-alive 连接的线程安全连接池。
+
+    每个 host 最多保留 ``max_idle_per_host`` 条空闲连接，超出部分用完即关；
+    空闲超过 ``idle_timeout_seconds`` 的连接在下次取用时淘汰。
+    """
+
+    def __init__(
+        self,
+        max_idle_per_host: int = 4,
+        idle_timeout_seconds: float = 60.0,
+        timeout: float = 10,
+        max_redirects: int = 5,
+    ) -> None:
+        self.max_idle_per_host = max(1, int(max_idle_per_host))
+        self.idle_timeout_seconds = float(idle_timeout_seconds)
+        self.timeout = timeout
+        self.max_redirects = max(0, int(max_redirects))
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str, int], list[tuple[object, float]]] = {}
+        self.created_connections = 0
+        self.reused_connections = 0
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str] | None = None,
+        body: bytes | None = None,
+        follow_redirects: bool = True,
+        resend_on_stale: bool = False,
+    ) -> PooledResponse:
+        current_url = url
+        current_method = method
+        current_body = body
+        for _ in range(self.max_redirects + 1):
+            response = self._request_once(
+                current_method,
+                current_url,
+                headers or {},
+                current_body,
+                resend_on_stale,
+            )
+            location = response.headers.get("Location")
+            if (
+                not follow_redirects
+                or response.status not in _REDIRECT_STATUSES
+                or not location
+            ):
+                return self._raise_for_status(response)
+
+            response.read()
+            response.close()
+            current_url = urljoin(current_url, location)
+            if response.status == 303 or (
+                response.status in {301, 302} and current_method == "POST"
+            ):
+                current_method = "GET"
+                current_body = None
+
+        raise URLError(f"too many redirects: {url}")
+
+    def close(self) -> None:
+        with self._lock:
+            idle = self._idle
+            self._idle = {}
+        for connections in idle.values():
+            for conn, _ in connections:
+                conn.close()
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return sum(len(connections) for connections in self._idle.values())
+
+    def _request_once(
+        self,
+        method: str,
+        url: str,
+        headers: dict[str, str],
+        body: bytes | None,
+        resend_on_stale: bool = False,
+    ) -> PooledResponse:
+        parts = urlsplit(url)
+        scheme = (parts.scheme or "http").lower()
+        if scheme not in {"http", "https"}:
+            raise URLError(f"unsupported url scheme: {scheme}")
+        host = parts.hostname or ""
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, host, port)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+
+        request_headers = {"Connection": "keep-alive", **headers}
+        conn, reused = self._checkout(key)
+        try:
+            try:
+                response = self._send(conn, method, path, body, request_headers)
+            except _STALE_CONNECTION_ERRORS:
+                resendable = resend_on_stale or method.upper() in _IDEMPOTENT_METHODS
+                if not reused or not resendable:
+                    raise
+                conn = self._new_connection(key)
+                response = self._send(conn, method, path, body, request_headers)
+        except TimeoutError:
+            raise
+        except OSError as ex:
+            raise URLError(ex) from ex
+
+        return PooledResponse(self, key, conn, response, url)
+
+    @staticmethod
+    def _send(conn, method: str, path: str, body, headers: dict[str, str]):
+        try:
+            conn.request(method, path, body=body, headers=headers)
+            return conn.getresponse()
+        except BaseException:
+            conn.close()
+            raise
+
+    @staticmethod
+    def _raise_for_status(response: PooledResponse) -> PooledResponse:
+        if response.status < 400:
+            return response
+        detail = response.read()
+        response.close()
+        raise HTTPError(
+            response.url,
+            response.status,
+            response.reason,
+            response.headers,
+            io.BytesIO(detail),
+        )
+
+    def _checkout(self, key: tuple[str, str, int]) -> tuple[object, bool]:
+        now = time.monotonic()
+        conn = None
+        with self._lock:
+            connections = self._idle.get(key, [])
+            expired = [
+                candidate
+                for candidate, idle_since in connections
+                if now - idle_since > self.idle_timeout_seconds
+            ]
+            connections[:] = [
+                (candidate, idle_since)
+                for candidate, idle_since in connections
+                if now - idle_since <= self.idle_timeout_seconds
+            ]
+            if connections:
+                conn, _ = connections.pop()
+                self.reused_connections += 1
+        for candidate in expired:
+            candidate.close()
+        if conn is not None:
+            return conn, True
+        return self._new_connection(key), False
+
+    def _new_connection(self, key: tuple[str, str, int]):
+        scheme, host, port = key
+        with self._lock:
+            self.created_connections += 1
+        if scheme == "https":
+            return HTTPSConnection(host, port, timeout=self.timeout)
+        return HTTPConnection(host, port, timeout=self.timeout)
+
+    def _release(self, key: tuple[str, str, int], conn, reusable: bool) -> None:
+        if not reusable:
+            conn.close()
+            return
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.max_idle_per_host:
+                connections.append((conn, time.monotonic()))
+                return
+        conn.close()
@@ -0,0 +1,90 @@
+import hashlib
+import math
+import threading
+
+
+class BloomFilter:
+    """定长位数组布隆过滤器：不存在的判断可信，存在的判断需回表确认。"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001) -> None:
+        capacity = max(1, int(capacity))
+        error_rate = min(max(float(error_rate), 1e-9), 0.5)
+        self.bit_count = max(
+            8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+        )
+        self.hash_count = max(1, round(self.bit_count / capacity * math.log(2)))
+        self._bits = bytearray((self.bit_count + 7) // 8)
+
+    def _positions(self, value: str):
+        digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "big")
+        second = int.from_bytes(digest[8:], "big") | 1
+        for index in range(self.hash_count):
+            yield (first + index * second) % self.bit_count
+
+    def add(self, value: str) -> None:
+        for position in self._positions(value):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value: str) -> bool:
+        return all(
+            self._bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class KnownUrlIndex:
+    """按 platform_code 预加载的已知任务 URL 索引，用于发现阶段去重。
+
+    - 默认使用精确集合：命中即已存在，未命中视为新 URL。
+    - ``use_bloom=True`` 时改用布隆过滤器节省内存，命中部分批量回表确认。
+
+    索引只会随本进程建任务而增长，其他进程并发创建的任务由调用方在
+    create_task 冲突时兜底。
+    """
+
+    def __init__(
+        self,
+        storage,
+        use_bloom: bool = False,
+        bloom_capacity: int = 1_000_000,
+        bloom_error_rate: float = 0.001,
+    ) -> None:
+        self.storage = storage
+        self.use_bloom = use_bloom
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self._lock = threading.Lock()
+        self._indexes: dict[str, set[str] | BloomFilter] = {}
+
+    def _index_for(self, platform_code: str):
+        with self._lock:
+            index = self._indexes.get(platform_code)
+            if index is not None:
+                return index
+            if self.use_bloom:
+                index = BloomFilter(self.bloom_capacity, self.bloom_error_rate)
+            else:
+                index = set()
+            for source_url in self.storage.iter_task_urls(platform_code):
+                index.add(source_url)
+            self._indexes[platform_code] = index
+            return index
+
+    def filter_new(self, source_urls: list[str], platform_code: str) -> list[str]:
+        index = self._index_for(platform_code)
+        with self._lock:
+            maybe_known = [url for url in source_urls if url in index]
+        if not maybe_known:
+            return list(source_urls)
+
+        if self.use_bloom:
+            known = self.storage.get_existing_task_urls(maybe_known, platform_code)
+        else:
+            known = set(maybe_known)
+        return [url for url in source_urls if url not in known]
+
+    def add(self, source_url: str, platform_code: str) -> None:
+        index = self._index_for(platform_code)
+        with self._lock:
+            index.add(source_url)
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class LlmResponseCache:
+    """按请求内容寻址的 LLM 响应缓存，落盘到本地 SQLite 文件。
+
+    - 键为 (base_url, model, temperature, system_prompt, user_prompt) 的摘要
+    - 也存放信息块级抽取结果，键为 (提示词版本, 归一化块原文) 的摘要
+    - 超过 ``ttl_seconds`` 的条目视为未命中并删除；``ttl_seconds<=0`` 表示永不过期
+    - 条目数超过 ``max_entries`` 时按最近使用时间淘汰最旧的条目
+
+    多进程可共享同一文件（WAL + busy_timeout），进程内多线程共用一条连接。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl_seconds: float = 30 * 86400,
+        max_entries: int = 100_000,
+        time_func=None,
+    ) -> None:
+        self.path = Path(path)
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = max(1, int(max_entries))
+        self._time = time_func or time.time
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            str(self.path), timeout=30, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_response_cache (
+                cache_key TEXT PRIMARY KEY,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_response_cache_created "
+            "ON llm_response_cache(created_at)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS ix_llm_response_cache_last_used "
+            "ON llm_response_cache(last_used_at)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def make_key(
+        base_url: str,
+        model: str,
+        temperature: float,
+        system_prompt: str,
+        user_prompt: str,
+    ) -> str:
+        payload = [base_url.rstrip("/"), model, temperature, system_prompt, user_prompt]
+        return hashlib.sha256(
+            json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+
+    @staticmethod
+    def make_block_key(prompt_version: str, block_text: str) -> str:
+        # 信息块级抽取结果的键：空白归一化后的块原文 + 提示词版本。
+        normalized = " ".join(block_text.split())
+        payload = ["block", prompt_version, normalized]
+        return hashlib.sha256(
+            json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        now = self._time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content, created_at FROM llm_response_cache WHERE cache_key=?",
+                (key,),
+            ).fetchone()
+            if row and self._expired(row[1], now):
+                self._db.execute(
+                    "DELETE FROM llm_response_cache WHERE cache_key=?", (key,)
+                )
+                self._db.commit()
+                self.evictions += 1
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute(
+                "UPDATE llm_response_cache SET last_used_at=? WHERE cache_key=?",
+                (now, key),
+            )
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, content: str) -> None:
+        now = self._time()
+        with self._lock:
+            self._db.execute(
+                """
+                INSERT OR REPLACE INTO llm_response_cache(
+                    cache_key, content, created_at, last_used_at
+                ) VALUES (?, ?, ?, ?)
+                """,
+                (key, content, now, now),
+            )
+            self.writes += 1
+            self._evict_locked(now)
+            self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._db.execute(
+                "SELECT COUNT(*) FROM llm_response_cache"
+            ).fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "evictions": self.evictions,
+                "entries": int(entries),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def _evict_locked(self, now: float) -> None:
+        evicted = 0
+        if self.ttl_seconds > 0:
+            evicted += self._db.execute(
+                "DELETE FROM llm_response_cache WHERE created_at<?",
+                (now - self.ttl_seconds,),
+            ).rowcount
+        count = self._db.execute("SELECT COUNT(*) FROM llm_response_cache").fetchone()[0]
+        if count > self.max_entries:
+            evicted += self._db.execute(
+                """
+                DELETE FROM llm_response_cache
+                 WHERE cache_key IN (
+                     SELECT cache_key FROM llm_response_cache
+                      ORDER BY last_used_at
+                      LIMIT ?
+                 )
+                """,
+                (count - self.max_entries,),
+            ).rowcount
+        self.evictions += evicted
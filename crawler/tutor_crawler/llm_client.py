@@ -1,10 +1,20 @@
 import json
-import os
-import time
-from http.client import RemoteDisconnected
+import logging
+from contextlib import nullcontext
+from http.client import HTTPException
 from pathlib import Path
 from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
+from urllib.parse import urlsplit
+from urllib.request import Request, getproxies, proxy_bypass, urlopen
+
+from tutor_crawler.http_codec import ACCEPT_ENCODING, TransferStats, read_decoded_text
+from tutor_crawler.http_pool import HttpConnectionPool
+from tutor_crawler.llm_cache import LlmResponseCache
+from tutor_crawler.llm_governor import LlmRequestGovernor
+from tutor_crawler.llm_retry import CircuitBreaker, CircuitOpenError, RetryPolicy
+
+
+logger = logging.getLogger(__name__)
 
 
 class RelayLlmClient:
@@ -17,6 +27,14 @@ class RelayLlmClient:
         api_key: str | None = None,
         model: str | None = None,
         timeout_seconds: int | None = None,
+        response_cache: LlmResponseCache | None = None,
+        bypass_cache: bool = False,
+        http_backend: str = "urllib",
+        pool: HttpConnectionPool | None = None,
+        pool_size: int = 8,
+        retry_policy: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        governor: LlmRequestGovernor | None = None,
     ) -> None:
         default_config_path = Path(__file__).resolve().parents[1] / "llm_config.json"
         cfg = self._load_config_file(config_path or str(default_config_path))
@@ -32,6 +50,28 @@ class RelayLlmClient:
             self.timeout_seconds = int(timeout_seconds)
         else:
             self.timeout_seconds = int(cfg.get("timeout_seconds") or 30)
+        self.transfer_stats = TransferStats()
+        if http_backend not in {"urllib", "pooled"}:
+            raise ValueError(f"unsupported http backend: {http_backend}")
+        # pooled 时复用到中转服务的 keep-alive 连接（含重试），省去每次请求的 TCP/TLS 握手；
+        # 连接池不走代理，配置了 HTTP(S)_PROXY 时仍用 urllib。
+        self.pool = pool
+        if self.pool is None and http_backend == "pooled":
+            if self._uses_proxy(self.base_url):
+                logger.info("LLM 中转地址配置了代理，改用 urllib 请求")
+            else:
+                self.pool = HttpConnectionPool(
+                    max_idle_per_host=pool_size, timeout=self.timeout_seconds
+                )
+        self.temperature = 0
+        # bypass_cache 只跳过读取，新响应仍会写回缓存，用于强制刷新。
+        self.response_cache = response_cache
+        self.bypass_cache = bypass_cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        # 中转服务持续失败时熔断，调用方立即收到 CircuitOpenError 并走规则兜底。
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        # 多进程共享的限流器：每次 HTTP 请求（含重试）前取令牌与在途名额。
+        self.governor = governor
 
     @staticmethod
     def _load_config_file(config_path: str) -> dict:
@@ -47,6 +87,13 @@ class RelayLlmClient:
         except Exception:  # noqa: BLE001
             return {}
 
+    @staticmethod
+    def _uses_proxy(url: str) -> bool:
+        parts = urlsplit(url)
+        if parts.scheme.lower() not in getproxies():
+            return False
+        return not proxy_bypass(parts.hostname or "")
+
     def is_configured(self) -> bool:
         return bool(self.api_key and self.model)
 
@@ -54,10 +101,35 @@ class RelayLlmClient:
         if not self.is_configured():
             raise RuntimeError("LLM 配置不完整，缺少 API key 或 model")
 
+        cache_key = ""
+        if self.response_cache is not None:
+            cache_key = LlmResponseCache.make_key(
+                self.base_url, self.model, self.temperature, system_prompt, user_prompt
+            )
+            if not self.bypass_cache:
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    return cached
+
+        content = self._request_completion(system_prompt, user_prompt)
+        if cache_key and self._is_json(content):
+            self.response_cache.put(cache_key, content)
+        return content
+
+    @staticmethod
+    def _is_json(content: str) -> bool:
+        # 只缓存可解析的 JSON，避免一次异常输出被反复命中。
+        try:
+            json.loads(content)
+        except ValueError:
+            return False
+        return True
+
+    def _request_completion(self, system_prompt: str, user_prompt: str) -> str:
         endpoint = self.base_url.rstrip("/") + "/chat/completions"
         payload = {
             "model": self.model,
-            "temperature": 0,
+            "temperature": self.temperature,
             "response_format": {"type": "json_object"},
             "messages": [
                 {"role": "system", "content": system_prompt},
@@ -68,26 +140,21 @@ class RelayLlmClient:
         headers = {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}",
+            "Accept-Encoding": ACCEPT_ENCODING,
         }
 
-        req = Request(endpoint, data=body, headers=headers, method="POST")
-        last_error: Exception | None = None
-        for attempt in range(1, 4):
+        attempt = 0
+        while True:
+            attempt += 1
+            if not self.circuit_breaker.allow_request():
+                raise CircuitOpenError("LLM 熔断中，跳过请求")
             try:
-                with urlopen(req, timeout=self.timeout_seconds) as response:
-                    raw = response.read().decode("utf-8", "ignore")
+                raw = self._attempt_completion(endpoint, headers, body, attempt)
+            finally:
+                # 成功/失败已记录时为空操作；限流器异常等意外情况下交还探测名额。
+                self.circuit_breaker.release_probe()
+            if raw is not None:
                 break
-            except HTTPError as ex:
-                detail = ex.read().decode("utf-8", "ignore") if ex.fp else str(ex)
-                raise RuntimeError(f"LLM HTTP 错误: {ex.code} {detail}") from ex
-            except (URLError, TimeoutError, RemoteDisconnected) as ex:
-                last_error = ex
-                if attempt >= 3:
-                    raise RuntimeError(f"LLM 网络错误: {ex}") from ex
-                time.sleep(1.2 * attempt)
-
-        if last_error and not raw:
-            raise RuntimeError(f"LLM 网络错误: {last_error}")
 
         data = json.loads(raw)
         choices = data.get("choices") or []
@@ -102,3 +169,62 @@ class RelayLlmClient:
         if not content:
             raise RuntimeError("LLM 响应 content 为空")
         return content
+
+    def _attempt_completion(
+        self, endpoint: str, headers: dict, body: bytes, attempt: int
+    ) -> str | None:
+        """发送一次请求；返回 None 表示已按重试策略等待、需要再次尝试。"""
+        try:
+            with self._governed(), self._post(endpoint, headers, body) as response:
+                raw = read_decoded_text(response, stats=self.transfer_stats)
+            self.circuit_breaker.record_success()
+            return raw
+        except HTTPError as ex:
+            detail = read_decoded_text(ex) if ex.fp else str(ex)
+            error = RuntimeError(f"LLM HTTP 错误: {ex.code} {detail}")
+            if not self.retry_policy.is_retryable_status(ex.code):
+                # 4xx 等请求本身的问题说明中转服务可达，不计入熔断。
+                self.circuit_breaker.record_success()
+                raise error from ex
+            if ex.code != 429:
+                # 429 是限流而非故障，已按 Retry-After 退避，不计入熔断阈值。
+                self.circuit_breaker.record_failure()
+            delay = None
+            if attempt < self.retry_policy.attempts_for(ex.code):
+                retry_after = ex.headers.get("Retry-After") if ex.headers else None
+                delay = self.retry_policy.delay_seconds(attempt, retry_after)
+            if delay is None:
+                raise error from ex
+            logger.warning(
+                "LLM HTTP %s，%.1f 秒后第 %d 次重试", ex.code, delay, attempt + 1
+            )
+            self.retry_policy.sleep(delay)
+        except (URLError, TimeoutError, HTTPException) as ex:
+            self.circuit_breaker.record_failure()
+            if attempt >= self.retry_policy.attempts_for():
+                raise RuntimeError(f"LLM 网络错误: {ex}") from ex
+            delay = self.retry_policy.delay_seconds(attempt)
+            logger.warning(
+                "LLM 网络错误 %s，%.1f 秒后第 %d 次重试", ex, delay, attempt + 1
+            )
+            self.retry_policy.sleep(delay)
+        return None
+
+    def _post(self, endpoint: str, headers: dict, body: bytes):
+        if self.pool is None:
+            request = Request(endpoint, data=body, headers=headers, method="POST")
+            return urlopen(request, timeout=self.timeout_seconds)
+        # 复用的空闲连接已被对端关闭时换新连接重发一次，不计入熔断与退避：
+        # 补全请求没有副作用，重复发送只多一次计费。
+        return self.pool.request(
+            "POST", endpoint, headers=headers, body=body, resend_on_stale=True
+        )
+
+    def _governed(self):
+        if self.governor is None:
+            return nullcontext()
+        return self.governor.slot()
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close()
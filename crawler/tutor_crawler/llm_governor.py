@@ -0,0 +1,187 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+
+class LlmRequestGovernor:
+    """本机多进程共享的 LLM 请求限流器，状态落盘到 SQLite 文件。
+
+    - 令牌桶限制全局每分钟请求数 ``requests_per_minute``，桶容量 ``burst``
+    - 在途请求数不超过 ``max_in_flight``；进程异常退出遗留的占位在
+      ``lease_seconds`` 后自动回收
+    - 每次取令牌在 ``BEGIN IMMEDIATE`` 事务内完成，多进程之间由 SQLite 写锁串行化
+
+    同一文件可被多个 ``import_articles.py`` / ``run_crawler.py`` 进程共用。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        requests_per_minute: float = 60,
+        max_in_flight: int = 4,
+        burst: int | None = None,
+        lease_seconds: float = 300.0,
+        poll_seconds: float = 0.2,
+        time_func=None,
+        sleep_func=None,
+    ) -> None:
+        self.path = Path(path)
+        self.requests_per_minute = max(0.001, float(requests_per_minute))
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.burst = max(1, int(burst if burst is not None else self.max_in_flight))
+        self.lease_seconds = max(1.0, float(lease_seconds))
+        self.poll_seconds = max(0.01, float(poll_seconds))
+        self._time = time_func or time.time
+        self._sleep = sleep_func or time.sleep
+        self._lock = threading.Lock()
+        self.acquired = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.last_wait_seconds = 0.0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(
+            str(self.path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_governor_bucket (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS llm_governor_slot (
+                slot_id TEXT PRIMARY KEY,
+                pid INTEGER NOT NULL,
+                acquired_at REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute(
+            "INSERT OR IGNORE INTO llm_governor_bucket(id, tokens, updated_at) "
+            "VALUES (1, ?, ?)",
+            (float(self.burst), self._time()),
+        )
+
+    @property
+    def rate_per_second(self) -> float:
+        return self.requests_per_minute / 60.0
+
+    def acquire(self) -> str:
+        """阻塞直到拿到令牌与在途名额，返回占位 ID（用于 release）。"""
+        started = self._time()
+        while True:
+            slot_id, wait = self._try_acquire()
+            if slot_id:
+                waited = max(0.0, self._time() - started)
+                with self._lock:
+                    self.acquired += 1
+                    self.last_wait_seconds = waited
+                    self.total_wait_seconds += waited
+                    self.max_wait_seconds = max(self.max_wait_seconds, waited)
+                return slot_id
+            self._sleep(max(self.poll_seconds, wait))
+
+    def release(self, slot_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM llm_governor_slot WHERE slot_id=?", (slot_id,))
+
+    @contextmanager
+    def slot(self):
+        slot_id = self.acquire()
+        try:
+            yield slot_id
+        finally:
+            self.release(slot_id)
+
+    def current_wait_seconds(self) -> float:
+        """按当前共享状态估算新请求需要等待的秒数（不占用令牌）。"""
+        with self._lock, self._transaction():
+            tokens, in_flight = self._refresh_locked(self._time())
+        return self._wait_for(tokens, in_flight)
+
+    def stats(self) -> dict:
+        with self._lock:
+            with self._transaction():
+                tokens, in_flight = self._refresh_locked(self._time())
+            acquired = self.acquired
+            total_wait = self.total_wait_seconds
+            return {
+                "requests_per_minute": self.requests_per_minute,
+                "max_in_flight": self.max_in_flight,
+                "in_flight": in_flight,
+                "tokens": round(tokens, 3),
+                "current_wait_seconds": round(self._wait_for(tokens, in_flight), 3),
+                "acquired": acquired,
+                "avg_wait_seconds": round(total_wait / acquired, 3) if acquired else 0.0,
+                "max_wait_seconds": round(self.max_wait_seconds, 3),
+                "last_wait_seconds": round(self.last_wait_seconds, 3),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def _try_acquire(self) -> tuple[str, float]:
+        now = self._time()
+        with self._lock, self._transaction():
+            tokens, in_flight = self._refresh_locked(now)
+            if tokens < 1 or in_flight >= self.max_in_flight:
+                return "", self._wait_for(tokens, in_flight)
+            slot_id = uuid.uuid4().hex
+            self._db.execute(
+                "UPDATE llm_governor_bucket SET tokens=? WHERE id=1",
+                (tokens - 1,),
+            )
+            self._db.execute(
+                "INSERT INTO llm_governor_slot(slot_id, pid, acquired_at) "
+                "VALUES (?, ?, ?)",
+                (slot_id, os.getpid(), now),
+            )
+            return slot_id, 0.0
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE 立即拿写锁，读-改-写期间其它进程只能排队。
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _refresh_locked(self, now: float) -> tuple[float, int]:
+        # 调用方已持有 BEGIN IMMEDIATE 事务：补充令牌并回收过期占位。
+        tokens, updated_at = self._db.execute(
+            "SELECT tokens, updated_at FROM llm_governor_bucket WHERE id=1"
+        ).fetchone()
+        elapsed = max(0.0, now - updated_at)
+        tokens = min(float(self.burst), tokens + elapsed * self.rate_per_second)
+        self._db.execute(
+            "UPDATE llm_governor_bucket SET tokens=?, updated_at=? WHERE id=1",
+            (tokens, max(now, updated_at)),
+        )
+        self._db.execute(
+            "DELETE FROM llm_governor_slot WHERE acquired_at<?",
+            (now - self.lease_seconds,),
+        )
+        in_flight = self._db.execute("SELECT COUNT(*) FROM llm_governor_slot").fetchone()[0]
+        return tokens, int(in_flight)
+
+    def _wait_for(self, tokens: float, in_flight: int) -> float:
+        token_wait = max(0.0, (1 - tokens) / self.rate_per_second)
+        if in_flight >= self.max_in_flight:
+            # 在途名额何时释放无法预知，按一个轮询间隔估算。
+            return max(token_wait, self.poll_seconds)
+        return token_wait
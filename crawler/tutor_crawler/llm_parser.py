@@ -1,8 +1,17 @@
 import json
+import logging
 import re
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 
+from tutor_crawler.llm_cache import LlmResponseCache
 from tutor_crawler.llm_client import RelayLlmClient
-from tutor_crawler.parser import TutoringInfoParser
+from tutor_crawler.parser import (
+    TutoringInfoParser,
+    fingerprint_hash,
+    parser_fingerprint,
+)
 
 
 SYSTEM_PROMPT = """
@@ -35,6 +44,20 @@ SYSTEM_PROMPT = """
 8) 禁止猜测：分块内不存在的字段必须返回空字符串。
 """.strip()
 
+# 每条 item 固定 16 个字段名与 JSON 结构的输出 token 估算，另加分块原文（snippet 摘抄）。
+OUTPUT_TOKENS_PER_ITEM = 120
+
+logger = logging.getLogger(__name__)
+_CJK_RE = re.compile(r"[\u3000-\u303f\u3400-\u9fff\uff00-\uffef]")
+
+
+def estimate_tokens(text: str) -> int:
+    """按字符粗估 token 数：中日文及全角符号每字约 1 个，其余字符约 4 个一个。"""
+    if not text:
+        return 0
+    cjk = len(_CJK_RE.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
 
 class LlmTutoringInfoParser:
     """LLM 主解析器：优先走模型，失败时回退规则解析。"""
@@ -44,10 +67,36 @@ class LlmTutoringInfoParser:
         llm_client: RelayLlmClient | None = None,
         fallback_parser: TutoringInfoParser | None = None,
         enable_fallback: bool = True,
+        chunk_workers: int = 4,
+        max_input_tokens: int = 6000,
+        max_output_tokens: int = 4000,
+        token_estimator: Callable[[str], int] | None = None,
+        block_cache: LlmResponseCache | None = None,
+        bypass_block_cache: bool = False,
     ) -> None:
         self.llm_client = llm_client or RelayLlmClient()
         self.fallback_parser = fallback_parser or TutoringInfoParser()
         self.enable_fallback = enable_fallback
+        # 多分块文章的分块并发请求数，<=1 时逐块串行请求。
+        self.chunk_workers = max(1, int(chunk_workers))
+        # 单次请求的输入/输出 token 预算，信息块按预算装箱后分批请求。
+        self.max_input_tokens = max(1, int(max_input_tokens))
+        self.max_output_tokens = max(1, int(max_output_tokens))
+        self.token_estimator = token_estimator or estimate_tokens
+        # 信息块级抽取缓存：同一招聘信息转载到多篇文章时，只把未缓存的块发给模型。
+        self.block_cache = block_cache
+        self.bypass_block_cache = bypass_block_cache
+        self._chunk_pool: ThreadPoolExecutor | None = None
+        self._chunk_pool_lock = threading.Lock()
+
+    def fingerprint(self) -> str:
+        # 未配置 LLM 时实际走规则解析，指纹与规则解析器一致。
+        rule_fingerprint = parser_fingerprint(self.fallback_parser)
+        if not self.llm_client.is_configured():
+            return rule_fingerprint
+        return "llm-" + fingerprint_hash(
+            [SYSTEM_PROMPT, getattr(self.llm_client, "model", ""), rule_fingerprint]
+        )
 
     def parse(self, article: dict) -> dict:
         items = self.parse_many(article)
@@ -56,8 +105,13 @@ class LlmTutoringInfoParser:
         return self.fallback_parser.parse(article)
 
     def parse_many(self, article: dict) -> list[dict]:
+        return self.parse_many_with_fingerprint(article)[0]
+
+    def parse_many_with_fingerprint(self, article: dict) -> tuple[list[dict], str]:
+        """返回 (条目, 指纹)：LLM 结果被采用时为 LLM 指纹，回退规则解析时为规则指纹。"""
+        rule_fingerprint = parser_fingerprint(self.fallback_parser)
         if not self.llm_client.is_configured():
-            return self.fallback_parser.parse_many(article)
+            return self.fallback_parser.parse_many(article), rule_fingerprint
 
         prepared_text = ""
         try:
@@ -65,7 +119,7 @@ class LlmTutoringInfoParser:
             raw_items = self._call_llm(article, prepared_text)
             parsed = self._normalize_items(article, raw_items, prepared_text)
             if parsed and self._is_aligned_with_blocks(parsed, prepared_text):
-                return parsed
+                return parsed, self.fingerprint()
         except Exception:
             if not self.enable_fallback:
                 raise
@@ -75,9 +129,9 @@ class LlmTutoringInfoParser:
             article, prepared_text
         )
         if fallback_refined:
-            return fallback_refined
+            return fallback_refined, rule_fingerprint
 
-        return self.fallback_parser.parse_many(article)
+        return self.fallback_parser.parse_many(article), rule_fingerprint
 
     def _fallback_parse_with_prepared_blocks(
         self, article: dict, prepared_text: str
@@ -171,23 +225,193 @@ class LlmTutoringInfoParser:
             blocks = [
                 block.strip() for block in content_text.split(marker) if block.strip()
             ]
-            if len(blocks) > 8:
-                merged_items: list[dict] = []
-                for i in range(0, len(blocks), 8):
-                    chunk_text = f"\n{marker}\n".join(blocks[i : i + 8])
-                    merged_items.extend(self._call_llm_single(article, chunk_text))
-                return merged_items
+        else:
+            blocks = [content_text]
+        if self.block_cache is None:
+            return self._request_blocks(article, content_text, blocks)
+
+        prompt_version = self._prompt_version()
+        keys = [
+            LlmResponseCache.make_block_key(prompt_version, block) for block in blocks
+        ]
+        items: list[dict | None] = [
+            None if self.bypass_block_cache else self._get_cached_block(key)
+            for key in keys
+        ]
+        pending = [index for index, item in enumerate(items) if item is None]
+        if not pending:
+            return items
+
+        if len(pending) < len(blocks):
+            pending_blocks = [blocks[index] for index in pending]
+            pending_items = self._request_blocks(
+                article, f"\n{marker}\n".join(pending_blocks), pending_blocks
+            )
+            if len(pending_items) == len(pending):
+                for index, item in zip(pending, pending_items):
+                    items[index] = item
+                    self._put_cached_block(keys[index], blocks[index], item)
+                return items
+            # 条数与分块对不上时无法按位置合并缓存结果，退回整篇请求。
+
+        requested = self._request_blocks(article, content_text, blocks)
+        if len(requested) == len(blocks):
+            for key, block, item in zip(keys, blocks, requested):
+                self._put_cached_block(key, block, item)
+        return requested
+
+    def _prompt_version(self) -> str:
+        return fingerprint_hash([SYSTEM_PROMPT, self.llm_client.model])
+
+    def _get_cached_block(self, key: str) -> dict | None:
+        content = self.block_cache.get(key)
+        if content is None:
+            return None
+        try:
+            item = json.loads(content)
+        except ValueError:
+            return None
+        return item if isinstance(item, dict) else None
 
-        return self._call_llm_single(article, content_text)
+    def _put_cached_block(self, key: str, block: str, item: dict) -> None:
+        # snippet 不在该块原文中的结果说明模型没按块对齐，不写入缓存。
+        if not self._item_matches_block(item, block):
+            return
+        self.block_cache.put(key, json.dumps(item, ensure_ascii=False))
 
-    def _call_llm_single(self, article: dict, content_text: str) -> list[dict]:
-        user_prompt = (
+    @staticmethod
+    def _item_matches_block(item: dict, block: str) -> bool:
+        field_snippets = [
+            ("city", "city_snippet"),
+            ("district", "district_snippet"),
+            ("grade", "grade_snippet"),
+            ("subject", "subject_snippet"),
+            ("address", "address_snippet"),
+            ("time_schedule", "time_schedule_snippet"),
+            ("salary_text", "salary_snippet"),
+            ("teacher_requirement", "teacher_requirement_snippet"),
+        ]
+        for field, snippet_field in field_snippets:
+            snippet = (item.get(snippet_field) or "").strip() or (
+                item.get(field) or ""
+            ).strip()
+            if snippet and snippet not in block:
+                return False
+        return True
+
+    def _request_blocks(
+        self, article: dict, content_text: str, blocks: list[str]
+    ) -> list[dict]:
+        marker = "<<<ITEM_BREAK>>>"
+        chunks = self._plan_chunks(article, blocks)
+        if len(chunks) <= 1:
+            return self._call_llm_single(article, content_text)
+
+        chunk_texts = [f"\n{marker}\n".join(chunk) for chunk in chunks]
+        merged_items: list[dict] = []
+        for items in self._call_llm_chunks(article, chunk_texts):
+            merged_items.extend(items)
+        return merged_items
+
+    def _plan_chunks(self, article: dict, blocks: list[str]) -> list[list[str]]:
+        """按输入/输出 token 预算顺序装箱；单块超预算时独占一次请求。"""
+        overhead = self.token_estimator(SYSTEM_PROMPT) + self.token_estimator(
+            self._build_user_prompt(article, "")
+        )
+        separator = self.token_estimator("\n<<<ITEM_BREAK>>>\n")
+
+        chunks: list[list[str]] = []
+        plan: list[tuple[int, int, int]] = []
+        current: list[str] = []
+        input_tokens = overhead
+        output_tokens = 0
+        for block in blocks:
+            block_tokens = self.token_estimator(block)
+            block_input = block_tokens + (separator if current else 0)
+            block_output = block_tokens + OUTPUT_TOKENS_PER_ITEM
+            if current and (
+                input_tokens + block_input > self.max_input_tokens
+                or output_tokens + block_output > self.max_output_tokens
+            ):
+                chunks.append(current)
+                plan.append((len(current), input_tokens, output_tokens))
+                current = []
+                input_tokens = overhead
+                output_tokens = 0
+                block_input = block_tokens
+            current.append(block)
+            input_tokens += block_input
+            output_tokens += block_output
+        if current:
+            chunks.append(current)
+            plan.append((len(current), input_tokens, output_tokens))
+
+        over_budget = sum(
+            1
+            for _, tokens_in, tokens_out in plan
+            if tokens_in > self.max_input_tokens or tokens_out > self.max_output_tokens
+        )
+        logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            "LLM 分块计划 %s: %d 个信息块 -> %d 次请求 %s，超预算 %d 次"
+            "（预算 input=%d output=%d）",
+            article.get("source_url", ""),
+            len(blocks),
+            len(chunks),
+            [
+                {"blocks": count, "input_tokens": tokens_in, "output_tokens": tokens_out}
+                for count, tokens_in, tokens_out in plan
+            ],
+            over_budget,
+            self.max_input_tokens,
+            self.max_output_tokens,
+        )
+        return chunks
+
+    def _call_llm_chunks(self, article: dict, chunk_texts: list[str]) -> list[list[dict]]:
+        """并发请求各分块，按原顺序返回；任一分块失败时取消未开始的分块并抛出异常。"""
+        if self.chunk_workers <= 1:
+            return [self._call_llm_single(article, text) for text in chunk_texts]
+
+        pool = self._get_chunk_pool()
+        futures = [
+            pool.submit(self._call_llm_single, article, text) for text in chunk_texts
+        ]
+        try:
+            return [future.result() for future in futures]
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+    def _get_chunk_pool(self) -> ThreadPoolExecutor:
+        # 同一解析器的所有文章共享一个有界线程池，并发导入时总请求数也受限。
+        with self._chunk_pool_lock:
+            if self._chunk_pool is None:
+                self._chunk_pool = ThreadPoolExecutor(
+                    max_workers=self.chunk_workers, thread_name_prefix="llm-chunk"
+                )
+            return self._chunk_pool
+
+    def close(self) -> None:
+        with self._chunk_pool_lock:
+            pool = self._chunk_pool
+            self._chunk_pool = None
+        if pool is not None:
+            pool.shutdown(wait=True)
+
+    @staticmethod
+    def _build_user_prompt(article: dict, content_text: str) -> str:
+        return (
             "请解析以下家教文章 content_text，按要求返回 JSON。\n\n"
             f"source_url: {article.get('source_url', '')}\n"
             f"published_at: {article.get('published_at', '')}\n"
             "content_text:\n"
             f"{content_text}"
         )
+
+    def _call_llm_single(self, article: dict, content_text: str) -> list[dict]:
+        user_prompt = self._build_user_prompt(article, content_text)
         content = self.llm_client.chat_completion(SYSTEM_PROMPT, user_prompt)
         payload = self._safe_json_loads(content)
         items = payload.get("items") if isinstance(payload, dict) else None
@@ -0,0 +1,187 @@
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+logger = logging.getLogger(__name__)
+
+# 默认按状态码配置的最大尝试次数；未列出的状态码（如 400/401）不重试。
+DEFAULT_STATUS_ATTEMPTS = {
+    408: 3,
+    429: 5,
+    500: 3,
+    502: 3,
+    503: 5,
+    504: 3,
+}
+
+
+class CircuitOpenError(RuntimeError):
+    """熔断器打开期间直接拒绝请求。"""
+
+
+class RetryPolicy:
+    """LLM 请求重试策略。
+
+    - 网络错误最多尝试 ``max_attempts`` 次；HTTP 错误按 ``status_attempts`` 配置，
+      未配置的状态码不重试
+    - 响应带 ``Retry-After`` 时按其等待，超过 ``max_retry_after_seconds`` 则放弃
+    - 否则使用 full jitter 指数退避：``uniform(0, min(max_delay, base * 2**(n-1)))``
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        status_attempts: dict[int, int] | None = None,
+        base_delay_seconds: float = 1.0,
+        max_delay_seconds: float = 30.0,
+        max_retry_after_seconds: float = 60.0,
+        random_func=None,
+        sleep_func=None,
+        time_func=None,
+    ) -> None:
+        self.max_attempts = max(1, int(max_attempts))
+        self.status_attempts = dict(
+            DEFAULT_STATUS_ATTEMPTS if status_attempts is None else status_attempts
+        )
+        self.base_delay_seconds = max(0.0, float(base_delay_seconds))
+        self.max_delay_seconds = max(0.0, float(max_delay_seconds))
+        self.max_retry_after_seconds = max(0.0, float(max_retry_after_seconds))
+        self._random = random_func or random.random
+        self._sleep = sleep_func or time.sleep
+        self._time = time_func or time.time
+
+    @staticmethod
+    def parse_status_attempts(values: list[str]) -> dict[int, int]:
+        """解析命令行的 ``状态码=次数`` 列表，在默认配置上覆盖。"""
+        status_attempts = dict(DEFAULT_STATUS_ATTEMPTS)
+        for value in values:
+            code, sep, attempts = value.partition("=")
+            if not sep:
+                raise ValueError(f"重试配置格式应为 状态码=次数: {value}")
+            status_attempts[int(code)] = int(attempts)
+        return status_attempts
+
+    def is_retryable_status(self, status: int) -> bool:
+        return self.status_attempts.get(status, 1) > 1
+
+    def attempts_for(self, status: int | None = None) -> int:
+        if status is None:
+            return self.max_attempts
+        return max(1, self.status_attempts.get(status, 1))
+
+    def backoff_seconds(self, attempt: int) -> float:
+        cap = min(self.max_delay_seconds, self.base_delay_seconds * 2 ** (attempt - 1))
+        return self._random() * cap
+
+    def delay_seconds(self, attempt: int, retry_after: str | None = None) -> float | None:
+        """第 ``attempt`` 次失败后的等待秒数；返回 None 表示不再重试。"""
+        wait = self.parse_retry_after(retry_after, self._time())
+        if wait is None:
+            return self.backoff_seconds(attempt)
+        if wait > self.max_retry_after_seconds:
+            return None
+        return wait
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            self._sleep(seconds)
+
+    @staticmethod
+    def parse_retry_after(value: str | None, now: float) -> float | None:
+        text = (value or "").strip()
+        if not text:
+            return None
+        if text.isdigit():
+            return float(text)
+        try:
+            when = parsedate_to_datetime(text)
+        except (TypeError, ValueError, IndexError):
+            return None
+        if when is None:
+            return None
+        return max(0.0, when.timestamp() - now)
+
+
+class CircuitBreaker:
+    """连续失败达到阈值后熔断，冷却结束后放行单个探测请求。
+
+    状态：closed（正常）→ open（拒绝请求）→ half_open（探测中）→ closed/open。
+    探测请求既未记录成功也未记录失败就结束时（如意外异常），须调用 ``release_probe``
+    交还探测名额，否则熔断器会一直停在 half_open。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout_seconds: float = 60.0,
+        time_func=None,
+    ) -> None:
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.reset_timeout_seconds = max(0.0, float(reset_timeout_seconds))
+        self._time = time_func or time.monotonic
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_owner: int | None = None
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state_locked()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._current_state_locked()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._probe_owner is None:
+                self._probe_owner = threading.get_ident()
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("LLM 熔断恢复")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_owner = None
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            probing = self._state != self.CLOSED
+            if probing or self._failures >= self.failure_threshold:
+                if self._state == self.CLOSED:
+                    logger.warning(
+                        "LLM 连续失败 %d 次，熔断 %.0f 秒",
+                        self._failures,
+                        self.reset_timeout_seconds,
+                    )
+                self._state = self.OPEN
+                self._opened_at = self._time()
+                self._probe_owner = None
+
+    def release_probe(self) -> None:
+        """当前线程持有探测名额时交还，状态保持 half_open，下一个请求可继续探测。"""
+        with self._lock:
+            if self._probe_owner == threading.get_ident():
+                self._probe_owner = None
+
+    def _current_state_locked(self) -> str:
+        if (
+            self._state == self.OPEN
+            and self._time() - self._opened_at >= self.reset_timeout_seconds
+        ):
+            self._state = self.HALF_OPEN
+        return self._state
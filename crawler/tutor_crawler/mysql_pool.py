@@ -0,0 +1,173 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class MySQLConnectionPool:
+    """有界、线程安全的数据库连接池。
+
+    - 最多同时持有 ``max_size`` 条连接，耗尽时等待归还，超过
+      ``checkout_timeout_seconds`` 抛出 TimeoutError
+    - 取用空闲连接前先 ``ping``，失效连接丢弃后重新取用
+    - 连接存活超过 ``max_lifetime_seconds`` 或空闲超过 ``idle_timeout_seconds`` 即淘汰
+
+    ``connect`` 为无参连接工厂，返回的连接需支持 ping / rollback / close。
+    """
+
+    def __init__(
+        self,
+        connect,
+        max_size: int = 8,
+        max_lifetime_seconds: float = 1800.0,
+        idle_timeout_seconds: float = 300.0,
+        checkout_timeout_seconds: float = 30.0,
+        time_func=None,
+    ) -> None:
+        self._connect = connect
+        self.max_size = max(1, int(max_size))
+        self.max_lifetime_seconds = float(max_lifetime_seconds)
+        self.idle_timeout_seconds = float(idle_timeout_seconds)
+        self.checkout_timeout_seconds = float(checkout_timeout_seconds)
+        self._time = time_func or time.monotonic
+        self._cond = threading.Condition()
+        # 空闲连接：(conn, created_at, idle_since)，后进先出以便冷连接自然过期。
+        self._idle: list[tuple[object, float, float]] = []
+        self._created_at: dict[int, float] = {}
+        self._size = 0
+        self._closed = False
+        self.created_connections = 0
+        self.reused_connections = 0
+        self.evicted_connections = 0
+
+    def acquire(self):
+        deadline = self._time() + self.checkout_timeout_seconds
+        while True:
+            conn, should_create = self._checkout(deadline)
+            if should_create:
+                return self._create()
+            if self._ping(conn):
+                with self._cond:
+                    self.reused_connections += 1
+                return conn
+            self._discard(conn)
+
+    def release(self, conn, reusable: bool = True) -> None:
+        now = self._time()
+        with self._cond:
+            created_at = self._created_at.get(id(conn), now)
+            expired = now - created_at > self.max_lifetime_seconds
+            if reusable and not expired and not self._closed:
+                self._idle.append((conn, created_at, now))
+                self._cond.notify()
+                return
+        self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        reusable = True
+        try:
+            yield conn
+        except BaseException:
+            # 归还前回滚未提交事务；回滚失败说明连接已损坏，直接丢弃。
+            try:
+                conn.rollback()
+            except Exception:  # noqa: BLE001
+                reusable = False
+            raise
+        finally:
+            self.release(conn, reusable=reusable)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = self._idle
+            self._idle = []
+        for conn, _, _ in idle:
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "created": self.created_connections,
+                "reused": self.reused_connections,
+                "evicted": self.evicted_connections,
+            }
+
+    def _checkout(self, deadline: float) -> tuple[object, bool]:
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("connection pool is closed")
+                expired = self._pop_expired_locked()
+                if expired:
+                    # 关闭连接可能阻塞，放到锁外执行。
+                    self._cond.release()
+                    try:
+                        for conn in expired:
+                            self._discard(conn)
+                    finally:
+                        self._cond.acquire()
+                    continue
+                if self._idle:
+                    conn, _, _ = self._idle.pop()
+                    return conn, False
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, True
+                remaining = deadline - self._time()
+                if remaining <= 0:
+                    raise TimeoutError(
+                        f"no database connection available within "
+                        f"{self.checkout_timeout_seconds}s (max_size={self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+    def _pop_expired_locked(self) -> list:
+        now = self._time()
+        expired = []
+        alive = []
+        for conn, created_at, idle_since in self._idle:
+            if (
+                now - idle_since > self.idle_timeout_seconds
+                or now - created_at > self.max_lifetime_seconds
+            ):
+                expired.append(conn)
+            else:
+                alive.append((conn, created_at, idle_since))
+        self._idle = alive
+        return expired
+
+    def _create(self):
+        try:
+            conn = self._connect()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._created_at[id(conn)] = self._time()
+            self.created_connections += 1
+        return conn
+
+    @staticmethod
+    def _ping(conn) -> bool:
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:  # noqa: BLE001
+            return False
+
+    def _discard(self, conn) -> None:
+        with self._cond:
+            if self._created_at.pop(id(conn), None) is not None:
+                self._size -= 1
+                self.evicted_connections += 1
+            self._cond.notify()
+        try:
+            conn.close()
+        except Exception:  # noqa: BLE001
+            pass
@@ -1,3 +1,5 @@
+import hashlib
+import json
 import re
 from html.parser import HTMLParser
 
@@ -5,6 +7,34 @@ from html.parser import HTMLParser
 ITEM_BREAK_MARKER = "<<<ITEM_BREAK>>>"
 
 
+def parser_fingerprint(parser) -> str:
+    """解析器指纹：规则或提示词变化后指纹随之变化，用于识别需要重解析的文章。"""
+    fingerprint = getattr(parser, "fingerprint", None)
+    return fingerprint() if callable(fingerprint) else ""
+
+
+def parse_with_fingerprint(parser, article: dict) -> tuple[list[dict], str]:
+    """解析文章，返回 (条目, 实际产出这些条目的解析器指纹)。
+
+    LLM 解析失败回退规则解析时，指纹为规则解析器的指纹，``--stale-only`` 之后仍会重解析。
+    """
+    parse_many_with_fingerprint = getattr(parser, "parse_many_with_fingerprint", None)
+    if callable(parse_many_with_fingerprint):
+        return parse_many_with_fingerprint(article)
+    infos = (
+        parser.parse_many(article)
+        if hasattr(parser, "parse_many")
+        else [parser.parse(article)]
+    )
+    return infos, parser_fingerprint(parser)
+
+
+def fingerprint_hash(payload) -> str:
+    return hashlib.sha256(
+        json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    ).hexdigest()[:16]
+
+
 class TutoringInfoParser:
     def __init__(self) -> None:
         self.value_stop_lookahead = (
@@ -46,6 +76,11 @@ class TutoringInfoParser:
             "salary_text": "salary_snippet",
         }
 
+    def fingerprint(self) -> str:
+        return "rule-" + fingerprint_hash(
+            [self.value_stop_lookahead, self.patterns, self.snippet_field_map]
+        )
+
     def parse(self, article: dict) -> dict:
         items = self.parse_many(article)
         if items:
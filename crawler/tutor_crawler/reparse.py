@@ -0,0 +1,157 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from tutor_crawler.html_archive import read_html
+from tutor_crawler.parser import parse_with_fingerprint, parser_fingerprint
+from tutor_crawler.service import CrawlService
+
+
+_worker_parser = None
+
+_BATCH_COUNTERS = (
+    "articles",
+    "reparsed",
+    "empty",
+    "failed",
+    "fallback",
+    "inserted",
+    "updated",
+    "deleted",
+    "unchanged",
+)
+
+
+def _init_worker(parser_factory) -> None:
+    _use_parser(parser_factory())
+
+
+def _use_parser(parser) -> None:
+    global _worker_parser
+    _worker_parser = parser
+
+
+def _parse_article(article: dict) -> tuple[str, list[dict] | None, str, str]:
+    """解析单篇文章，返回 (source_url, 有效条目, 解析器指纹, 错误信息)；解析异常时条目为 None。
+
+    指纹取实际产出条目的解析器，LLM 回退规则解析的文章不会被标记为已是最新。
+    """
+    try:
+        article = dict(article)
+        article["content_html"] = read_html(article.get("content_html", ""))
+        infos, fingerprint = parse_with_fingerprint(_worker_parser, article)
+        infos = [info for info in infos if CrawlService._is_meaningful_info(info)]
+        return article["source_url"], infos, fingerprint, ""
+    except Exception as ex:  # noqa: BLE001
+        return article["source_url"], None, "", str(ex)
+
+
+def _batches(iterable, size: int):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_reparse(
+    storage,
+    parser_factory,
+    platform_code: str = "",
+    published_from: str = "",
+    published_to: str = "",
+    processes: int = 1,
+    batch_size: int = 200,
+    stale_only: bool = False,
+    fingerprint: str = "",
+) -> dict:
+    """流式读取 article_raw 并重新解析，按批回写 tutoring_info。
+
+    - ``parser_factory`` 为无参可 pickle 的解析器工厂，每个子进程各构建一次
+    - ``processes<=1`` 时在当前进程解析（LLM 解析以网络为主，无需多进程）
+    - 每批结果在一个事务内按文章 reconcile；解析为空或异常的文章保留原有条目
+    - 解析成功（含解析为空）的文章打上实际产出结果的解析器指纹，LLM 回退规则解析的
+      文章记为 ``fallback``、打规则指纹；``stale_only`` 时跳过指纹已是最新的文章
+    - ``fingerprint`` 为当前解析器指纹，多进程时传入可免去在主进程构建完整解析器
+
+    不读写 crawl_task / crawl_task_log，仅用于解析器升级后的全量回刷。
+    """
+    processes = max(1, int(processes))
+    parser = None
+    if processes <= 1 or not fingerprint:
+        parser = parser_factory()
+        fingerprint = fingerprint or parser_fingerprint(parser)
+    summary = {
+        "parser_fingerprint": fingerprint,
+        **{key: 0 for key in _BATCH_COUNTERS},
+        "errors": [],
+    }
+    batch_size = max(1, int(batch_size))
+    articles = storage.iter_articles(
+        platform_code=platform_code,
+        published_from=published_from,
+        published_to=published_to,
+        stale_fingerprint=fingerprint if stale_only else "",
+    )
+
+    executor = None
+    if processes > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=processes,
+            initializer=_init_worker,
+            initargs=(parser_factory,),
+        )
+    else:
+        _use_parser(parser)
+    try:
+        for batch in _batches(articles, batch_size):
+            if executor:
+                chunksize = max(1, len(batch) // (processes * 4))
+                parsed = list(executor.map(_parse_article, batch, chunksize=chunksize))
+            else:
+                parsed = [_parse_article(article) for article in batch]
+            _write_batch(storage, parsed, fingerprint, summary)
+    finally:
+        articles.close()
+        if executor:
+            executor.shutdown(wait=True)
+    return summary
+
+
+def _write_batch(storage, parsed: list, fingerprint: str, summary: dict) -> None:
+    def write() -> dict:
+        # 在局部计数上累加，事务因死锁重试时不会重复计数。
+        batch = {key: 0 for key in _BATCH_COUNTERS}
+        errors = []
+        for source_url, infos, used_fingerprint, error in parsed:
+            batch["articles"] += 1
+            if infos is None:
+                batch["failed"] += 1
+                errors.append({"source_url": source_url, "error": error})
+                continue
+            if used_fingerprint != fingerprint:
+                batch["fallback"] += 1
+            if not infos:
+                batch["empty"] += 1
+                if used_fingerprint:
+                    storage.stamp_parser_fingerprint(source_url, used_fingerprint)
+                continue
+            changes = storage.reconcile_tutoring_infos(
+                source_url, infos, parser_fingerprint=used_fingerprint
+            )
+            batch["reparsed"] += 1
+            for key in ("inserted", "updated", "deleted", "unchanged"):
+                batch[key] += changes[key]
+        return {"counts": batch, "errors": errors}
+
+    run_in_transaction = getattr(storage, "run_in_transaction", None)
+    if run_in_transaction:
+        result = run_in_transaction(write)
+    else:
+        with storage.unit_of_work():
+            result = write()
+    for key, value in result["counts"].items():
+        summary[key] += value
+    for error in result["errors"]:
+        if len(summary["errors"]) < 20:
+            summary["errors"].append(error)
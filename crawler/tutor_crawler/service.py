@@ -1,5 +1,13 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from urllib.parse import urlparse
+
 from tutor_crawler.article import parse_article_html
 from tutor_crawler.discovery import discover_article_urls
+from tutor_crawler.parser import parse_with_fingerprint
 from tutor_crawler.platform_router import (
     DEFAULT_PLATFORM_CODE,
     ParserProtocol,
@@ -7,6 +15,29 @@ from tutor_crawler.platform_router import (
 )
 
 
+class StageTimings:
+    """单次扫描内各阶段的累计耗时，并发 worker 共享同一实例。"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._seconds: dict[str, float] = {}
+
+    @contextmanager
+    def timed(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            # 并发模式下各阶段耗时为所有 worker 累计值，可能大于 wall_seconds。
+            with self._lock:
+                self._seconds[stage] = self._seconds.get(stage, 0.0) + elapsed
+
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            return {stage: round(seconds, 3) for stage, seconds in self._seconds.items()}
+
+
 class CrawlService:
     def __init__(
         self,
@@ -16,6 +47,10 @@ class CrawlService:
         parser,
         parser_router: PlatformParserRouter | None = None,
         default_platform_code: str = DEFAULT_PLATFORM_CODE,
+        max_workers: int = 1,
+        per_host_workers: int = 0,
+        streaming_fetch: bool = False,
+        known_url_index=None,
     ) -> None:
         self.storage = storage
         self.list_fetcher = list_fetcher
@@ -26,6 +61,11 @@ class CrawlService:
         )
         if parser_router is None:
             self.parser_router.register(default_platform_code, parser)
+        # max_workers<=1 保持串行；per_host_workers<=0 表示不单独限制同 host 并发。
+        self.max_workers = max(1, int(max_workers))
+        self.per_host_workers = max(0, int(per_host_workers))
+        self.streaming_fetch = streaming_fetch
+        self.known_url_index = known_url_index
 
     def run_daily_scan(
         self,
@@ -33,109 +73,252 @@ class CrawlService:
         include_pattern: str | None = None,
         platform_code: str = DEFAULT_PLATFORM_CODE,
     ) -> dict:
-        list_html = self.list_fetcher.fetch(list_url)
-        urls = discover_article_urls(
-            list_html, base_url=list_url, include_pattern=include_pattern
-        )
-        created_tasks = 0
-        succeeded = 0
-        failed = 0
-
-        for source_url in urls:
-            task = self.storage.get_task_by_url(source_url, platform_code)
-            if task:
-                continue
-
-            task_id = self.storage.create_task(
-                source_url,
-                "AUTO",
-                platform_code=platform_code,
+        started = time.perf_counter()
+        # 耗时按本次扫描单独统计，不与并行的 process_task / 重试混在一起。
+        timings = StageTimings()
+
+        with timings.timed("list_fetch"):
+            list_html = self._fetch_list(list_url)
+        if list_html is None:
+            # 列表页未变化（304），跳过发现与后续全部抓取解析。
+            return {
+                "discovered": 0,
+                "created_tasks": 0,
+                "succeeded": 0,
+                "failed": 0,
+                "not_modified": True,
+                "wall_seconds": round(time.perf_counter() - started, 3),
+                "stage_seconds": timings.snapshot(),
+            }
+
+        with timings.timed("discover"):
+            urls = discover_article_urls(
+                list_html, base_url=list_url, include_pattern=include_pattern
             )
-            created_tasks += 1
-            if self.process_task(task_id):
-                succeeded += 1
-            else:
-                failed += 1
+
+        # 任务创建保持串行，保证同 URL 幂等与任务 ID 顺序稳定；并发只作用于抓取解析阶段。
+        task_items: list[tuple[int, str]] = []
+        with timings.timed("dedup"):
+            for source_url in self._filter_new_urls(urls, platform_code):
+                try:
+                    task_id = self.storage.create_task(
+                        source_url,
+                        "AUTO",
+                        platform_code=platform_code,
+                    )
+                except Exception:  # noqa: BLE001
+                    # 其他进程可能已并发创建同 URL 任务，唯一约束冲突时按已存在跳过。
+                    if self.storage.get_task_by_url(source_url, platform_code):
+                        continue
+                    raise
+                if self.known_url_index is not None:
+                    self.known_url_index.add(source_url, platform_code)
+                task_items.append((task_id, source_url))
+        # 任务都已落库后再保存列表页 validator，前面失败时下次仍会重新发现。
+        if hasattr(self.list_fetcher, "commit_validators"):
+            self.list_fetcher.commit_validators(list_url)
+
+        results = self._process_tasks(task_items, timings)
+        succeeded = sum(1 for ok in results if ok)
 
         return {
             "discovered": len(urls),
-            "created_tasks": created_tasks,
+            "created_tasks": len(task_items),
             "succeeded": succeeded,
-            "failed": failed,
+            "failed": len(results) - succeeded,
+            "not_modified": False,
+            "wall_seconds": round(time.perf_counter() - started, 3),
+            "stage_seconds": timings.snapshot(),
         }
 
-    def process_task(self, task_id: int) -> bool:
-        task = self.storage.get_task(task_id)
-        if not task:
-            return False
+    def _filter_new_urls(self, urls: list[str], platform_code: str) -> list[str]:
+        if self.known_url_index is not None:
+            return self.known_url_index.filter_new(urls, platform_code)
+        if hasattr(self.storage, "get_existing_task_urls"):
+            existing = self.storage.get_existing_task_urls(urls, platform_code)
+            return [url for url in urls if url not in existing]
+        return [
+            url for url in urls if not self.storage.get_task_by_url(url, platform_code)
+        ]
 
-        source_url = task["source_url"]
-        platform_code = self.default_platform_code
-        if hasattr(task, "keys") and "platform_code" in task.keys():
-            platform_code = task["platform_code"] or self.default_platform_code
-        parser = self.resolve_parser(platform_code)
-        if not parser:
-            self.storage.add_task_log(
-                task_id,
-                "PARSE",
-                "FAILED",
-                error_type="UNSUPPORTED_PLATFORM",
-                error_message=f"unsupported platform_code: {platform_code}",
-            )
-            self.storage.update_task_status(task_id, "FAILED")
-            return False
+    def _fetch_list(self, list_url: str) -> str | None:
+        if hasattr(self.list_fetcher, "fetch_if_modified"):
+            return self.list_fetcher.fetch_if_modified(list_url)
+        return self.list_fetcher.fetch(list_url)
 
-        self.storage.update_task_status(task_id, "RUNNING")
-        self.storage.add_task_log(task_id, "FETCH", "RUNNING")
+    def _process_tasks(
+        self, task_items: list[tuple[int, str]], timings: StageTimings
+    ) -> list[bool]:
+        if self.max_workers <= 1 or len(task_items) <= 1:
+            return [self.process_task(task_id, timings) for task_id, _ in task_items]
 
-        try:
-            html = self.article_fetcher.fetch(source_url)
-            article = parse_article_html(source_url=source_url, html=html)
-            article["platform_code"] = platform_code
-            self.storage.add_task_log(task_id, "FETCH", "SUCCESS")
+        # 按 host 分队列，只在该 host 有空余名额时提交，避免同 host 任务占满线程池、
+        # 其他 host 的任务排在后面空等。
+        workers = min(self.max_workers, len(task_items))
+        host_limit = self.per_host_workers or workers
+        queues: dict[str, deque[int]] = {}
+        for index, (_, source_url) in enumerate(task_items):
+            queues.setdefault(urlparse(source_url).netloc.lower(), deque()).append(index)
+        in_flight = dict.fromkeys(queues, 0)
+        results: list[bool] = [False] * len(task_items)
 
-            self.storage.add_task_log(task_id, "PARSE", "RUNNING")
-            infos = (
-                parser.parse_many(article)
-                if hasattr(parser, "parse_many")
-                else [parser.parse(article)]
-            )
-            infos = [info for info in infos if self._is_meaningful_info(info)]
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="crawl-worker"
+        ) as executor:
+            running: dict = {}
 
-            # 即使解析为空，也先持久化 article_raw，便于回溯失败输入与后续重试。
-            self.storage.save_article(article)
+            def fill() -> None:
+                submitted = True
+                while submitted and len(running) < workers:
+                    submitted = False
+                    for host, queue in queues.items():
+                        if len(running) >= workers:
+                            break
+                        if not queue or in_flight[host] >= host_limit:
+                            continue
+                        index = queue.popleft()
+                        future = executor.submit(
+                            self.process_task, task_items[index][0], timings
+                        )
+                        running[future] = (index, host)
+                        in_flight[host] += 1
+                        submitted = True
+
+            fill()
+            while running:
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    index, host = running.pop(future)
+                    in_flight[host] -= 1
+                    results[index] = future.result()
+                fill()
+        # 工作线程已全部退出，及时关闭它们的存储连接。
+        if hasattr(self.storage, "prune_connections"):
+            self.storage.prune_connections()
+        return results
+
+    def process_task(self, task_id: int, timings: StageTimings | None = None) -> bool:
+        timings = timings or StageTimings()
+        # 写操作按阶段合并为少量事务：抓取与解析期间不持有事务，避免长时间占用写锁。
+        with self._unit_of_work():
+            task = self.storage.get_task(task_id)
+            if not task:
+                return False
 
-            if not infos:
-                # 若本次未提取到有效结构化数据，保留历史结果，避免因临时页面异常清空既有数据。
+            source_url = task["source_url"]
+            platform_code = self.default_platform_code
+            if hasattr(task, "keys") and "platform_code" in task.keys():
+                platform_code = task["platform_code"] or self.default_platform_code
+            parser = self.resolve_parser(platform_code)
+            if not parser:
                 self.storage.add_task_log(
                     task_id,
                     "PARSE",
                     "FAILED",
-                    error_type="EMPTY_PARSED_RESULT",
-                    error_message="no meaningful parsed fields",
+                    error_type="UNSUPPORTED_PLATFORM",
+                    error_message=f"unsupported platform_code: {platform_code}",
                 )
                 self.storage.update_task_status(task_id, "FAILED")
                 return False
 
-            if hasattr(self.storage, "delete_tutoring_info_by_article"):
-                self.storage.delete_tutoring_info_by_article(source_url)
+            self.storage.update_task_status(task_id, "RUNNING")
+            self.storage.add_task_log(task_id, "FETCH", "RUNNING")
 
-            for info in infos:
-                self.storage.save_tutoring_info(info)
-            self.storage.add_task_log(task_id, "PARSE", "SUCCESS")
-            self.storage.update_task_status(task_id, "SUCCESS")
-            return True
-        except Exception as ex:  # noqa: BLE001
-            self.storage.add_task_log(
-                task_id,
-                "EXECUTE",
-                "FAILED",
-                error_type="RUNTIME_ERROR",
-                error_message=str(ex),
+        try:
+            article = self._fetch_article(source_url, timings)
+            article["platform_code"] = platform_code
+            self._add_task_logs(
+                [
+                    {"task_id": task_id, "stage": "FETCH", "status": "SUCCESS"},
+                    {"task_id": task_id, "stage": "PARSE", "status": "RUNNING"},
+                ]
             )
-            self.storage.update_task_status(task_id, "FAILED")
+
+            with timings.timed("parse"):
+                # 指纹取实际产出条目的解析器：LLM 回退规则解析时打上规则指纹。
+                infos, fingerprint = parse_with_fingerprint(parser, article)
+            infos = [info for info in infos if self._is_meaningful_info(info)]
+
+            def save() -> bool:
+                # 即使解析为空，也先持久化 article_raw，便于回溯失败输入与后续重试。
+                self.storage.save_article(article)
+
+                if not infos:
+                    # 若本次未提取到有效结构化数据，保留历史结果，避免因临时页面异常清空既有数据。
+                    self.storage.add_task_log(
+                        task_id,
+                        "PARSE",
+                        "FAILED",
+                        error_type="EMPTY_PARSED_RESULT",
+                        error_message="no meaningful parsed fields",
+                    )
+                    self.storage.update_task_status(task_id, "FAILED")
+                    return False
+
+                self._save_tutoring_infos(source_url, infos, fingerprint)
+                self.storage.add_task_log(task_id, "PARSE", "SUCCESS")
+                self.storage.update_task_status(task_id, "SUCCESS")
+                return True
+
+            with timings.timed("save"):
+                return self._in_transaction(save)
+        except Exception as ex:  # noqa: BLE001
+            # 上面的事务已整体回滚，失败日志单独提交，保证一定落库。
+            with self._unit_of_work():
+                self.storage.add_task_log(
+                    task_id,
+                    "EXECUTE",
+                    "FAILED",
+                    error_type="RUNTIME_ERROR",
+                    error_message=str(ex),
+                )
+                self.storage.update_task_status(task_id, "FAILED")
             return False
 
+    def _add_task_logs(self, logs: list[dict]) -> None:
+        if hasattr(self.storage, "add_task_logs"):
+            self.storage.add_task_logs(logs)
+            return
+        for log in logs:
+            self.storage.add_task_log(**log)
+
+    def _save_tutoring_infos(
+        self, source_url: str, infos: list[dict], fingerprint: str = ""
+    ) -> None:
+        if hasattr(self.storage, "reconcile_tutoring_infos"):
+            # 按内容摘要增量对比：未变化条目保持原 id，仅写入真正变化的行。
+            self.storage.reconcile_tutoring_infos(
+                source_url, infos, parser_fingerprint=fingerprint
+            )
+            return
+
+        if hasattr(self.storage, "delete_tutoring_info_by_article"):
+            self.storage.delete_tutoring_info_by_article(source_url)
+        for info in infos:
+            self.storage.save_tutoring_info(info)
+
+    def _in_transaction(self, func):
+        # 存储支持时由其负责事务重试（如 MySQL 死锁），否则在单个 unit_of_work 内执行。
+        run_in_transaction = getattr(self.storage, "run_in_transaction", None)
+        if run_in_transaction:
+            return run_in_transaction(func)
+        with self._unit_of_work():
+            return func()
+
+    def _unit_of_work(self):
+        unit_of_work = getattr(self.storage, "unit_of_work", None)
+        return unit_of_work() if unit_of_work else nullcontext()
+
+    def _fetch_article(self, source_url: str, timings: StageTimings) -> dict:
+        if self.streaming_fetch and hasattr(self.article_fetcher, "fetch_article"):
+            with timings.timed("fetch"):
+                return self.article_fetcher.fetch_article(source_url)
+
+        with timings.timed("fetch"):
+            html = self.article_fetcher.fetch(source_url)
+        with timings.timed("parse"):
+            return parse_article_html(source_url=source_url, html=html)
+
     def resolve_parser(self, platform_code: str) -> ParserProtocol | None:
         return self.parser_router.resolve(platform_code)
 
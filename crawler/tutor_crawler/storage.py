@@ -1,165 +1,399 @@
 import sqlite3
-from contextlib import closing
+import threading
+from contextlib import closing, contextmanager
 
 from tutor_crawler.html_archive import store_html
+from tutor_crawler.storage_rows import (
+    plan_tutoring_info_changes,
+    task_log_values,
+    tutoring_info_values,
+)
+
+
+SCHEMA_VERSION = 5
+_SYNCHRONOUS_MODES = {"OFF", "NORMAL", "FULL", "EXTRA"}
 
 
 class CrawlStorage:
-    def __init__(self, db_path: str):
+    """SQLite 存储：每个线程持有一条长连接，默认 WAL 日志以便读写并发。
+
+    - ``synchronous``：WAL 下 NORMAL 只在 checkpoint 时 fsync，断电最多丢失最近事务
+    - ``cache_size``：负数表示 KiB，正数表示页数
+    - ``mmap_size``：字节数，0 表示关闭内存映射
+    - ``busy_timeout_ms``：遇到写锁时的等待时长
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        synchronous: str = "NORMAL",
+        cache_size: int = -16000,
+        mmap_size: int = 0,
+        busy_timeout_ms: int = 5000,
+    ):
+        synchronous = (synchronous or "").upper()
+        if synchronous not in _SYNCHRONOUS_MODES:
+            raise ValueError(f"unsupported sqlite synchronous: {synchronous}")
         self.db_path = db_path
+        self.synchronous = synchronous
+        self.cache_size = int(cache_size)
+        self.mmap_size = max(0, int(mmap_size))
+        self.busy_timeout_ms = max(0, int(busy_timeout_ms))
+        self._local = threading.local()
+        self._connections_lock = threading.Lock()
+        # 按所属线程登记连接，线程退出后由 prune_connections 回收，数量不随线程池重建增长。
+        self._connections: dict[threading.Thread, sqlite3.Connection] = {}
 
     def _conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+        )
         conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size={self.cache_size}")
+        conn.execute(f"PRAGMA mmap_size={self.mmap_size}")
+        conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
         return conn
 
+    def _connection(self) -> sqlite3.Connection:
+        # 线程内长连接：首次使用时创建，之后所有操作复用；线程退出后由 prune_connections 关闭。
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.prune_connections()
+            conn = self._conn()
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections[threading.current_thread()] = conn
+        return conn
+
+    def prune_connections(self) -> int:
+        """关闭已退出线程遗留的连接，返回关闭的数量。"""
+        with self._connections_lock:
+            dead = [thread for thread in self._connections if not thread.is_alive()]
+            connections = [self._connections.pop(thread) for thread in dead]
+        for conn in connections:
+            conn.close()
+        return len(connections)
+
+    def close(self) -> None:
+        with self._connections_lock:
+            connections = list(self._connections.values())
+            self._connections = {}
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    @contextmanager
+    def _session(self):
+        # 处于 unit_of_work 内时由外层统一提交，否则每次操作单独提交。
+        conn = getattr(self._local, "uow_conn", None)
+        if conn is not None:
+            yield conn
+            return
+        conn = self._connection()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    @contextmanager
+    def unit_of_work(self):
+        """同一线程内的多次写操作共用一个连接与一次提交，异常时整体回滚。"""
+        if getattr(self._local, "uow_conn", None) is not None:
+            yield
+            return
+        conn = self._connection()
+        self._local.uow_conn = conn
+        try:
+            yield
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self._local.uow_conn = None
+
     def init_db(self) -> None:
+        # 已是最新版本时只读取一行版本号即返回，避免每次启动重复建表与探测。
+        if self.schema_version() >= SCHEMA_VERSION:
+            return
         with closing(self._conn()) as conn:
-            conn.executescript(
+            conn.execute(
                 """
-                CREATE TABLE IF NOT EXISTS article_raw (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    source_url TEXT NOT NULL UNIQUE,
-                    platform_code TEXT NOT NULL DEFAULT 'MIAOMIAO_WECHAT',
-                    title TEXT NOT NULL DEFAULT '',
-                    content_html TEXT NOT NULL DEFAULT '',
-                    content_text TEXT NOT NULL DEFAULT '',
-                    published_at TEXT NOT NULL DEFAULT '',
-                    crawled_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-                );
-
-                CREATE TABLE IF NOT EXISTS crawl_task (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    source_url TEXT NOT NULL,
-                    platform_code TEXT NOT NULL DEFAULT 'MIAOMIAO_WECHAT',
-                    source_type TEXT NOT NULL DEFAULT '',
-                    status TEXT NOT NULL DEFAULT 'PENDING',
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(source_url, platform_code)
-                );
-
-                CREATE TABLE IF NOT EXISTS crawl_task_log (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    task_id INTEGER NOT NULL,
-                    runtime TEXT NOT NULL DEFAULT 'python',
-                    stage TEXT NOT NULL DEFAULT '',
-                    status TEXT NOT NULL DEFAULT '',
-                    error_type TEXT NOT NULL DEFAULT '',
-                    error_summary TEXT NOT NULL DEFAULT '',
-                    error_message TEXT NOT NULL DEFAULT '',
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-                );
-
-                CREATE TABLE IF NOT EXISTS tutoring_info (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    source_url TEXT NOT NULL UNIQUE,
-                    content_block TEXT NOT NULL DEFAULT '',
-                    city TEXT NOT NULL DEFAULT '',
-                    district TEXT NOT NULL DEFAULT '',
-                    grade TEXT NOT NULL DEFAULT '',
-                    subject TEXT NOT NULL DEFAULT '',
-                    address TEXT NOT NULL DEFAULT '',
-                    time_schedule TEXT NOT NULL DEFAULT '',
-                    salary_text TEXT NOT NULL DEFAULT '',
-                    teacher_requirement TEXT NOT NULL DEFAULT '',
-                    published_at TEXT NOT NULL DEFAULT '',
-                    city_snippet TEXT NOT NULL DEFAULT '',
-                    district_snippet TEXT NOT NULL DEFAULT '',
-                    grade_snippet TEXT NOT NULL DEFAULT '',
-                    subject_snippet TEXT NOT NULL DEFAULT '',
-                    address_snippet TEXT NOT NULL DEFAULT '',
-                    time_schedule_snippet TEXT NOT NULL DEFAULT '',
-                    salary_snippet TEXT NOT NULL DEFAULT '',
-                    teacher_requirement_snippet TEXT NOT NULL DEFAULT '',
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-                );
-
-                CREATE TABLE IF NOT EXISTS crawl_platform (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    platform_code TEXT NOT NULL UNIQUE,
-                    platform_name TEXT NOT NULL DEFAULT '',
-                    status TEXT NOT NULL DEFAULT 'ENABLED',
-                    description TEXT NOT NULL DEFAULT '',
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-                );
-
-                CREATE TABLE IF NOT EXISTS admin_user (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT NOT NULL UNIQUE,
-                    password_hash TEXT NOT NULL DEFAULT '',
-                    status TEXT NOT NULL DEFAULT 'ENABLED',
-                    last_login_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
-                );
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
                 """
             )
-
-            columns = conn.execute("PRAGMA table_info(article_raw)").fetchall()
-            column_names = {row["name"] for row in columns}
-            if "platform_code" not in column_names:
+            current = self._read_schema_version(conn)
+            # 迁移均可重复执行，未记录版本的旧库会从 v1 起逐个补齐。
+            for version, migrate in self._migrations():
+                if version <= current:
+                    continue
+                migrate(conn)
                 conn.execute(
-                    "ALTER TABLE article_raw ADD COLUMN platform_code TEXT NOT NULL DEFAULT 'MIAOMIAO_WECHAT'"
+                    "INSERT OR IGNORE INTO schema_version(version) VALUES (?)",
+                    (version,),
                 )
+                conn.commit()
 
-            columns = conn.execute("PRAGMA table_info(crawl_task)").fetchall()
-            column_names = {row["name"] for row in columns}
-            if "platform_code" not in column_names:
-                conn.execute(
-                    "ALTER TABLE crawl_task ADD COLUMN platform_code TEXT NOT NULL DEFAULT 'MIAOMIAO_WECHAT'"
-                )
+    def schema_version(self) -> int:
+        with self._session() as conn:
+            return self._read_schema_version(conn)
 
-            self._migrate_crawl_task_unique_constraint(conn)
+    @staticmethod
+    def _read_schema_version(conn: sqlite3.Connection) -> int:
+        try:
+            row = conn.execute(
+                "SELECT MAX(version) AS version FROM schema_version"
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return 0
+        return int(row["version"] or 0)
+
+    def _migrations(self):
+        return [
+            (1, self._migrate_v1_baseline),
+            (2, self._migrate_v2_content_hash),
+            (3, self._migrate_v3_article_url),
+            (4, self._migrate_v4_parser_fingerprint),
+            (5, self._migrate_v5_content_truncated),
+        ]
+
+    def _migrate_v1_baseline(self, conn: sqlite3.Connection) -> None:
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS article_raw (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_url TEXT NOT NULL UNIQUE,
+                platform_code TEXT NOT NULL DEFAULT 'MIAOMIAO_WECHAT',
+                title TEXT NOT NULL DEFAULT '',
+                content_html TEXT NOT NULL DEFAULT '',
+                content_text TEXT NOT NULL DEFAULT '',
+                published_at TEXT NOT NULL DEFAULT '',
+                crawled_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
 
-            columns = conn.execute("PRAGMA table_info(crawl_task_log)").fetchall()
-            column_names = {row["name"] for row in columns}
-            if "runtime" not in column_names:
-                conn.execute(
-                    "ALTER TABLE crawl_task_log ADD COLUMN runtime TEXT NOT NULL DEFAULT 'python'"
-                )
-            if "error_summary" not in column_names:
-                conn.execute(
-                    "ALTER TABLE crawl_task_log ADD COLUMN error_summary TEXT NOT NULL DEFAULT ''"
-                )
+            CREATE TABLE IF NOT EXISTS crawl_task (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_url TEXT NOT NULL,
+                platform_code TEXT NOT NULL DEFAULT 'MIAOMIAO_WECHAT',
+                source_type TEXT NOT NULL DEFAULT '',
+                status TEXT NOT NULL DEFAULT 'PENDING',
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                UNIQUE(source_url, platform_code)
+            );
 
-            columns = conn.execute("PRAGMA table_info(tutoring_info)").fetchall()
-            column_names = {row["name"] for row in columns}
-            if "content_block" not in column_names:
-                conn.execute(
-                    "ALTER TABLE tutoring_info ADD COLUMN content_block TEXT NOT NULL DEFAULT ''"
-                )
+            CREATE TABLE IF NOT EXISTS crawl_task_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER NOT NULL,
+                runtime TEXT NOT NULL DEFAULT 'python',
+                stage TEXT NOT NULL DEFAULT '',
+                status TEXT NOT NULL DEFAULT '',
+                error_type TEXT NOT NULL DEFAULT '',
+                error_summary TEXT NOT NULL DEFAULT '',
+                error_message TEXT NOT NULL DEFAULT '',
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE TABLE IF NOT EXISTS tutoring_info (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source_url TEXT NOT NULL UNIQUE,
+                content_block TEXT NOT NULL DEFAULT '',
+                city TEXT NOT NULL DEFAULT '',
+                district TEXT NOT NULL DEFAULT '',
+                grade TEXT NOT NULL DEFAULT '',
+                subject TEXT NOT NULL DEFAULT '',
+                address TEXT NOT NULL DEFAULT '',
+                time_schedule TEXT NOT NULL DEFAULT '',
+                salary_text TEXT NOT NULL DEFAULT '',
+                teacher_requirement TEXT NOT NULL DEFAULT '',
+                published_at TEXT NOT NULL DEFAULT '',
+                city_snippet TEXT NOT NULL DEFAULT '',
+                district_snippet TEXT NOT NULL DEFAULT '',
+                grade_snippet TEXT NOT NULL DEFAULT '',
+                subject_snippet TEXT NOT NULL DEFAULT '',
+                address_snippet TEXT NOT NULL DEFAULT '',
+                time_schedule_snippet TEXT NOT NULL DEFAULT '',
+                salary_snippet TEXT NOT NULL DEFAULT '',
+                teacher_requirement_snippet TEXT NOT NULL DEFAULT '',
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
 
+            CREATE TABLE IF NOT EXISTS crawl_platform (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                platform_code TEXT NOT NULL UNIQUE,
+                platform_name TEXT NOT NULL DEFAULT '',
+                status TEXT NOT NULL DEFAULT 'ENABLED',
+                description TEXT NOT NULL DEFAULT '',
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE TABLE IF NOT EXISTS admin_user (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                username TEXT NOT NULL UNIQUE,
+                password_hash TEXT NOT NULL DEFAULT '',
+                status TEXT NOT NULL DEFAULT 'ENABLED',
+                last_login_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                updated_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+            """
+        )
+
+        columns = conn.execute("PRAGMA table_info(article_raw)").fetchall()
+        column_names = {row["name"] for row in columns}
+        if "platform_code" not in column_names:
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS ix_article_raw_platform_code ON article_raw(platform_code)"
+                "ALTER TABLE article_raw ADD COLUMN platform_code TEXT NOT NULL DEFAULT 'MIAOMIAO_WECHAT'"
             )
+
+        columns = conn.execute("PRAGMA table_info(crawl_task)").fetchall()
+        column_names = {row["name"] for row in columns}
+        if "platform_code" not in column_names:
+            conn.execute(
+                "ALTER TABLE crawl_task ADD COLUMN platform_code TEXT NOT NULL DEFAULT 'MIAOMIAO_WECHAT'"
+            )
+
+        self._migrate_crawl_task_unique_constraint(conn)
+
+        columns = conn.execute("PRAGMA table_info(crawl_task_log)").fetchall()
+        column_names = {row["name"] for row in columns}
+        if "runtime" not in column_names:
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS ix_crawl_task_platform_code ON crawl_task(platform_code)"
+                "ALTER TABLE crawl_task_log ADD COLUMN runtime TEXT NOT NULL DEFAULT 'python'"
             )
+        if "error_summary" not in column_names:
             conn.execute(
-                "CREATE UNIQUE INDEX IF NOT EXISTS ux_crawl_task_source_platform ON crawl_task(source_url, platform_code)"
+                "ALTER TABLE crawl_task_log ADD COLUMN error_summary TEXT NOT NULL DEFAULT ''"
             )
+
+        columns = conn.execute("PRAGMA table_info(tutoring_info)").fetchall()
+        column_names = {row["name"] for row in columns}
+        if "content_block" not in column_names:
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS ix_crawl_platform_status ON crawl_platform(status)"
+                "ALTER TABLE tutoring_info ADD COLUMN content_block TEXT NOT NULL DEFAULT ''"
+            )
+
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_article_raw_platform_code ON article_raw(platform_code)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_crawl_task_platform_code ON crawl_task(platform_code)"
+        )
+        conn.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ux_crawl_task_source_platform ON crawl_task(source_url, platform_code)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_crawl_platform_status ON crawl_platform(status)"
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_admin_user_status ON admin_user(status)"
+        )
+
+        conn.execute(
+            """
+            INSERT INTO crawl_platform(platform_code, platform_name, status, description)
+            SELECT 'MIAOMIAO_WECHAT', '淼淼家教公众号', 'ENABLED', '默认平台'
+            WHERE NOT EXISTS (
+                SELECT 1 FROM crawl_platform WHERE platform_code='MIAOMIAO_WECHAT'
             )
+            """
+        )
+
+    @staticmethod
+    def _migrate_v2_content_hash(conn: sqlite3.Connection) -> None:
+        columns = conn.execute("PRAGMA table_info(tutoring_info)").fetchall()
+        if "content_hash" not in {row["name"] for row in columns}:
             conn.execute(
-                "CREATE INDEX IF NOT EXISTS ix_admin_user_status ON admin_user(status)"
+                "ALTER TABLE tutoring_info ADD COLUMN content_hash TEXT NOT NULL DEFAULT ''"
             )
 
+    def _migrate_v3_article_url(self, conn: sqlite3.Connection) -> None:
+        columns = conn.execute("PRAGMA table_info(tutoring_info)").fetchall()
+        column_names = {row["name"] for row in columns}
+        if "article_url" not in column_names:
             conn.execute(
-                """
-                INSERT INTO crawl_platform(platform_code, platform_name, status, description)
-                SELECT 'MIAOMIAO_WECHAT', '淼淼家教公众号', 'ENABLED', '默认平台'
-                WHERE NOT EXISTS (
-                    SELECT 1 FROM crawl_platform WHERE platform_code='MIAOMIAO_WECHAT'
+                "ALTER TABLE tutoring_info ADD COLUMN article_url TEXT NOT NULL DEFAULT ''"
+            )
+        if "item_index" not in column_names:
+            conn.execute(
+                "ALTER TABLE tutoring_info ADD COLUMN item_index INTEGER NOT NULL DEFAULT 1"
+            )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_tutoring_info_article_url ON tutoring_info(article_url, item_index)"
+        )
+        self._backfill_article_urls(conn, batch_size=1000)
+
+    @staticmethod
+    def _migrate_v4_parser_fingerprint(conn: sqlite3.Connection) -> None:
+        for table in ("article_raw", "tutoring_info"):
+            columns = conn.execute(f"PRAGMA table_info({table})").fetchall()
+            if "parser_fingerprint" not in {row["name"] for row in columns}:
+                conn.execute(
+                    f"ALTER TABLE {table} ADD COLUMN parser_fingerprint TEXT NOT NULL DEFAULT ''"
                 )
-                """
+
+    @staticmethod
+    def _migrate_v5_content_truncated(conn: sqlite3.Connection) -> None:
+        columns = conn.execute("PRAGMA table_info(article_raw)").fetchall()
+        if "content_truncated" not in {row["name"] for row in columns}:
+            conn.execute(
+                "ALTER TABLE article_raw ADD COLUMN content_truncated INTEGER NOT NULL DEFAULT 0"
             )
+
+    def backfill_article_urls(self, batch_size: int = 1000) -> int:
+        """为历史 tutoring_info 行回填 article_url / item_index，分批提交，可重复执行。"""
+        with closing(self._conn()) as conn:
+            return self._backfill_article_urls(conn, batch_size)
+
+    @staticmethod
+    def _backfill_article_urls(conn: sqlite3.Connection, batch_size: int) -> int:
+        # 按 id 翻页：source_url 为空等行更新后 article_url 仍可能为 ''，不能靠条件本身收敛。
+        total = 0
+        last_id = 0
+        while True:
+            ids = [
+                row["id"]
+                for row in conn.execute(
+                    "SELECT id FROM tutoring_info WHERE article_url='' AND id>? ORDER BY id LIMIT ?",
+                    (last_id, batch_size),
+                ).fetchall()
+            ]
+            if not ids:
+                return total
+            total += conn.execute(
+                """
+                UPDATE tutoring_info
+                   SET article_url = CASE
+                           WHEN instr(source_url, '#item-') > 0
+                           THEN substr(source_url, 1, instr(source_url, '#item-') - 1)
+                           ELSE source_url
+                       END,
+                       item_index = CASE
+                           WHEN instr(source_url, '#item-') > 0
+                           THEN CAST(substr(source_url, instr(source_url, '#item-') + 6) AS INTEGER)
+                           ELSE 1
+                       END
+                 WHERE article_url='' AND id BETWEEN ? AND ?
+                """,
+                (ids[0], ids[-1]),
+            ).rowcount
             conn.commit()
+            last_id = ids[-1]
+            if len(ids) < batch_size:
+                return total
 
     @staticmethod
     def _migrate_crawl_task_unique_constraint(conn: sqlite3.Connection) -> None:
@@ -206,7 +440,7 @@ class CrawlStorage:
         source_type: str,
         platform_code: str = "MIAOMIAO_WECHAT",
     ) -> int:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             conn.execute(
                 """
                 INSERT INTO crawl_task(source_url, platform_code, source_type, status)
@@ -214,7 +448,6 @@ class CrawlStorage:
                 """,
                 (source_url, platform_code, source_type),
             )
-            conn.commit()
             return int(
                 conn.execute("SELECT last_insert_rowid() AS id").fetchone()["id"]
             )
@@ -224,20 +457,107 @@ class CrawlStorage:
         source_url: str,
         platform_code: str = "MIAOMIAO_WECHAT",
     ) -> sqlite3.Row | None:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             return conn.execute(
                 "SELECT * FROM crawl_task WHERE source_url=? AND platform_code=?",
                 (source_url, platform_code),
             ).fetchone()
 
-    def get_task(self, task_id: int) -> sqlite3.Row | None:
+    def get_existing_task_urls(
+        self,
+        source_urls: list[str],
+        platform_code: str = "MIAOMIAO_WECHAT",
+        batch_size: int = 500,
+    ) -> set[str]:
+        urls = list(dict.fromkeys(source_urls))
+        existing: set[str] = set()
+        if not urls:
+            return existing
+        with self._session() as conn:
+            for start in range(0, len(urls), batch_size):
+                batch = urls[start : start + batch_size]
+                placeholders = ", ".join("?" for _ in batch)
+                rows = conn.execute(
+                    f"SELECT source_url FROM crawl_task WHERE platform_code=? AND source_url IN ({placeholders})",
+                    (platform_code, *batch),
+                ).fetchall()
+                existing.update(row["source_url"] for row in rows)
+        return existing
+
+    def iter_task_urls(self, platform_code: str = "MIAOMIAO_WECHAT"):
         with closing(self._conn()) as conn:
+            cursor = conn.execute(
+                "SELECT source_url FROM crawl_task WHERE platform_code=?",
+                (platform_code,),
+            )
+            for row in cursor:
+                yield row["source_url"]
+
+    def iter_articles(
+        self,
+        platform_code: str = "",
+        published_from: str = "",
+        published_to: str = "",
+        stale_fingerprint: str = "",
+        page_size: int = 500,
+    ):
+        """按 id 分页读取 article_raw，按平台与发布时间 [published_from, published_to) 过滤。
+
+        stale_fingerprint 非空时只返回解析器指纹与之不同的文章。
+        content_html 保持库中原值（归档相对路径），由调用方按需 read_html。
+        每页单独查询，调用方处理期间不持有读事务。
+        """
+        clauses = ["id>?"]
+        params: list = []
+        if platform_code:
+            clauses.append("platform_code=?")
+            params.append(platform_code)
+        if published_from:
+            clauses.append("published_at>=?")
+            params.append(published_from)
+        if published_to:
+            clauses.append("published_at<?")
+            params.append(published_to)
+        if stale_fingerprint:
+            clauses.append("parser_fingerprint<>?")
+            params.append(stale_fingerprint)
+        sql = (
+            "SELECT id, source_url, platform_code, title, content_html, content_text, "
+            f"published_at FROM article_raw WHERE {' AND '.join(clauses)} "
+            "ORDER BY id LIMIT ?"
+        )
+        page_size = max(1, int(page_size))
+        last_id = 0
+        while True:
+            with self._session() as conn:
+                rows = conn.execute(sql, [last_id, *params, page_size]).fetchall()
+            for row in rows:
+                article = dict(row)
+                last_id = article.pop("id")
+                yield article
+            if len(rows) < page_size:
+                return
+
+    def get_article(self, source_url: str) -> dict | None:
+        with self._session() as conn:
+            row = conn.execute(
+                """
+                SELECT source_url, platform_code, title, content_html, content_text, published_at
+                  FROM article_raw
+                 WHERE source_url=?
+                """,
+                (source_url,),
+            ).fetchone()
+        return dict(row) if row else None
+
+    def get_task(self, task_id: int) -> sqlite3.Row | None:
+        with self._session() as conn:
             return conn.execute(
                 "SELECT * FROM crawl_task WHERE id=?", (task_id,)
             ).fetchone()
 
     def update_task_status(self, task_id: int, status: str) -> None:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             conn.execute(
                 """
                 UPDATE crawl_task
@@ -246,7 +566,6 @@ class CrawlStorage:
                 """,
                 (status, task_id),
             )
-            conn.commit()
 
     def add_task_log(
         self,
@@ -258,26 +577,34 @@ class CrawlStorage:
         error_message: str = "",
         runtime: str = "python",
     ) -> None:
-        with closing(self._conn()) as conn:
-            conn.execute(
+        self.add_task_logs(
+            [
+                {
+                    "task_id": task_id,
+                    "stage": stage,
+                    "status": status,
+                    "error_type": error_type,
+                    "error_summary": error_summary,
+                    "error_message": error_message,
+                    "runtime": runtime,
+                }
+            ]
+        )
+
+    def add_task_logs(self, logs: list[dict]) -> None:
+        if not logs:
+            return
+        with self._session() as conn:
+            conn.executemany(
                 """
                 INSERT INTO crawl_task_log(task_id, runtime, stage, status, error_type, error_summary, error_message)
                 VALUES (?, ?, ?, ?, ?, ?, ?)
                 """,
-                (
-                    task_id,
-                    runtime,
-                    stage,
-                    status,
-                    error_type,
-                    error_summary,
-                    error_message,
-                ),
+                [task_log_values(log) for log in logs],
             )
-            conn.commit()
 
     def list_task_logs(self, task_id: int) -> list[sqlite3.Row]:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             rows = conn.execute(
                 "SELECT * FROM crawl_task_log WHERE task_id=? ORDER BY id ASC",
                 (task_id,),
@@ -286,12 +613,21 @@ class CrawlStorage:
 
     def save_article(self, article: dict) -> None:
         html_path = store_html(article["source_url"], article["content_html"])
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             conn.execute(
                 """
                 INSERT OR REPLACE INTO article_raw(
-                    source_url, platform_code, title, content_html, content_text, published_at, crawled_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    source_url, platform_code, title, content_html, content_text, published_at,
+                    content_truncated, crawled_at, updated_at
+                ) VALUES (
+                    ?, ?, ?, ?, ?,
+                    COALESCE(
+                        NULLIF(?, ''),
+                        (SELECT published_at FROM article_raw WHERE source_url = ?),
+                        ''
+                    ),
+                    ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP
+                )
                 """,
                 (
                     article["source_url"],
@@ -300,82 +636,144 @@ class CrawlStorage:
                     html_path,
                     article["content_text"],
                     article["published_at"],
+                    article["source_url"],
+                    1 if article.get("content_truncated") else 0,
                 ),
             )
-            conn.commit()
 
     def save_tutoring_info(self, info: dict) -> None:
-        with closing(self._conn()) as conn:
-            conn.execute(
+        self.save_tutoring_infos([info])
+
+    def save_tutoring_infos(self, infos: list[dict]) -> None:
+        if not infos:
+            return
+        with self._session() as conn:
+            conn.executemany(
                 """
                 INSERT OR REPLACE INTO tutoring_info(
                     source_url, content_block, city, district, grade, subject, address,
                     time_schedule, salary_text, teacher_requirement, published_at,
                     city_snippet, district_snippet, grade_snippet, subject_snippet,
                     address_snippet, time_schedule_snippet, salary_snippet, teacher_requirement_snippet,
-                    updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    content_hash, article_url, item_index, updated_at
+                ) VALUES (
+                    ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?,
+                    CURRENT_TIMESTAMP
+                )
                 """,
-                (
-                    info["source_url"],
-                    info.get("content_block", ""),
-                    info["city"],
-                    info["district"],
-                    info["grade"],
-                    info["subject"],
-                    info["address"],
-                    info["time_schedule"],
-                    info["salary_text"],
-                    info["teacher_requirement"],
-                    info["published_at"],
-                    info["city_snippet"],
-                    info["district_snippet"],
-                    info["grade_snippet"],
-                    info["subject_snippet"],
-                    info["address_snippet"],
-                    info["time_schedule_snippet"],
-                    info["salary_snippet"],
-                    info["teacher_requirement_snippet"],
-                ),
+                [tutoring_info_values(info) for info in infos],
             )
-            conn.commit()
 
-    def delete_tutoring_info_by_article(self, source_url: str) -> None:
-        with closing(self._conn()) as conn:
+    def reconcile_tutoring_infos(
+        self, source_url: str, infos: list[dict], parser_fingerprint: str = ""
+    ) -> dict:
+        """按 content_hash 对比文章已有条目，只插入新增、更新变化、删除消失的条目，保留未变与仅移位条目的 id。
+
+        parser_fingerprint 非空时同时给文章及其全部条目打上解析器指纹。
+        """
+        with self.unit_of_work(), self._session() as conn:
+            rows = conn.execute(
+                "SELECT id, source_url, content_hash FROM tutoring_info WHERE article_url=?",
+                (source_url,),
+            ).fetchall()
+            plan = plan_tutoring_info_changes(rows, infos)
+
+            if plan["delete_ids"]:
+                placeholders = ", ".join("?" for _ in plan["delete_ids"])
+                conn.execute(
+                    f"DELETE FROM tutoring_info WHERE id IN ({placeholders})",
+                    plan["delete_ids"],
+                )
+            if plan["renamed_ids"]:
+                # 位置变化的条目先改成临时 URL，避免互换序号时撞上 source_url 唯一约束。
+                placeholders = ", ".join("?" for _ in plan["renamed_ids"])
+                conn.execute(
+                    f"UPDATE tutoring_info SET source_url='moving:' || id WHERE id IN ({placeholders})",
+                    plan["renamed_ids"],
+                )
+            if plan["updates"]:
+                conn.executemany(
+                    """
+                    UPDATE tutoring_info
+                       SET source_url=?, content_block=?, city=?, district=?, grade=?, subject=?, address=?,
+                           time_schedule=?, salary_text=?, teacher_requirement=?, published_at=?,
+                           city_snippet=?, district_snippet=?, grade_snippet=?, subject_snippet=?,
+                           address_snippet=?, time_schedule_snippet=?, salary_snippet=?,
+                           teacher_requirement_snippet=?, content_hash=?, article_url=?, item_index=?,
+                           updated_at=CURRENT_TIMESTAMP
+                     WHERE id=?
+                    """,
+                    [
+                        (*tutoring_info_values(info), row_id)
+                        for row_id, info in plan["updates"]
+                    ],
+                )
+            self.save_tutoring_infos(plan["inserts"])
+            if parser_fingerprint:
+                self.stamp_parser_fingerprint(source_url, parser_fingerprint)
+
+        return {
+            "inserted": len(plan["inserts"]),
+            "updated": len(plan["updates"]),
+            "deleted": len(plan["delete_ids"]),
+            "unchanged": plan["unchanged"],
+        }
+
+    def stamp_parser_fingerprint(self, source_url: str, parser_fingerprint: str) -> None:
+        with self._session() as conn:
             conn.execute(
-                "DELETE FROM tutoring_info WHERE source_url=? OR source_url LIKE ?",
-                (source_url, f"{source_url}#item-%"),
+                "UPDATE article_raw SET parser_fingerprint=? WHERE source_url=?",
+                (parser_fingerprint, source_url),
+            )
+            conn.execute(
+                """
+                UPDATE tutoring_info
+                   SET parser_fingerprint=?
+                 WHERE article_url=? AND parser_fingerprint<>?
+                """,
+                (parser_fingerprint, source_url, parser_fingerprint),
+            )
+
+    def delete_tutoring_info_by_article(self, source_url: str) -> None:
+        with self._session() as conn:
+            conn.execute("DELETE FROM tutoring_info WHERE article_url=?", (source_url,))
+
+    def count_tutoring_info_by_article(self, source_url: str) -> int:
+        with self._session() as conn:
+            return int(
+                conn.execute(
+                    "SELECT COUNT(*) AS c FROM tutoring_info WHERE article_url=?",
+                    (source_url,),
+                ).fetchone()["c"]
             )
-            conn.commit()
 
     def get_tutoring_info_by_url(self, source_url: str) -> sqlite3.Row | None:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             return conn.execute(
                 "SELECT * FROM tutoring_info WHERE source_url=?", (source_url,)
             ).fetchone()
 
     def count_articles(self) -> int:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             return int(
                 conn.execute("SELECT COUNT(*) AS c FROM article_raw").fetchone()["c"]
             )
 
     def count_tutoring_info(self) -> int:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             return int(
                 conn.execute("SELECT COUNT(*) AS c FROM tutoring_info").fetchone()["c"]
             )
 
     def override_task_created_date(self, task_id: int, day: str) -> None:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             conn.execute(
                 "UPDATE crawl_task SET created_at=? || ' 00:00:00' WHERE id=?",
                 (day, task_id),
             )
-            conn.commit()
 
     def daily_success_rate(self, day: str) -> dict:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             rows = conn.execute(
                 """
                 SELECT status, COUNT(*) AS c
@@ -408,9 +806,22 @@ def create_storage(
     mysql_user: str = "root",
     mysql_password: str = "",
     mysql_database: str = "tutoring_crawler",
+    sqlite_synchronous: str = "NORMAL",
+    sqlite_cache_size: int = -16000,
+    sqlite_mmap_size: int = 0,
+    sqlite_busy_timeout_ms: int = 5000,
+    mysql_pool_size: int = 8,
+    mysql_pool_max_lifetime_seconds: float = 1800.0,
+    mysql_pool_idle_timeout_seconds: float = 300.0,
 ):
     if db_type == "sqlite":
-        return CrawlStorage(sqlite_path)
+        return CrawlStorage(
+            sqlite_path,
+            synchronous=sqlite_synchronous,
+            cache_size=sqlite_cache_size,
+            mmap_size=sqlite_mmap_size,
+            busy_timeout_ms=sqlite_busy_timeout_ms,
+        )
     if db_type == "mysql":
         from tutor_crawler.storage_mysql import MySQLCrawlStorage
 
@@ -420,5 +831,8 @@ def create_storage(
             user=mysql_user,
             password=mysql_password,
             database=mysql_database,
+            pool_size=mysql_pool_size,
+            pool_max_lifetime_seconds=mysql_pool_max_lifetime_seconds,
+            pool_idle_timeout_seconds=mysql_pool_idle_timeout_seconds,
         )
     raise ValueError(f"unsupported db_type: {db_type}")
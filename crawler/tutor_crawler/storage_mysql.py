@@ -1,18 +1,51 @@
-from contextlib import closing
+import logging
+import random
+import threading
+import time
+from contextlib import closing, contextmanager
 
 import pymysql
-from pymysql.cursors import DictCursor
+from pymysql.cursors import DictCursor, SSDictCursor
 
 from tutor_crawler.html_archive import store_html
+from tutor_crawler.mysql_pool import MySQLConnectionPool
+from tutor_crawler.storage import SCHEMA_VERSION
+from tutor_crawler.storage_rows import (
+    plan_tutoring_info_changes,
+    task_log_values,
+    tutoring_info_values,
+)
+
+
+logger = logging.getLogger(__name__)
+
+_ER_LOCK_DEADLOCK = 1213
 
 
 class MySQLCrawlStorage:
-    def __init__(self, host: str, port: int, user: str, password: str, database: str):
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        database: str,
+        pool_size: int = 8,
+        pool_max_lifetime_seconds: float = 1800.0,
+        pool_idle_timeout_seconds: float = 300.0,
+    ):
         self.host = host
         self.port = port
         self.user = user
         self.password = password
         self.database = database
+        self._local = threading.local()
+        self.pool = MySQLConnectionPool(
+            self._conn,
+            max_size=pool_size,
+            max_lifetime_seconds=pool_max_lifetime_seconds,
+            idle_timeout_seconds=pool_idle_timeout_seconds,
+        )
 
     def _conn(self):
         return pymysql.connect(
@@ -26,7 +59,102 @@ class MySQLCrawlStorage:
             autocommit=False,
         )
 
+    def close(self) -> None:
+        self.pool.close()
+
+    @contextmanager
+    def _session(self):
+        # 处于 unit_of_work 内时复用同一连接，由外层统一提交；否则从连接池借用。
+        conn = getattr(self._local, "uow_conn", None)
+        if conn is not None:
+            yield conn
+            return
+        with self.pool.connection() as conn:
+            yield conn
+            conn.commit()
+
+    @contextmanager
+    def unit_of_work(self):
+        """同一线程内的多次写操作共用一个连接与一次提交，异常时整体回滚。"""
+        if getattr(self._local, "uow_conn", None) is not None:
+            yield
+            return
+        with self.pool.connection() as conn:
+            self._local.uow_conn = conn
+            try:
+                yield
+                conn.commit()
+            finally:
+                self._local.uow_conn = None
+
+    def run_in_transaction(self, func, attempts: int = 3):
+        """在一个事务内执行 func，遇到 InnoDB 死锁（1213）时整体回滚并重试。
+
+        已处于外层 unit_of_work 时直接执行，死锁交给持有事务的最外层重试。
+        """
+        if getattr(self._local, "uow_conn", None) is not None:
+            return func()
+        for attempt in range(1, attempts + 1):
+            try:
+                with self.unit_of_work():
+                    return func()
+            except pymysql.err.OperationalError as ex:
+                if ex.args[0] != _ER_LOCK_DEADLOCK or attempt >= attempts:
+                    raise
+                logger.warning("MySQL 死锁，第 %d 次重试事务", attempt + 1)
+                time.sleep(random.uniform(0, 0.05 * attempt))
+
     def init_db(self) -> None:
+        # 已是最新版本时只读取一行版本号即返回，避免每次启动重复建表与探测。
+        if self.schema_version() >= SCHEMA_VERSION:
+            return
+        with closing(self._conn()) as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        version INT PRIMARY KEY COMMENT '结构版本号',
+                        applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '执行时间'
+                    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='库表结构版本表'
+                    """
+                )
+                current = self._read_schema_version(cursor)
+            # 迁移均可重复执行，未记录版本的旧库会从 v1 起逐个补齐。
+            for version, migrate in self._migrations():
+                if version <= current:
+                    continue
+                with conn.cursor() as cursor:
+                    migrate(conn, cursor)
+                    cursor.execute(
+                        "INSERT IGNORE INTO schema_version(version) VALUES (%s)",
+                        (version,),
+                    )
+                conn.commit()
+
+    def schema_version(self) -> int:
+        with self._session() as conn:
+            with conn.cursor() as cursor:
+                return self._read_schema_version(cursor)
+
+    @staticmethod
+    def _read_schema_version(cursor) -> int:
+        try:
+            cursor.execute("SELECT MAX(version) AS version FROM schema_version")
+        except pymysql.err.ProgrammingError:
+            return 0
+        row = cursor.fetchone()
+        return int(row["version"] or 0) if row else 0
+
+    def _migrations(self):
+        return [
+            (1, self._migrate_v1_baseline),
+            (2, self._migrate_v2_content_hash),
+            (3, self._migrate_v3_article_url),
+            (4, self._migrate_v4_parser_fingerprint),
+            (5, self._migrate_v5_content_truncated),
+        ]
+
+    def _migrate_v1_baseline(self, conn, cursor) -> None:
         statements = [
             """
             CREATE TABLE IF NOT EXISTS article_raw (
@@ -120,176 +248,305 @@ class MySQLCrawlStorage:
             ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='后台管理员账号表'
             """,
         ]
-        with closing(self._conn()) as conn:
-            with conn.cursor() as cursor:
-                for sql in statements:
-                    cursor.execute(sql)
+        for sql in statements:
+            cursor.execute(sql)
 
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) AS c
-                    FROM information_schema.COLUMNS
-                    WHERE TABLE_SCHEMA=%s AND TABLE_NAME='crawl_task_log' AND COLUMN_NAME='runtime'
-                    """,
-                    (self.database,),
-                )
-                log_runtime_column = cursor.fetchone()
-                if int(log_runtime_column["c"] if log_runtime_column else 0) == 0:
-                    cursor.execute(
-                        """
-                        ALTER TABLE crawl_task_log
-                        ADD COLUMN runtime VARCHAR(16) NOT NULL DEFAULT 'python' COMMENT '运行端(java/python)'
-                        AFTER task_id
-                        """
-                    )
+        cursor.execute(
+            """
+            SELECT COUNT(*) AS c
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA=%s AND TABLE_NAME='crawl_task_log' AND COLUMN_NAME='runtime'
+            """,
+            (self.database,),
+        )
+        log_runtime_column = cursor.fetchone()
+        if int(log_runtime_column["c"] if log_runtime_column else 0) == 0:
+            cursor.execute(
+                """
+                ALTER TABLE crawl_task_log
+                ADD COLUMN runtime VARCHAR(16) NOT NULL DEFAULT 'python' COMMENT '运行端(java/python)'
+                AFTER task_id
+                """
+            )
 
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) AS c
-                    FROM information_schema.COLUMNS
-                    WHERE TABLE_SCHEMA=%s AND TABLE_NAME='crawl_task_log' AND COLUMN_NAME='error_summary'
-                    """,
-                    (self.database,),
-                )
-                log_error_summary_column = cursor.fetchone()
-                if (
-                    int(
-                        log_error_summary_column["c"] if log_error_summary_column else 0
-                    )
-                    == 0
-                ):
-                    cursor.execute(
-                        """
-                        ALTER TABLE crawl_task_log
-                        ADD COLUMN error_summary VARCHAR(256) NOT NULL DEFAULT '' COMMENT '失败摘要'
-                        AFTER error_type
-                        """
-                    )
+        cursor.execute(
+            """
+            SELECT COUNT(*) AS c
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA=%s AND TABLE_NAME='crawl_task_log' AND COLUMN_NAME='error_summary'
+            """,
+            (self.database,),
+        )
+        log_error_summary_column = cursor.fetchone()
+        if (
+            int(
+                log_error_summary_column["c"] if log_error_summary_column else 0
+            )
+            == 0
+        ):
+            cursor.execute(
+                """
+                ALTER TABLE crawl_task_log
+                ADD COLUMN error_summary VARCHAR(256) NOT NULL DEFAULT '' COMMENT '失败摘要'
+                AFTER error_type
+                """
+            )
 
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) AS c
-                    FROM information_schema.COLUMNS
-                    WHERE TABLE_SCHEMA=%s AND TABLE_NAME='article_raw' AND COLUMN_NAME='platform_code'
-                    """,
-                    (self.database,),
-                )
-                article_platform_column = cursor.fetchone()
-                if (
-                    int(article_platform_column["c"] if article_platform_column else 0)
-                    == 0
-                ):
-                    cursor.execute(
-                        """
-                        ALTER TABLE article_raw
-                        ADD COLUMN platform_code VARCHAR(64) NOT NULL DEFAULT 'MIAOMIAO_WECHAT' COMMENT '来源平台编码'
-                        AFTER source_url
-                        """
-                    )
+        cursor.execute(
+            """
+            SELECT COUNT(*) AS c
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA=%s AND TABLE_NAME='article_raw' AND COLUMN_NAME='platform_code'
+            """,
+            (self.database,),
+        )
+        article_platform_column = cursor.fetchone()
+        if (
+            int(article_platform_column["c"] if article_platform_column else 0)
+            == 0
+        ):
+            cursor.execute(
+                """
+                ALTER TABLE article_raw
+                ADD COLUMN platform_code VARCHAR(64) NOT NULL DEFAULT 'MIAOMIAO_WECHAT' COMMENT '来源平台编码'
+                AFTER source_url
+                """
+            )
 
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) AS c
-                    FROM information_schema.COLUMNS
-                    WHERE TABLE_SCHEMA=%s AND TABLE_NAME='crawl_task' AND COLUMN_NAME='platform_code'
-                    """,
-                    (self.database,),
-                )
-                task_platform_column = cursor.fetchone()
-                if int(task_platform_column["c"] if task_platform_column else 0) == 0:
-                    cursor.execute(
-                        """
-                        ALTER TABLE crawl_task
-                        ADD COLUMN platform_code VARCHAR(64) NOT NULL DEFAULT 'MIAOMIAO_WECHAT' COMMENT '来源平台编码'
-                        AFTER source_url
-                        """
-                    )
+        cursor.execute(
+            """
+            SELECT COUNT(*) AS c
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA=%s AND TABLE_NAME='crawl_task' AND COLUMN_NAME='platform_code'
+            """,
+            (self.database,),
+        )
+        task_platform_column = cursor.fetchone()
+        if int(task_platform_column["c"] if task_platform_column else 0) == 0:
+            cursor.execute(
+                """
+                ALTER TABLE crawl_task
+                ADD COLUMN platform_code VARCHAR(64) NOT NULL DEFAULT 'MIAOMIAO_WECHAT' COMMENT '来源平台编码'
+                AFTER source_url
+                """
+            )
 
+        cursor.execute(
+            """
+            SELECT INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) AS cols
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA=%s AND TABLE_NAME='crawl_task' AND NON_UNIQUE=0
+            GROUP BY INDEX_NAME
+            """,
+            (self.database,),
+        )
+        unique_indexes = cursor.fetchall() or []
+        has_composite_unique = False
+        for index in unique_indexes:
+            cols = (index.get("cols") or "").lower()
+            index_name = index.get("INDEX_NAME")
+            if cols == "source_url,platform_code":
+                has_composite_unique = True
+                continue
+            if cols == "source_url" and index_name and index_name != "PRIMARY":
                 cursor.execute(
-                    """
-                    SELECT INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) AS cols
-                    FROM information_schema.STATISTICS
-                    WHERE TABLE_SCHEMA=%s AND TABLE_NAME='crawl_task' AND NON_UNIQUE=0
-                    GROUP BY INDEX_NAME
-                    """,
-                    (self.database,),
+                    f"ALTER TABLE crawl_task DROP INDEX `{index_name}`"
                 )
-                unique_indexes = cursor.fetchall() or []
-                has_composite_unique = False
-                for index in unique_indexes:
-                    cols = (index.get("cols") or "").lower()
-                    index_name = index.get("INDEX_NAME")
-                    if cols == "source_url,platform_code":
-                        has_composite_unique = True
-                        continue
-                    if cols == "source_url" and index_name and index_name != "PRIMARY":
-                        cursor.execute(
-                            f"ALTER TABLE crawl_task DROP INDEX `{index_name}`"
-                        )
-
-                if not has_composite_unique:
-                    cursor.execute(
-                        "CREATE UNIQUE INDEX ux_crawl_task_source_platform ON crawl_task(source_url, platform_code)"
-                    )
 
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) AS c
-                    FROM information_schema.COLUMNS
-                    WHERE TABLE_SCHEMA=%s AND TABLE_NAME='tutoring_info' AND COLUMN_NAME='content_block'
-                    """,
-                    (self.database,),
-                )
-                content_block_column = cursor.fetchone()
-                if int(content_block_column["c"] if content_block_column else 0) == 0:
-                    cursor.execute(
-                        """
-                        ALTER TABLE tutoring_info
-                        ADD COLUMN content_block LONGTEXT NOT NULL COMMENT '单条家教信息原始分段内容'
-                        AFTER source_url
-                        """
-                    )
+        if not has_composite_unique:
+            cursor.execute(
+                "CREATE UNIQUE INDEX ux_crawl_task_source_platform ON crawl_task(source_url, platform_code)"
+            )
 
-                cursor.execute(
-                    """
-                    SELECT COUNT(*) AS c
-                    FROM information_schema.STATISTICS
-                    WHERE TABLE_SCHEMA=%s AND TABLE_NAME='article_raw' AND INDEX_NAME='ix_article_raw_platform_code'
-                    """,
-                    (self.database,),
-                )
-                article_platform_index = cursor.fetchone()
-                if (
-                    int(article_platform_index["c"] if article_platform_index else 0)
-                    == 0
-                ):
-                    cursor.execute(
-                        "CREATE INDEX ix_article_raw_platform_code ON article_raw(platform_code)"
-                    )
+        cursor.execute(
+            """
+            SELECT COUNT(*) AS c
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA=%s AND TABLE_NAME='tutoring_info' AND COLUMN_NAME='content_block'
+            """,
+            (self.database,),
+        )
+        content_block_column = cursor.fetchone()
+        if int(content_block_column["c"] if content_block_column else 0) == 0:
+            cursor.execute(
+                """
+                ALTER TABLE tutoring_info
+                ADD COLUMN content_block LONGTEXT NOT NULL COMMENT '单条家教信息原始分段内容'
+                AFTER source_url
+                """
+            )
+        cursor.execute(
+            """
+            SELECT COUNT(*) AS c
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA=%s AND TABLE_NAME='article_raw' AND INDEX_NAME='ix_article_raw_platform_code'
+            """,
+            (self.database,),
+        )
+        article_platform_index = cursor.fetchone()
+        if (
+            int(article_platform_index["c"] if article_platform_index else 0)
+            == 0
+        ):
+            cursor.execute(
+                "CREATE INDEX ix_article_raw_platform_code ON article_raw(platform_code)"
+            )
+
+        cursor.execute(
+            """
+            SELECT COUNT(*) AS c
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA=%s AND TABLE_NAME='crawl_task' AND INDEX_NAME='ix_crawl_task_platform_code'
+            """,
+            (self.database,),
+        )
+        task_platform_index = cursor.fetchone()
+        if int(task_platform_index["c"] if task_platform_index else 0) == 0:
+            cursor.execute(
+                "CREATE INDEX ix_crawl_task_platform_code ON crawl_task(platform_code)"
+            )
+        cursor.execute(
+            """
+            INSERT INTO crawl_platform(platform_code, platform_name, status, description)
+            SELECT 'MIAOMIAO_WECHAT', '淼淼家教公众号', 'ENABLED', '默认平台'
+            WHERE NOT EXISTS (
+                SELECT 1 FROM crawl_platform WHERE platform_code='MIAOMIAO_WECHAT'
+            )
+            """
+        )
 
+    def _migrate_v2_content_hash(self, conn, cursor) -> None:
+        cursor.execute(
+            """
+            SELECT COUNT(*) AS c
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA=%s AND TABLE_NAME='tutoring_info' AND COLUMN_NAME='content_hash'
+            """,
+            (self.database,),
+        )
+        content_hash_column = cursor.fetchone()
+        if int(content_hash_column["c"] if content_hash_column else 0) == 0:
+            cursor.execute(
+                """
+                ALTER TABLE tutoring_info
+                ADD COLUMN content_hash CHAR(64) NOT NULL DEFAULT '' COMMENT '条目内容摘要（用于增量对比）'
+                AFTER teacher_requirement_snippet
+                """
+            )
+
+    def _migrate_v3_article_url(self, conn, cursor) -> None:
+        cursor.execute(
+            """
+            SELECT COUNT(*) AS c
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA=%s AND TABLE_NAME='tutoring_info' AND COLUMN_NAME='article_url'
+            """,
+            (self.database,),
+        )
+        article_url_column = cursor.fetchone()
+        if int(article_url_column["c"] if article_url_column else 0) == 0:
+            cursor.execute(
+                """
+                ALTER TABLE tutoring_info
+                ADD COLUMN article_url VARCHAR(512) NOT NULL DEFAULT '' COMMENT '所属文章URL'
+                AFTER content_hash,
+                ADD COLUMN item_index INT NOT NULL DEFAULT 1 COMMENT '文章内条目序号'
+                AFTER article_url
+                """
+            )
+        cursor.execute(
+            """
+            SELECT COUNT(*) AS c
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA=%s AND TABLE_NAME='tutoring_info' AND INDEX_NAME='ix_tutoring_info_article_url'
+            """,
+            (self.database,),
+        )
+        article_url_index = cursor.fetchone()
+        if int(article_url_index["c"] if article_url_index else 0) == 0:
+            cursor.execute(
+                "CREATE INDEX ix_tutoring_info_article_url ON tutoring_info(article_url, item_index)"
+            )
+        self._backfill_article_urls(conn, cursor, batch_size=1000)
+
+    def _migrate_v4_parser_fingerprint(self, conn, cursor) -> None:
+        for table, after_column in (
+            ("article_raw", "published_at"),
+            ("tutoring_info", "item_index"),
+        ):
+            cursor.execute(
+                """
+                SELECT COUNT(*) AS c
+                FROM information_schema.COLUMNS
+                WHERE TABLE_SCHEMA=%s AND TABLE_NAME=%s AND COLUMN_NAME='parser_fingerprint'
+                """,
+                (self.database, table),
+            )
+            fingerprint_column = cursor.fetchone()
+            if int(fingerprint_column["c"] if fingerprint_column else 0) == 0:
                 cursor.execute(
+                    f"""
+                    ALTER TABLE {table}
+                    ADD COLUMN parser_fingerprint VARCHAR(64) NOT NULL DEFAULT '' COMMENT '解析器指纹'
+                    AFTER {after_column}
                     """
-                    SELECT COUNT(*) AS c
-                    FROM information_schema.STATISTICS
-                    WHERE TABLE_SCHEMA=%s AND TABLE_NAME='crawl_task' AND INDEX_NAME='ix_crawl_task_platform_code'
-                    """,
-                    (self.database,),
                 )
-                task_platform_index = cursor.fetchone()
-                if int(task_platform_index["c"] if task_platform_index else 0) == 0:
-                    cursor.execute(
-                        "CREATE INDEX ix_crawl_task_platform_code ON crawl_task(platform_code)"
-                    )
-                cursor.execute(
-                    """
-                    INSERT INTO crawl_platform(platform_code, platform_name, status, description)
-                    SELECT 'MIAOMIAO_WECHAT', '淼淼家教公众号', 'ENABLED', '默认平台'
-                    WHERE NOT EXISTS (
-                        SELECT 1 FROM crawl_platform WHERE platform_code='MIAOMIAO_WECHAT'
+
+    def _migrate_v5_content_truncated(self, conn, cursor) -> None:
+        cursor.execute(
+            """
+            SELECT COUNT(*) AS c
+            FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA=%s AND TABLE_NAME='article_raw' AND COLUMN_NAME='content_truncated'
+            """,
+            (self.database,),
+        )
+        truncated_column = cursor.fetchone()
+        if int(truncated_column["c"] if truncated_column else 0) == 0:
+            cursor.execute(
+                """
+                ALTER TABLE article_raw
+                ADD COLUMN content_truncated TINYINT NOT NULL DEFAULT 0 COMMENT '归档HTML是否被流式抓取截断'
+                AFTER parser_fingerprint
+                """
+            )
+
+    def backfill_article_urls(self, batch_size: int = 1000) -> int:
+        """为历史 tutoring_info 行回填 article_url / item_index，分批提交，可重复执行。"""
+        with closing(self._conn()) as conn:
+            with conn.cursor() as cursor:
+                return self._backfill_article_urls(conn, cursor, batch_size)
+
+    @staticmethod
+    def _backfill_article_urls(conn, cursor, batch_size: int) -> int:
+        # 按 id 翻页：source_url 为空等行更新后 article_url 仍可能为 ''，不能靠条件本身收敛。
+        total = 0
+        last_id = 0
+        while True:
+            cursor.execute(
+                "SELECT id FROM tutoring_info WHERE article_url='' AND id>%s ORDER BY id LIMIT %s",
+                (last_id, batch_size),
+            )
+            ids = [row["id"] for row in cursor.fetchall()]
+            if not ids:
+                return total
+            total += cursor.execute(
+                """
+                UPDATE tutoring_info
+                SET article_url = SUBSTRING_INDEX(source_url, '#item-', 1),
+                    item_index = IF(
+                        LOCATE('#item-', source_url) > 0,
+                        CAST(SUBSTRING_INDEX(source_url, '#item-', -1) AS UNSIGNED),
+                        1
                     )
-                    """
-                )
+                WHERE article_url='' AND id BETWEEN %s AND %s
+                """,
+                (ids[0], ids[-1]),
+            )
             conn.commit()
+            last_id = ids[-1]
+            if len(ids) < batch_size:
+                return total
 
     def create_task(
         self,
@@ -297,14 +554,13 @@ class MySQLCrawlStorage:
         source_type: str,
         platform_code: str = "MIAOMIAO_WECHAT",
     ) -> int:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
                     "INSERT INTO crawl_task(source_url, platform_code, source_type, status) VALUES (%s, %s, %s, 'PENDING')",
                     (source_url, platform_code, source_type),
                 )
                 task_id = int(cursor.lastrowid)
-            conn.commit()
             return task_id
 
     def get_task_by_url(
@@ -312,7 +568,7 @@ class MySQLCrawlStorage:
         source_url: str,
         platform_code: str = "MIAOMIAO_WECHAT",
     ):
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
                     "SELECT * FROM crawl_task WHERE source_url=%s AND platform_code=%s",
@@ -320,20 +576,119 @@ class MySQLCrawlStorage:
                 )
                 return cursor.fetchone()
 
-    def get_task(self, task_id: int):
+    def get_existing_task_urls(
+        self,
+        source_urls: list[str],
+        platform_code: str = "MIAOMIAO_WECHAT",
+        batch_size: int = 500,
+    ) -> set[str]:
+        urls = list(dict.fromkeys(source_urls))
+        existing: set[str] = set()
+        if not urls:
+            return existing
+        with self._session() as conn:
+            with conn.cursor() as cursor:
+                for start in range(0, len(urls), batch_size):
+                    batch = urls[start : start + batch_size]
+                    placeholders = ", ".join("%s" for _ in batch)
+                    cursor.execute(
+                        f"SELECT source_url FROM crawl_task WHERE platform_code=%s AND source_url IN ({placeholders})",
+                        (platform_code, *batch),
+                    )
+                    existing.update(row["source_url"] for row in cursor.fetchall())
+        return existing
+
+    def iter_task_urls(self, platform_code: str = "MIAOMIAO_WECHAT"):
+        # 服务端游标逐行读取，避免历史任务很多时一次性加载到内存。
         with closing(self._conn()) as conn:
+            with conn.cursor(SSDictCursor) as cursor:
+                cursor.execute(
+                    "SELECT source_url FROM crawl_task WHERE platform_code=%s",
+                    (platform_code,),
+                )
+                for row in cursor:
+                    yield row["source_url"]
+
+    def iter_articles(
+        self,
+        platform_code: str = "",
+        published_from: str = "",
+        published_to: str = "",
+        stale_fingerprint: str = "",
+        page_size: int = 500,
+    ):
+        """按 id 分页读取 article_raw，按平台与发布时间 [published_from, published_to) 过滤。
+
+        stale_fingerprint 非空时只返回解析器指纹与之不同的文章。
+        content_html 保持库中原值（归档相对路径），由调用方按需 read_html。
+        """
+        clauses = ["id>%s"]
+        params: list = []
+        if platform_code:
+            clauses.append("platform_code=%s")
+            params.append(platform_code)
+        if published_from:
+            clauses.append("published_at>=%s")
+            params.append(published_from)
+        if published_to:
+            clauses.append("published_at<%s")
+            params.append(published_to)
+        if stale_fingerprint:
+            clauses.append("parser_fingerprint<>%s")
+            params.append(stale_fingerprint)
+        sql = (
+            "SELECT id, source_url, platform_code, title, content_html, content_text, "
+            f"published_at FROM article_raw WHERE {' AND '.join(clauses)} "
+            "ORDER BY id LIMIT %s"
+        )
+        # keyset 分页：每页从连接池借用连接并一次取完，调用方解析一批耗时再长，
+        # 也不会因服务端游标超过 net_write_timeout 被断开。
+        page_size = max(1, int(page_size))
+        last_id = 0
+        while True:
+            with self._session() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(sql, [last_id, *params, page_size])
+                    rows = cursor.fetchall()
+            for row in rows:
+                article = dict(row)
+                last_id = article.pop("id")
+                article["published_at"] = str(article["published_at"] or "")
+                yield article
+            if len(rows) < page_size:
+                return
+
+    def get_article(self, source_url: str) -> dict | None:
+        with self._session() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    """
+                    SELECT source_url, platform_code, title, content_html, content_text, published_at
+                    FROM article_raw
+                    WHERE source_url=%s
+                    """,
+                    (source_url,),
+                )
+                row = cursor.fetchone()
+        if not row:
+            return None
+        article = dict(row)
+        article["published_at"] = str(article["published_at"] or "")
+        return article
+
+    def get_task(self, task_id: int):
+        with self._session() as conn:
             with conn.cursor() as cursor:
                 cursor.execute("SELECT * FROM crawl_task WHERE id=%s", (task_id,))
                 return cursor.fetchone()
 
     def update_task_status(self, task_id: int, status: str) -> None:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
                     "UPDATE crawl_task SET status=%s, updated_at=CURRENT_TIMESTAMP WHERE id=%s",
                     (status, task_id),
                 )
-            conn.commit()
 
     def add_task_log(
         self,
@@ -345,27 +700,36 @@ class MySQLCrawlStorage:
         error_message: str = "",
         runtime: str = "python",
     ) -> None:
-        with closing(self._conn()) as conn:
+        self.add_task_logs(
+            [
+                {
+                    "task_id": task_id,
+                    "stage": stage,
+                    "status": status,
+                    "error_type": error_type,
+                    "error_summary": error_summary,
+                    "error_message": error_message,
+                    "runtime": runtime,
+                }
+            ]
+        )
+
+    def add_task_logs(self, logs: list[dict]) -> None:
+        if not logs:
+            return
+        with self._session() as conn:
             with conn.cursor() as cursor:
-                cursor.execute(
+                # VALUES 仅含占位符时 pymysql 会把 executemany 改写为单条多行 INSERT。
+                cursor.executemany(
                     """
                     INSERT INTO crawl_task_log(task_id, runtime, stage, status, error_type, error_summary, error_message)
                     VALUES (%s, %s, %s, %s, %s, %s, %s)
                     """,
-                    (
-                        task_id,
-                        runtime,
-                        stage,
-                        status,
-                        error_type,
-                        error_summary,
-                        error_message,
-                    ),
+                    [task_log_values(log) for log in logs],
                 )
-            conn.commit()
 
     def list_task_logs(self, task_id: int):
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
                     "SELECT * FROM crawl_task_log WHERE task_id=%s ORDER BY id ASC",
@@ -375,18 +739,19 @@ class MySQLCrawlStorage:
 
     def save_article(self, article: dict) -> None:
         html_path = store_html(article["source_url"], article["content_html"])
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
                     """
-                    INSERT INTO article_raw(source_url, platform_code, title, content_html, content_text, published_at, crawled_at, updated_at)
-                    VALUES (%s, %s, %s, %s, %s, IFNULL(NULLIF(%s, ''), CURRENT_TIMESTAMP), CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                    INSERT INTO article_raw(source_url, platform_code, title, content_html, content_text, published_at, content_truncated, crawled_at, updated_at)
+                    VALUES (%s, %s, %s, %s, %s, IFNULL(NULLIF(%s, ''), CURRENT_TIMESTAMP), %s, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
                     ON DUPLICATE KEY UPDATE
                         platform_code=VALUES(platform_code),
                         title=VALUES(title),
                         content_html=VALUES(content_html),
                         content_text=VALUES(content_text),
-                        published_at=VALUES(published_at),
+                        published_at=IF(NULLIF(%s, '') IS NULL, published_at, VALUES(published_at)),
+                        content_truncated=VALUES(content_truncated),
                         crawled_at=CURRENT_TIMESTAMP,
                         updated_at=CURRENT_TIMESTAMP
                     """,
@@ -397,83 +762,177 @@ class MySQLCrawlStorage:
                         html_path,
                         article["content_text"],
                         article["published_at"],
+                        1 if article.get("content_truncated") else 0,
+                        article["published_at"],
                     ),
                 )
-            conn.commit()
 
     def save_tutoring_info(self, info: dict) -> None:
-        with closing(self._conn()) as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(
-                    """
-                    INSERT INTO tutoring_info(
-                        source_url, content_block, city, district, grade, subject, address,
-                        time_schedule, salary_text, teacher_requirement, published_at,
-                        city_snippet, district_snippet, grade_snippet, subject_snippet,
-                        address_snippet, time_schedule_snippet, salary_snippet, teacher_requirement_snippet,
-                        updated_at
-                    ) VALUES (
+        self.save_tutoring_infos([info])
+
+    def save_tutoring_infos(self, infos: list[dict], batch_size: int = 200) -> None:
+        if not infos:
+            return
+        row_placeholder = """(
                         %s, %s, %s, %s, %s, %s, %s,
                         %s, %s, %s, IFNULL(NULLIF(%s, ''), CURRENT_TIMESTAMP),
                         %s, %s, %s, %s, %s, %s, %s, %s,
-                        CURRENT_TIMESTAMP
+                        %s, %s, %s, CURRENT_TIMESTAMP
+                    )"""
+        with self._session() as conn:
+            with conn.cursor() as cursor:
+                # 行内含 SQL 表达式，pymysql 无法自动合并 executemany，这里手动拼多行 VALUES。
+                for start in range(0, len(infos), batch_size):
+                    batch = infos[start : start + batch_size]
+                    values_sql = ",\n                    ".join(
+                        row_placeholder for _ in batch
                     )
-                    ON DUPLICATE KEY UPDATE
-                        content_block=VALUES(content_block),
-                        city=VALUES(city),
-                        district=VALUES(district),
-                        grade=VALUES(grade),
-                        subject=VALUES(subject),
-                        address=VALUES(address),
-                        time_schedule=VALUES(time_schedule),
-                        salary_text=VALUES(salary_text),
-                        teacher_requirement=VALUES(teacher_requirement),
-                        published_at=VALUES(published_at),
-                        city_snippet=VALUES(city_snippet),
-                        district_snippet=VALUES(district_snippet),
-                        grade_snippet=VALUES(grade_snippet),
-                        subject_snippet=VALUES(subject_snippet),
-                        address_snippet=VALUES(address_snippet),
-                        time_schedule_snippet=VALUES(time_schedule_snippet),
-                        salary_snippet=VALUES(salary_snippet),
-                        teacher_requirement_snippet=VALUES(teacher_requirement_snippet),
-                        updated_at=CURRENT_TIMESTAMP
+                    params = [
+                        value for info in batch for value in tutoring_info_values(info)
+                    ]
+                    cursor.execute(
+                        f"""
+                        INSERT INTO tutoring_info(
+                            source_url, content_block, city, district, grade, subject, address,
+                            time_schedule, salary_text, teacher_requirement, published_at,
+                            city_snippet, district_snippet, grade_snippet, subject_snippet,
+                            address_snippet, time_schedule_snippet, salary_snippet, teacher_requirement_snippet,
+                            content_hash, article_url, item_index, updated_at
+                        ) VALUES {values_sql}
+                        ON DUPLICATE KEY UPDATE
+                            content_block=VALUES(content_block),
+                            city=VALUES(city),
+                            district=VALUES(district),
+                            grade=VALUES(grade),
+                            subject=VALUES(subject),
+                            address=VALUES(address),
+                            time_schedule=VALUES(time_schedule),
+                            salary_text=VALUES(salary_text),
+                            teacher_requirement=VALUES(teacher_requirement),
+                            published_at=VALUES(published_at),
+                            city_snippet=VALUES(city_snippet),
+                            district_snippet=VALUES(district_snippet),
+                            grade_snippet=VALUES(grade_snippet),
+                            subject_snippet=VALUES(subject_snippet),
+                            address_snippet=VALUES(address_snippet),
+                            time_schedule_snippet=VALUES(time_schedule_snippet),
+                            salary_snippet=VALUES(salary_snippet),
+                            teacher_requirement_snippet=VALUES(teacher_requirement_snippet),
+                            content_hash=VALUES(content_hash),
+                            article_url=VALUES(article_url),
+                            item_index=VALUES(item_index),
+                            updated_at=CURRENT_TIMESTAMP
+                        """,
+                        params,
+                    )
+
+    def reconcile_tutoring_infos(
+        self, source_url: str, infos: list[dict], parser_fingerprint: str = ""
+    ) -> dict:
+        """按 content_hash 对比文章已有条目，只插入新增、更新变化、删除消失的条目，保留未变与仅移位条目的 id。
+
+        parser_fingerprint 非空时同时给文章及其全部条目打上解析器指纹。
+        """
+        return self.run_in_transaction(
+            lambda: self._reconcile_tutoring_infos(source_url, infos, parser_fingerprint)
+        )
+
+    def _reconcile_tutoring_infos(
+        self, source_url: str, infos: list[dict], parser_fingerprint: str
+    ) -> dict:
+        with self._session() as conn:
+            with conn.cursor() as cursor:
+                # 用 article_raw 唯一键上的行锁串行化同一文章；不对 tutoring_info 的
+                # 二级索引加 FOR UPDATE，避免间隙锁与相邻文章的插入互相死锁。
+                cursor.execute(
+                    "SELECT id FROM article_raw WHERE source_url=%s FOR UPDATE",
+                    (source_url,),
+                )
+                cursor.execute(
+                    "SELECT id, source_url, content_hash FROM tutoring_info WHERE article_url=%s",
+                    (source_url,),
+                )
+                plan = plan_tutoring_info_changes(cursor.fetchall(), infos)
+
+                if plan["delete_ids"]:
+                    placeholders = ", ".join("%s" for _ in plan["delete_ids"])
+                    cursor.execute(
+                        f"DELETE FROM tutoring_info WHERE id IN ({placeholders})",
+                        plan["delete_ids"],
+                    )
+                if plan["renamed_ids"]:
+                    # 位置变化的条目先改成临时 URL，避免互换序号时撞上 source_url 唯一约束。
+                    placeholders = ", ".join("%s" for _ in plan["renamed_ids"])
+                    cursor.execute(
+                        "UPDATE tutoring_info SET source_url=CONCAT('moving:', id) "
+                        f"WHERE id IN ({placeholders})",
+                        plan["renamed_ids"],
+                    )
+                if plan["updates"]:
+                    cursor.executemany(
+                        """
+                        UPDATE tutoring_info
+                        SET source_url=%s, content_block=%s, city=%s, district=%s, grade=%s,
+                            subject=%s, address=%s, time_schedule=%s, salary_text=%s,
+                            teacher_requirement=%s,
+                            published_at=IFNULL(NULLIF(%s, ''), CURRENT_TIMESTAMP),
+                            city_snippet=%s, district_snippet=%s, grade_snippet=%s, subject_snippet=%s,
+                            address_snippet=%s, time_schedule_snippet=%s, salary_snippet=%s,
+                            teacher_requirement_snippet=%s, content_hash=%s, article_url=%s, item_index=%s,
+                            updated_at=CURRENT_TIMESTAMP
+                        WHERE id=%s
+                        """,
+                        [
+                            (*tutoring_info_values(info), row_id)
+                            for row_id, info in plan["updates"]
+                        ],
+                    )
+            self.save_tutoring_infos(plan["inserts"])
+            if parser_fingerprint:
+                self.stamp_parser_fingerprint(source_url, parser_fingerprint)
+
+        return {
+            "inserted": len(plan["inserts"]),
+            "updated": len(plan["updates"]),
+            "deleted": len(plan["delete_ids"]),
+            "unchanged": plan["unchanged"],
+        }
+
+    def stamp_parser_fingerprint(self, source_url: str, parser_fingerprint: str) -> None:
+        with self._session() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "UPDATE article_raw SET parser_fingerprint=%s WHERE source_url=%s",
+                    (parser_fingerprint, source_url),
+                )
+                cursor.execute(
+                    """
+                    UPDATE tutoring_info
+                    SET parser_fingerprint=%s
+                    WHERE article_url=%s AND parser_fingerprint<>%s
                     """,
-                    (
-                        info["source_url"],
-                        info.get("content_block", ""),
-                        info["city"],
-                        info["district"],
-                        info["grade"],
-                        info["subject"],
-                        info["address"],
-                        info["time_schedule"],
-                        info["salary_text"],
-                        info["teacher_requirement"],
-                        info["published_at"],
-                        info["city_snippet"],
-                        info["district_snippet"],
-                        info["grade_snippet"],
-                        info["subject_snippet"],
-                        info["address_snippet"],
-                        info["time_schedule_snippet"],
-                        info["salary_snippet"],
-                        info["teacher_requirement_snippet"],
-                    ),
+                    (parser_fingerprint, source_url, parser_fingerprint),
                 )
-            conn.commit()
 
     def delete_tutoring_info_by_article(self, source_url: str) -> None:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
-                    "DELETE FROM tutoring_info WHERE source_url=%s OR source_url LIKE %s",
-                    (source_url, f"{source_url}#item-%"),
+                    "DELETE FROM tutoring_info WHERE article_url=%s", (source_url,)
                 )
-            conn.commit()
+
+    def count_tutoring_info_by_article(self, source_url: str) -> int:
+        with self._session() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(
+                    "SELECT COUNT(*) AS c FROM tutoring_info WHERE article_url=%s",
+                    (source_url,),
+                )
+                row = cursor.fetchone()
+                return int(row["c"] if row else 0)
 
     def get_tutoring_info_by_url(self, source_url: str):
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
                     "SELECT * FROM tutoring_info WHERE source_url=%s", (source_url,)
@@ -481,7 +940,7 @@ class MySQLCrawlStorage:
                 return cursor.fetchone()
 
     def count_articles(self) -> int:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             with conn.cursor() as cursor:
                 cursor.execute("SELECT COUNT(*) AS c FROM article_raw")
                 row = cursor.fetchone()
@@ -490,7 +949,7 @@ class MySQLCrawlStorage:
                 return int(row.get("c", 0))
 
     def count_tutoring_info(self) -> int:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             with conn.cursor() as cursor:
                 cursor.execute("SELECT COUNT(*) AS c FROM tutoring_info")
                 row = cursor.fetchone()
@@ -499,16 +958,15 @@ class MySQLCrawlStorage:
                 return int(row.get("c", 0))
 
     def override_task_created_date(self, task_id: int, day: str) -> None:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
                     "UPDATE crawl_task SET created_at=CONCAT(%s, ' 00:00:00') WHERE id=%s",
                     (day, task_id),
                 )
-            conn.commit()
 
     def daily_success_rate(self, day: str) -> dict:
-        with closing(self._conn()) as conn:
+        with self._session() as conn:
             with conn.cursor() as cursor:
                 cursor.execute(
                     """
@@ -0,0 +1,133 @@
+import hashlib
+import json
+
+
+TUTORING_INFO_FIELDS = (
+    "source_url",
+    "content_block",
+    "city",
+    "district",
+    "grade",
+    "subject",
+    "address",
+    "time_schedule",
+    "salary_text",
+    "teacher_requirement",
+    "published_at",
+    "city_snippet",
+    "district_snippet",
+    "grade_snippet",
+    "subject_snippet",
+    "address_snippet",
+    "time_schedule_snippet",
+    "salary_snippet",
+    "teacher_requirement_snippet",
+)
+
+
+ITEM_URL_MARKER = "#item-"
+
+
+def split_item_url(source_url: str) -> tuple[str, int]:
+    """条目 URL 拆为 (文章 URL, 条目序号)：首条目即文章 URL 本身，序号为 1。"""
+    article_url, marker, suffix = source_url.partition(ITEM_URL_MARKER)
+    if not marker:
+        return source_url, 1
+    try:
+        return article_url, int(suffix)
+    except ValueError:
+        return article_url, 1
+
+
+def _field_value(info: dict, field: str):
+    return info.get(field, "") if field == "content_block" else info[field]
+
+
+def tutoring_info_hash(info: dict) -> str:
+    """除 source_url 外全部字段的摘要，用于判断同一条目内容是否变化。"""
+    payload = [str(_field_value(info, field)) for field in TUTORING_INFO_FIELDS[1:]]
+    return hashlib.sha256(
+        json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    ).hexdigest()
+
+
+def tutoring_info_values(info: dict) -> tuple:
+    """按 TUTORING_INFO_FIELDS 顺序取出写入参数，末尾追加 content_hash、article_url、item_index。"""
+    return (
+        *(_field_value(info, field) for field in TUTORING_INFO_FIELDS),
+        tutoring_info_hash(info),
+        *split_item_url(info["source_url"]),
+    )
+
+
+def plan_tutoring_info_changes(existing_rows, infos: list[dict]) -> dict:
+    """对比库中已有条目与本次解析结果，只产出需要变更的部分。
+
+    existing_rows 需包含 id / source_url / content_hash；同一 source_url 多次出现时以最后一条为准。
+    先按 content_hash 匹配，文章中插入一条新信息时后面条目只改序号、保留原 id；
+    剩余条目再按 source_url（位置）匹配。
+    返回 inserts（新条目）、updates（(id, info)，内容或位置变化的条目）、
+    renamed_ids（updates 中 source_url 变化的 id）、delete_ids（已消失的条目）以及 unchanged 数量。
+    """
+    existing = {
+        row["source_url"]: (row["id"], row["content_hash"]) for row in existing_rows
+    }
+    latest = {info["source_url"]: info for info in infos}
+    hashes = {source_url: tutoring_info_hash(info) for source_url, info in latest.items()}
+
+    # 1. 位置与内容都没变的条目
+    pending = []
+    for source_url, content_hash in hashes.items():
+        current = existing.get(source_url)
+        if current is not None and current[1] == content_hash:
+            existing.pop(source_url)
+        else:
+            pending.append(source_url)
+    unchanged = len(hashes) - len(pending)
+
+    # 2. 内容相同但位置变化的条目：沿用原 id，只改 source_url 与序号
+    by_hash: dict[str, list[str]] = {}
+    for source_url, (_, content_hash) in existing.items():
+        by_hash.setdefault(content_hash, []).append(source_url)
+    updates = []
+    renamed_ids = []
+    moved = set()
+    for source_url in pending:
+        candidates = by_hash.get(hashes[source_url])
+        if not candidates:
+            continue
+        row_id = existing.pop(candidates.pop(0))[0]
+        updates.append((row_id, latest[source_url]))
+        renamed_ids.append(row_id)
+        moved.add(source_url)
+
+    # 3. 剩余条目按位置匹配：同位置内容变化则更新，否则新增
+    inserts = []
+    for source_url in pending:
+        if source_url in moved:
+            continue
+        current = existing.pop(source_url, None)
+        if current is None:
+            inserts.append(latest[source_url])
+        else:
+            updates.append((current[0], latest[source_url]))
+    return {
+        "inserts": inserts,
+        "updates": updates,
+        "renamed_ids": renamed_ids,
+        "delete_ids": [row_id for row_id, _ in existing.values()],
+        "unchanged": unchanged,
+    }
+
+
+def task_log_values(log: dict) -> tuple:
+    """crawl_task_log 写入参数，log 的键与 add_task_log 的参数同名。"""
+    return (
+        log["task_id"],
+        log.get("runtime", "python"),
+        log["stage"],
+        log["status"],
+        log.get("error_type", ""),
+        log.get("error_summary", ""),
+        log.get("error_message", ""),
+    )
@@ -9,6 +9,8 @@ CREATE TABLE IF NOT EXISTS article_raw (
     content_html CLOB NOT NULL DEFAULT '' COMMENT '文章HTML正文',
     content_text CLOB NOT NULL DEFAULT '' COMMENT '文章纯文本正文',
     published_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '文章发布时间',
+    parser_fingerprint VARCHAR(64) NOT NULL DEFAULT '' COMMENT '解析器指纹',
+    content_truncated TINYINT NOT NULL DEFAULT 0 COMMENT '归档HTML是否被流式抓取截断',
     crawled_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '抓取时间',
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '更新时间'
@@ -42,12 +44,17 @@ CREATE TABLE IF NOT EXISTS tutoring_info (
     time_schedule_snippet VARCHAR(512) NOT NULL DEFAULT '' COMMENT '授课时间证据片段',
     salary_snippet VARCHAR(256) NOT NULL DEFAULT '' COMMENT '薪资证据片段',
     teacher_requirement_snippet VARCHAR(512) NOT NULL DEFAULT '' COMMENT '老师要求证据片段',
+    content_hash VARCHAR(64) NOT NULL DEFAULT '' COMMENT '条目内容摘要（用于增量对比）',
+    article_url VARCHAR(1024) NOT NULL DEFAULT '' COMMENT '所属文章URL',
+    item_index INT NOT NULL DEFAULT 1 COMMENT '文章内条目序号',
+    parser_fingerprint VARCHAR(64) NOT NULL DEFAULT '' COMMENT '解析器指纹',
 
     created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP COMMENT '更新时间'
 ) COMMENT='家教信息解析结果表';
 
 CREATE UNIQUE INDEX IF NOT EXISTS ux_tutoring_info_source_url ON tutoring_info(source_url);
+CREATE INDEX IF NOT EXISTS ix_tutoring_info_article_url ON tutoring_info(article_url, item_index);
 
 CREATE INDEX IF NOT EXISTS ix_tutoring_info_published_at ON tutoring_info(published_at);
 CREATE INDEX IF NOT EXISTS ix_tutoring_info_city ON tutoring_info(city);
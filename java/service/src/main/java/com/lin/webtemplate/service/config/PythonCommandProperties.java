@@ -41,4 +41,9 @@ public class PythonCommandProperties {
     private String parserMode = "llm";
 
     private String llmConfig = "crawler/llm_config.json";
+
+    /**
+     * 为 true 时复用常驻的 import_articles.py --serve 进程，而不是每个任务启动一次 Python。
+     */
+    private boolean workerMode = false;
 }
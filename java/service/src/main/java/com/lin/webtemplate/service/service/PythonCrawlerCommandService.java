@@ -5,16 +5,21 @@ import java.io.InputStream;
 import java.nio.charset.StandardCharsets;
 import java.time.LocalDateTime;
 import java.util.ArrayList;
+import java.util.LinkedHashMap;
 import java.util.List;
+import java.util.Map;
 import java.util.Objects;
 import java.util.concurrent.ExecutorService;
 import java.util.concurrent.Executors;
 import java.util.concurrent.Future;
 import java.util.concurrent.Semaphore;
 import java.util.concurrent.TimeUnit;
+import java.util.concurrent.TimeoutException;
 import jakarta.annotation.PostConstruct;
 import jakarta.annotation.Resource;
 
+import com.fasterxml.jackson.databind.JsonNode;
+import com.fasterxml.jackson.databind.ObjectMapper;
 import lombok.extern.slf4j.Slf4j;
 import org.springframework.stereotype.Service;
 
@@ -50,6 +55,12 @@ public class PythonCrawlerCommandService {
     @Resource
     private CrawlTaskLogRepository crawlTaskLogRepository;
 
+    @Resource
+    private PythonImportWorkerClient pythonImportWorkerClient;
+
+    @Resource
+    private ObjectMapper objectMapper;
+
     private Semaphore commandSemaphore;
 
     @PostConstruct
@@ -72,6 +83,9 @@ public class PythonCrawlerCommandService {
             return skipped;
         }
 
+        if (pythonCommandProperties.isWorkerMode()) {
+            return executeWorkerJob(taskId, task, fromArticleRaw);
+        }
         List<String> command = buildImportCommand(task, fromArticleRaw);
         return executeCommand(taskId, command);
     }
@@ -189,8 +203,92 @@ public class PythonCrawlerCommandService {
         }
     }
 
+    private PythonCommandExecutionResultModel executeWorkerJob(Long taskId,
+                                                               CrawlTaskDO task,
+                                                               boolean fromArticleRaw) {
+        PythonCommandExecutionResultModel result = new PythonCommandExecutionResultModel();
+        boolean acquired = false;
+        try {
+            acquired = commandSemaphore.tryAcquire(pythonCommandProperties.getTimeoutSeconds(), TimeUnit.SECONDS);
+            if (!acquired) {
+                markFailed(taskId, "JAVA_CONCURRENCY_LIMIT", "python command concurrency limit reached");
+                result.setSuccess(false);
+                result.setExitCode(-1);
+                result.setStderr("python command concurrency limit reached");
+                return result;
+            }
+
+            crawlTaskRepository.updateStatus(taskId, "RUNNING");
+            appendLog(taskId, RUNTIME_JAVA, "JAVA_ORCHESTRATE", "RUNNING", "", "", "worker job submitted");
+            appendLog(taskId, RUNTIME_PYTHON, "PYTHON_EXECUTE", "RUNNING", "", "", "worker job submitted");
+
+            Map<String, Object> job = new LinkedHashMap<>();
+            job.put("id", String.valueOf(taskId));
+            job.put("url", task.getSourceUrl());
+            job.put("platform_code", task.getPlatformCode());
+            job.put("source_type", task.getSourceType());
+            job.put("from_article_raw", fromArticleRaw);
+            String stdout = pythonImportWorkerClient.submit(
+                    buildBaseCommand(), job, pythonCommandProperties.getTimeoutSeconds());
+            result.setStdout(stdout);
+
+            JsonNode response = objectMapper.readTree(stdout);
+            if (response.hasNonNull("error")) {
+                result.setSuccess(false);
+                result.setExitCode(-1);
+                result.setStderr(response.get("error").asText());
+                markFailed(taskId, "PYTHON_WORKER_ERROR", "error=" + result.getStderr() + "; stdout=" + shorten(stdout));
+                return result;
+            }
+
+            result.setSuccess(true);
+            result.setExitCode(0);
+            appendLog(taskId, RUNTIME_JAVA, "JAVA_ORCHESTRATE", "SUCCESS", "", "exitCode=0", "python worker job finished");
+            appendLog(taskId, RUNTIME_PYTHON, "PYTHON_EXECUTE", "SUCCESS", "", "exitCode=0", "stdout=" + shorten(stdout));
+            return result;
+        } catch (TimeoutException ex) {
+            result.setTimeout(true);
+            result.setSuccess(false);
+            result.setExitCode(-1);
+            result.setStderr(pythonImportWorkerClient.stderrTail());
+            markFailed(taskId,
+                    "PYTHON_TIMEOUT",
+                    "timeout=" + pythonCommandProperties.getTimeoutSeconds() + "s; stderr=" + shorten(result.getStderr()));
+            return result;
+        } catch (InterruptedException ex) {
+            Thread.currentThread().interrupt();
+            result.setSuccess(false);
+            result.setExitCode(-1);
+            markFailed(taskId, "JAVA_INTERRUPTED", ex.getMessage());
+            return result;
+        } catch (IOException ex) {
+            result.setSuccess(false);
+            result.setExitCode(-1);
+            markFailed(taskId, "JAVA_IO_ERROR", ex.getMessage());
+            return result;
+        } finally {
+            if (acquired) {
+                commandSemaphore.release();
+            }
+        }
+    }
+
     private List<String> buildImportCommand(CrawlTaskDO task,
                                             boolean fromArticleRaw) {
+        List<String> command = buildBaseCommand();
+        command.add("--platform-code");
+        command.add(task.getPlatformCode());
+        command.add("--source-type");
+        command.add(task.getSourceType());
+        command.add("--url");
+        command.add(task.getSourceUrl());
+        if (fromArticleRaw) {
+            command.add("--from-article-raw");
+        }
+        return command;
+    }
+
+    private List<String> buildBaseCommand() {
         List<String> command = new ArrayList<>();
         command.add(pythonCommandProperties.getPythonBin());
         command.add(pythonCommandProperties.getScriptPath());
@@ -213,19 +311,10 @@ public class PythonCrawlerCommandService {
             command.add(pythonCommandProperties.getMysqlDatabase());
         }
 
-        command.add("--platform-code");
-        command.add(task.getPlatformCode());
-        command.add("--source-type");
-        command.add(task.getSourceType());
         command.add("--parser-mode");
         command.add(pythonCommandProperties.getParserMode());
         command.add("--llm-config");
         command.add(pythonCommandProperties.getLlmConfig());
-        command.add("--url");
-        command.add(task.getSourceUrl());
-        if (fromArticleRaw) {
-            command.add("--from-article-raw");
-        }
         return command;
     }
 
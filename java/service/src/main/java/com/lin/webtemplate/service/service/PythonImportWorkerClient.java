@@ -0,0 +1,195 @@
+package com.lin.webtemplate.service.service;
+
+import java.io.BufferedReader;
+import java.io.BufferedWriter;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.InputStreamReader;
+import java.io.OutputStreamWriter;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Map;
+import java.util.concurrent.ExecutionException;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+import java.util.concurrent.Future;
+import java.util.concurrent.TimeUnit;
+import java.util.concurrent.TimeoutException;
+import java.util.concurrent.locks.ReentrantLock;
+import jakarta.annotation.PreDestroy;
+import jakarta.annotation.Resource;
+
+import com.fasterxml.jackson.databind.ObjectMapper;
+import lombok.extern.slf4j.Slf4j;
+import org.springframework.stereotype.Component;
+
+import com.lin.webtemplate.service.config.PythonCommandProperties;
+
+/**
+ * 功能：维护常驻的 Python 导入 worker（import_articles.py --serve），
+ * 按 JSON 行提交任务并读取结果，避免每个任务重复启动解释器与建连。
+ *
+ * worker 串行处理任务，等待占用 worker 同样受超时限制；超时或进程退出时销毁进程，
+ * 下次提交自动重启。关闭时不等待进行中的任务，直接结束进程。
+ *
+ * @author linyi
+ * @since 2026-02-19
+ */
+@Slf4j
+@Component
+public class PythonImportWorkerClient {
+
+    private static final int MAX_STDERR_TAIL = 4000;
+
+    @Resource
+    private PythonCommandProperties pythonCommandProperties;
+
+    @Resource
+    private ObjectMapper objectMapper;
+
+    private final ExecutorService ioPool = Executors.newCachedThreadPool();
+
+    private final StringBuilder stderrTail = new StringBuilder();
+
+    /** 保护 worker 进程及其读写流，一次只允许一个任务往返。 */
+    private final ReentrantLock workerLock = new ReentrantLock();
+
+    private volatile Process process;
+
+    private List<String> processCommand;
+
+    private BufferedWriter stdin;
+
+    private BufferedReader stdout;
+
+    /**
+     * 提交一个任务并等待 worker 输出对应的一行结果。
+     *
+     * @param command 启动 worker 的命令（不含 --serve）
+     * @param job     任务内容，序列化为一行 JSON
+     * @return worker 输出的结果行
+     * @throws TimeoutException 超时仍未轮到占用 worker，或 worker 未在超时内输出结果
+     */
+    public String submit(List<String> command,
+                         Map<String, Object> job,
+                         long timeoutSeconds)
+            throws IOException, InterruptedException, TimeoutException {
+        if (!workerLock.tryLock(timeoutSeconds, TimeUnit.SECONDS)) {
+            throw new TimeoutException("python worker busy for " + timeoutSeconds + "s");
+        }
+        try {
+            return roundTrip(command, job, timeoutSeconds);
+        } finally {
+            workerLock.unlock();
+        }
+    }
+
+    public String stderrTail() {
+        synchronized (stderrTail) {
+            return stderrTail.toString();
+        }
+    }
+
+    @PreDestroy
+    public void shutdown() {
+        // 不等待 workerLock：先强制结束进程，让卡住的任务读到 EOF 后自行清理。
+        Process current = process;
+        if (current != null && current.isAlive()) {
+            current.destroyForcibly();
+        }
+        if (workerLock.tryLock()) {
+            try {
+                destroy();
+            } finally {
+                workerLock.unlock();
+            }
+        }
+        ioPool.shutdownNow();
+    }
+
+    private String roundTrip(List<String> command, Map<String, Object> job, long timeoutSeconds)
+            throws IOException, InterruptedException, TimeoutException {
+        ensureStarted(command);
+        stdin.write(objectMapper.writeValueAsString(job));
+        stdin.newLine();
+        stdin.flush();
+
+        BufferedReader reader = stdout;
+        Future<String> lineFuture = ioPool.submit(reader::readLine);
+        try {
+            String line = lineFuture.get(timeoutSeconds, TimeUnit.SECONDS);
+            if (line == null) {
+                destroy();
+                throw new IOException("python worker exited; stderr=" + stderrTail());
+            }
+            return line;
+        } catch (TimeoutException ex) {
+            lineFuture.cancel(true);
+            destroy();
+            throw ex;
+        } catch (ExecutionException ex) {
+            destroy();
+            throw new IOException("python worker read failed: " + ex.getCause(), ex.getCause());
+        }
+    }
+
+    private void ensureStarted(List<String> command) throws IOException {
+        if (process != null && process.isAlive() && command.equals(processCommand)) {
+            return;
+        }
+        destroy();
+
+        List<String> serveCommand = new ArrayList<>(command);
+        serveCommand.add("--serve");
+        ProcessBuilder processBuilder = new ProcessBuilder(serveCommand);
+        processBuilder.directory(new java.io.File(pythonCommandProperties.getWorkingDirectory()));
+        Process started = processBuilder.start();
+        this.process = started;
+        this.processCommand = List.copyOf(command);
+        this.stdin = new BufferedWriter(new OutputStreamWriter(started.getOutputStream(), StandardCharsets.UTF_8));
+        this.stdout = new BufferedReader(new InputStreamReader(started.getInputStream(), StandardCharsets.UTF_8));
+        synchronized (stderrTail) {
+            stderrTail.setLength(0);
+        }
+        // stderr 必须持续读取，否则缓冲区写满后 worker 会阻塞。
+        ioPool.submit(() -> drainStderr(started.getErrorStream()));
+        log.info("Python import worker started, pid={}", started.pid());
+    }
+
+    private void drainStderr(InputStream errorStream) {
+        try (BufferedReader reader = new BufferedReader(new InputStreamReader(errorStream, StandardCharsets.UTF_8))) {
+            String line;
+            while ((line = reader.readLine()) != null) {
+                synchronized (stderrTail) {
+                    stderrTail.append(line).append('\n');
+                    if (stderrTail.length() > MAX_STDERR_TAIL) {
+                        stderrTail.delete(0, stderrTail.length() - MAX_STDERR_TAIL);
+                    }
+                }
+            }
+        } catch (IOException ex) {
+            // 进程结束后流关闭，无需处理。
+        }
+    }
+
+    private void destroy() {
+        Process current = process;
+        if (current == null) {
+            return;
+        }
+        try {
+            stdin.close();
+        } catch (IOException ex) {
+            // 进程已退出时关闭 stdin 会失败，忽略即可。
+        }
+        if (current.isAlive()) {
+            current.destroyForcibly();
+        }
+        log.info("Python import worker stopped, pid={}", current.pid());
+        process = null;
+        processCommand = null;
+        stdin = null;
+        stdout = null;
+    }
+}